@@ -18,7 +18,8 @@ setup(
     author_email="david.mulcahey@icloud.com",
     license="Apache License Version 2.0",
     keywords="zha quirks homeassistant hass",
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "tests.*"]),
+    package_data={"zhaquirks": ["quirks_manifest.json"]},
     python_requires=">=3.8",
     install_requires=["zigpy>=0.53"],
     tests_require=["pytest"],
@@ -0,0 +1,352 @@
+"""Import-cost benchmark for `zhaquirks.setup()`.
+
+Every measurement runs `zhaquirks.setup()` in a fresh interpreter, so modules
+are really imported. Each module is charged its own import time and traced
+memory, excluding the modules it imports in turn. Timings are taken with
+`tracemalloc` enabled and are only comparable with baselines taken the same way.
+
+Usage::
+
+    python -m tests.benchmarks.setup_import --save baseline.json
+    python -m tests.benchmarks.setup_import --compare baseline.json --threshold 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.abc
+import json
+import pathlib
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+PACKAGE = "zhaquirks"
+EXTERNAL = "<external>"
+
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_MIN_TIME_S = 0.005
+DEFAULT_MIN_MEMORY_KIB = 64
+
+
+def vendor_of(modname: str, is_package: bool = False) -> str:
+    """Return the vendor package a module belongs to."""
+    parts = modname.split(".")
+    if parts[0] != PACKAGE:
+        return EXTERNAL
+    if len(parts) == 1 or (len(parts) == 2 and not is_package):
+        return PACKAGE
+
+    return parts[1]
+
+
+class _ProfilingLoader:
+    """Loader wrapper recording the cost of executing a module."""
+
+    def __init__(self, loader: importlib.abc.Loader, profiler: ImportProfiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._profiler.run(module, self._loader.exec_module)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Meta path finder measuring the self time and memory of every import."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.modules: Dict[str, Dict[str, float]] = {}
+        self._stack: List[List[float]] = []
+
+    def find_spec(self, fullname, path, target=None):
+        """Find the module spec with the other finders and wrap its loader."""
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _ProfilingLoader(spec.loader, self)
+
+            return spec
+
+        return None
+
+    def run(self, module, exec_module) -> None:
+        """Execute `module`, charging its cost minus nested imports to it."""
+        # Nested imports add their cumulative cost to the entry of their importer
+        self._stack.append([0.0, 0.0])
+        start_mem = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            memory = tracemalloc.get_traced_memory()[0] - start_mem
+            child_time, child_memory = self._stack.pop()
+
+            if self._stack:
+                self._stack[-1][0] += elapsed
+                self._stack[-1][1] += memory
+
+            self.modules[module.__name__] = {
+                "package": hasattr(module, "__path__"),
+                "time_s": elapsed - child_time,
+                "cumulative_s": elapsed,
+                "memory_kib": (memory - child_memory) / 1024,
+            }
+
+    def __enter__(self) -> ImportProfiler:
+        """Start profiling imports."""
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop profiling imports."""
+        sys.meta_path.remove(self)
+
+
+def _measure_in_process(
+    custom_quirks_path: Optional[str] = None,
+    lazy: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Measure `zhaquirks.setup()` in the current, pristine interpreter."""
+    if PACKAGE in sys.modules:
+        raise RuntimeError(f"{PACKAGE} is already imported, run in a new interpreter")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    with ImportProfiler() as profiler:
+        zhaquirks = importlib.import_module(PACKAGE)
+        zhaquirks.setup(lazy=lazy, include=include, exclude=exclude)
+        setup_s = time.perf_counter() - start
+        setup_memory = tracemalloc.get_traced_memory()
+
+        result: Dict[str, Any] = {
+            "python": sys.version.split()[0],
+            "lazy": lazy,
+            "total": {
+                "time_s": setup_s,
+                "modules": len(profiler.modules),
+                "memory_kib": setup_memory[0] / 1024,
+                "peak_kib": setup_memory[1] / 1024,
+            },
+        }
+
+        if custom_quirks_path is not None:
+            custom_start = time.perf_counter()
+            custom = zhaquirks.setup(
+                custom_quirks_path=custom_quirks_path,
+                lazy=lazy,
+                include=include,
+                exclude=exclude,
+            )
+            result["custom"] = {
+                "time_s": time.perf_counter() - custom_start,
+                "memory_kib": (tracemalloc.get_traced_memory()[0] - setup_memory[0])
+                / 1024,
+                "modules": {
+                    module.name: {
+                        "time_s": module.load_time,
+                        "cached": module.cached,
+                        "error": None if module.loaded else repr(module.error),
+                    }
+                    for module in custom.modules
+                },
+            }
+
+    tracemalloc.stop()
+
+    vendors: Dict[str, Dict[str, float]] = {}
+    for modname, stats in profiler.modules.items():
+        vendor = vendors.setdefault(
+            vendor_of(modname, stats["package"]),
+            {"time_s": 0.0, "memory_kib": 0.0, "modules": 0},
+        )
+        vendor["time_s"] += stats["time_s"]
+        vendor["memory_kib"] += stats["memory_kib"]
+        vendor["modules"] += 1
+
+    result["vendors"] = dict(
+        sorted(vendors.items(), key=lambda item: item[1]["time_s"], reverse=True)
+    )
+    result["modules"] = dict(sorted(profiler.modules.items()))
+    return result
+
+
+def measure(
+    custom_quirks_path: Optional[str] = None,
+    lazy: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    repeat: int = 1,
+) -> Dict[str, Any]:
+    """Measure `zhaquirks.setup()` in `repeat` fresh interpreters.
+
+    The fastest run of each module and vendor is kept to reduce noise.
+    """
+    args = [sys.executable, "-m", __spec__.name, "--child"]
+    if custom_quirks_path is not None:
+        args += ["--custom-quirks-path", str(custom_quirks_path)]
+    if lazy:
+        args.append("--lazy")
+    for vendor in include or []:
+        args += ["--include", vendor]
+    for vendor in exclude or []:
+        args += ["--exclude", vendor]
+
+    cwd = pathlib.Path(__file__).parents[2]
+    runs = [
+        json.loads(
+            subprocess.run(
+                args, cwd=cwd, check=True, capture_output=True, text=True
+            ).stdout
+        )
+        for _ in range(repeat)
+    ]
+
+    result = runs[0]
+    for run in runs[1:]:
+        for section in ("modules", "vendors"):
+            for name, stats in run[section].items():
+                best = result[section].setdefault(name, stats)
+                for key in ("time_s", "cumulative_s"):
+                    if key in stats:
+                        best[key] = min(best[key], stats[key])
+        result["total"]["time_s"] = min(
+            result["total"]["time_s"], run["total"]["time_s"]
+        )
+
+    return result
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_time_s: float = DEFAULT_MIN_TIME_S,
+    min_memory_kib: float = DEFAULT_MIN_MEMORY_KIB,
+) -> List[str]:
+    """Return the modules and vendors whose cost regressed beyond `threshold`.
+
+    Changes smaller than `min_time_s` or `min_memory_kib` are ignored as noise.
+    """
+    regressions = []
+    limits = (("time_s", min_time_s, "s"), ("memory_kib", min_memory_kib, "KiB"))
+
+    for section in ("vendors", "modules"):
+        for name, stats in current[section].items():
+            base = baseline[section].get(name)
+            if base is None:
+                continue
+
+            for key, minimum, unit in limits:
+                old, new = base[key], stats[key]
+                if new - old > minimum and new > old * (1 + threshold):
+                    regressions.append(
+                        f"{section[:-1]} {name}: {key} {old:.3f}{unit} -> "
+                        f"{new:.3f}{unit} ({(new / old - 1) if old > 0 else 1:+.0%})"
+                    )
+
+    return regressions
+
+
+def format_report(result: Dict[str, Any], top: int = 15) -> str:
+    """Format a human readable summary of a measurement."""
+    total = result["total"]
+    lines = [
+        f"setup(lazy={result['lazy']}): {total['time_s'] * 1000:.1f} ms, "
+        f"{total['modules']} modules, {total['memory_kib']:.0f} KiB "
+        f"(peak {total['peak_kib']:.0f} KiB)"
+    ]
+
+    if "custom" in result:
+        lines.append(
+            f"custom quirks: {result['custom']['time_s'] * 1000:.1f} ms, "
+            f"{result['custom']['memory_kib']:.0f} KiB"
+        )
+
+    lines.append("")
+    lines.append(f"{'vendor':<30} {'ms':>9} {'KiB':>9} {'modules':>8}")
+    for name, stats in result["vendors"].items():
+        lines.append(
+            f"{name:<30} {stats['time_s'] * 1000:9.1f} "
+            f"{stats['memory_kib']:9.0f} {stats['modules']:8d}"
+        )
+
+    lines.append("")
+    lines.append(f"{'slowest modules':<50} {'ms':>9} {'KiB':>9}")
+    slowest = sorted(
+        result["modules"].items(), key=lambda item: item[1]["time_s"], reverse=True
+    )
+    for name, stats in slowest[:top]:
+        lines.append(
+            f"{name:<50} {stats['time_s'] * 1000:9.1f} {stats['memory_kib']:9.0f}"
+        )
+
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--custom-quirks-path", default=None)
+    parser.add_argument("--lazy", action="store_true")
+    parser.add_argument("--include", action="append", default=None)
+    parser.add_argument("--exclude", action="append", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", type=pathlib.Path, default=None)
+    parser.add_argument("--compare", type=pathlib.Path, default=None)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = _measure_in_process(
+            args.custom_quirks_path,
+            lazy=args.lazy,
+            include=args.include,
+            exclude=args.exclude,
+        )
+        json.dump(result, sys.stdout)
+        return 0
+
+    result = measure(
+        args.custom_quirks_path,
+        lazy=args.lazy,
+        include=args.include,
+        exclude=args.exclude,
+        repeat=args.repeat,
+    )
+    print(format_report(result))
+
+    if args.save is not None:
+        args.save.write_text(json.dumps(result, indent=1) + "\n", encoding="utf-8")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(baseline, result, threshold=args.threshold)
+        if regressions:
+            print("\nImport cost regressions:\n" + "\n".join(regressions))
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
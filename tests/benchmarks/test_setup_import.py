@@ -0,0 +1,78 @@
+"""Tests for the `zhaquirks.setup()` import-cost benchmark."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from tests.benchmarks import setup_import
+
+BASELINE_ENV = "ZHAQUIRKS_IMPORT_BASELINE"
+
+
+def _result(time_s, memory_kib):
+    stats = {"time_s": time_s, "memory_kib": memory_kib}
+    return {"vendors": {"tuya": dict(stats)}, "modules": {"zhaquirks.tuya": stats}}
+
+
+@pytest.mark.parametrize(
+    "baseline, current, regressions",
+    (
+        ((0.1, 100), (0.1, 100), 0),
+        ((0.1, 100), (0.14, 100), 0),
+        ((0.1, 100), (0.2, 100), 2),
+        ((0.1, 100), (0.1, 300), 2),
+        ((0.1, 100), (0.2, 300), 4),
+        # Relative regressions below the noise floor
+        ((0.001, 10), (0.002, 20), 0),
+    ),
+)
+def test_compare(baseline, current, regressions):
+    """Test regressions are reported beyond the threshold and noise floor."""
+
+    assert (
+        len(setup_import.compare(_result(*baseline), _result(*current))) == regressions
+    )
+
+
+@pytest.mark.parametrize(
+    "modname, is_package, vendor",
+    (
+        ("zigpy.zcl", True, setup_import.EXTERNAL),
+        ("zhaquirks", True, "zhaquirks"),
+        ("zhaquirks.const", False, "zhaquirks"),
+        ("zhaquirks.tuya", True, "tuya"),
+        ("zhaquirks.xiaomi.aqara.plug", False, "xiaomi"),
+    ),
+)
+def test_vendor_of(modname, is_package, vendor):
+    """Test modules are attributed to their vendor package."""
+
+    assert setup_import.vendor_of(modname, is_package) == vendor
+
+
+def test_setup_import_benchmark(tmp_path: Path):
+    """Measure `zhaquirks.setup()`, failing on regressions against a baseline."""
+
+    custom_quirks = tmp_path / "custom_zha_quirks"
+    custom_quirks.mkdir()
+    (custom_quirks / "__init__.py").touch()
+    (custom_quirks / "custom_quirk.py").write_text("import zhaquirks.bosch.motion\n")
+
+    result = setup_import.measure(custom_quirks_path=str(custom_quirks))
+
+    assert result["total"]["modules"] == len(result["modules"])
+    assert "zhaquirks.tuya" in result["modules"]
+    assert result["vendors"]["tuya"]["modules"] > 1
+    assert result["custom"]["time_s"] > 0
+    assert result["custom"]["modules"]["custom_quirk"]["error"] is None
+
+    baseline = os.environ.get(BASELINE_ENV)
+    if baseline is None:
+        return
+
+    regressions = setup_import.compare(
+        json.loads(Path(baseline).read_text(encoding="utf-8")), result
+    )
+    assert not regressions, "\n".join(regressions)
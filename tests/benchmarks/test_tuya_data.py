@@ -0,0 +1,47 @@
+"""Tests for the `TuyaData` payload micro-benchmark."""
+
+import pytest
+import zigpy.types as t
+
+from zhaquirks.tuya import TuyaData
+
+from tests.benchmarks import tuya_data
+
+
+@pytest.mark.parametrize("name, wire", tuya_data.SAMPLES)
+def test_payload_matches_legacy(name, wire):
+    """Test the table-driven decoders match the former implementation."""
+
+    data = TuyaData.deserialize(wire)[0]
+    payload = data.payload
+
+    assert payload == tuya_data.legacy_payload(data)
+    assert type(payload) is type(tuya_data.legacy_payload(data))
+
+
+@pytest.mark.parametrize(
+    "value",
+    (
+        t.bitmap16(3),
+        t.Bool.true,
+        True,
+        t.enum8(2),
+        5,
+        t.uint8_t(7),
+        "text",
+        t.LVBytes(b"\x01"),
+    ),
+)
+def test_dp_type_matches_legacy(value):
+    """Test values are sent with the same datapoint type as before."""
+
+    assert TuyaData(value).dp_type == tuya_data.legacy_dp_type(value)
+
+
+def test_tuya_data_benchmark():
+    """Run the benchmark briefly."""
+
+    result = tuya_data.measure(number=100)
+
+    assert set(result) == {name for name, _ in tuya_data.SAMPLES}
+    assert all(stats["current_us"] > 0 for stats in result.values())
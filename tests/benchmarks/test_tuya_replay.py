@@ -0,0 +1,76 @@
+"""Tests for the Tuya traffic replay harness."""
+
+import json
+import os
+import pathlib
+
+import pytest
+
+from tests.benchmarks import tuya_replay
+
+CORPORA = tuya_replay.load_corpora()
+
+
+def test_corpora_cover_device_kinds():
+    """Test the recorded traffic covers the main Tuya device kinds."""
+
+    assert {corpus.name for corpus in CORPORA} >= {
+        "air_quality",
+        "radar",
+        "rcbo",
+        "trv",
+        "valve",
+    }
+
+
+def test_corpus_round_trip(tmp_path):
+    """Test a saved corpus loads back unchanged."""
+
+    corpus = CORPORA[0]
+    corpus.save(tmp_path / f"{corpus.name}.json")
+
+    assert tuya_replay.load_corpora(tmp_path) == [corpus]
+
+
+@pytest.mark.parametrize("corpus", CORPORA, ids=lambda corpus: corpus.name)
+async def test_replay_corpus(zigpy_device_from_quirk, corpus):
+    """Test every frame of a corpus is handled and timed."""
+
+    device = zigpy_device_from_quirk(corpus.quirk_class())
+    result = await tuya_replay.replay(device, corpus, repeat=2)
+
+    frames = len(corpus.frames) * 2
+    assert result["frames"] == frames
+    assert result["frames_per_s"] > 0
+    assert result["stages"]["deserialize"]["calls"] == frames
+    assert result["stages"]["handle_cluster_request"]["calls"] == frames
+    assert "UNSUP_CLUSTER_COMMAND" not in result["default_responses"]
+    assert "peak_bytes_per_frame" in result["memory"]
+
+
+async def test_replay_stages(zigpy_device_from_quirk):
+    """Test the datapoint handlers of the new Tuya clusters are timed."""
+
+    corpus = next(corpus for corpus in CORPORA if corpus.name == "radar")
+    device = zigpy_device_from_quirk(corpus.quirk_class())
+    result = await tuya_replay.replay(device, corpus, trace_memory=False)
+
+    stages = result["stages"]
+    assert stages["handle_get_data"]["calls"] == len(corpus.frames)
+    assert stages["_dp_2_attr_update"]["calls"] == 35
+    assert "memory" not in result
+    assert "radar" in tuya_replay.format_report({"radar": result}, {"radar": result})
+
+
+async def test_replay_report(zigpy_device_from_quirk):
+    """Replay every corpus, saving the results for the command line runner."""
+
+    repeat = int(os.environ.get(tuya_replay.ENV_REPEAT, "1"))
+    results = {}
+    for corpus in CORPORA:
+        device = zigpy_device_from_quirk(corpus.quirk_class())
+        results[corpus.name] = await tuya_replay.replay(device, corpus, repeat)
+
+    output = os.environ.get(tuya_replay.ENV_OUTPUT)
+    if output:
+        pathlib.Path(output).write_text(json.dumps(results))
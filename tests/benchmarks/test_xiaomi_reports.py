@@ -0,0 +1,52 @@
+"""Tests for the Xiaomi attribute report micro-benchmark."""
+
+import pytest
+
+from tests.benchmarks import xiaomi_reports
+
+
+@pytest.mark.parametrize("name, payload", xiaomi_reports.SAMPLES)
+def test_deserialize_matches_legacy(name, payload):
+    """Test the memoized parser picks the interpretation of the former one."""
+
+    cluster = xiaomi_reports.make_cluster()
+    frame = xiaomi_reports.HEADER + payload
+
+    hdr, reports = cluster.deserialize(frame)
+    legacy_hdr, legacy_reports = xiaomi_reports.legacy_deserialize(cluster, frame)
+
+    assert hdr == legacy_hdr
+    assert reports == legacy_reports
+    assert reports.serialize() == legacy_reports.serialize()
+
+
+@pytest.mark.parametrize("name, payload", xiaomi_reports.SAMPLES)
+def test_interpretation_count(name, payload):
+    """Test the number of interpretations is counted up to two."""
+
+    cluster = xiaomi_reports.make_cluster()
+    interpretations = list(
+        xiaomi_reports.legacy_interpret_attr_reports(cluster, payload)
+    )
+
+    attributes, count = cluster._parse_attr_report(payload)
+
+    assert count == min(len(interpretations), 2)
+    assert attributes == list(interpretations[0])
+
+
+def test_unparsable_report():
+    """Test a report without valid interpretation is left to zigpy."""
+
+    cluster = xiaomi_reports.make_cluster()
+
+    assert cluster._parse_attr_report(b"\x01\xff\x42\x30\x01") == (None, 0)
+
+
+def test_xiaomi_reports_benchmark():
+    """Run the benchmark briefly."""
+
+    result = xiaomi_reports.measure(number=2)
+
+    assert set(result) == {name for name, _ in xiaomi_reports.SAMPLES}
+    assert all(stats["current_us"] > 0 for stats in result.values())
@@ -0,0 +1,113 @@
+"""Micro-benchmark of `TuyaData` payload decoding and encoding.
+
+The table-driven codecs of `zhaquirks.tuya` are timed against the former
+`dp_type` if/elif chains, kept here as the reference implementation.
+
+Usage::
+
+    python -m tests.benchmarks.tuya_data --number 100000
+"""
+from __future__ import annotations
+
+import argparse
+import enum
+import sys
+import timeit
+from typing import Any, Dict, List, Optional, Tuple
+
+import zigpy.types as t
+
+from zhaquirks.tuya import TuyaData, TuyaDPType
+
+DEFAULT_NUMBER = 20000
+
+# (name, TuyaData wire bytes) of typical datapoint reports
+SAMPLES: List[Tuple[str, bytes]] = [
+    ("value", b"\x02\x00\x04\x00\x00\x02\xdb"),
+    ("bool", b"\x01\x00\x01\x01"),
+    ("enum", b"\x04\x00\x01\x02"),
+    ("bitmap", b"\x05\x00\x02\x01\x02"),
+    ("string", b"\x03\x00\x05hello"),
+    ("raw", b"\x00\x00\x03\x01\x02\x46"),
+]
+
+
+def legacy_payload(data: TuyaData) -> Any:
+    """Decode a payload with the former if/elif chain."""
+    if data.dp_type == TuyaDPType.VALUE:
+        return t.int32s_be.deserialize(data.raw)[0]
+    elif data.dp_type == TuyaDPType.BOOL:
+        return t.Bool.deserialize(data.raw)[0]
+    elif data.dp_type == TuyaDPType.STRING:
+        return t.CharacterString(data.raw.decode("utf8"))
+    elif data.dp_type == TuyaDPType.ENUM:
+        return t.enum8.deserialize(data.raw)[0]
+    elif data.dp_type == TuyaDPType.BITMAP:
+        bitmaps = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
+        try:
+            return bitmaps[len(data.raw)].deserialize(data.raw)[0]
+        except KeyError as exc:
+            raise ValueError(f"Wrong bitmap length: {len(data.raw)}") from exc
+    elif data.dp_type == TuyaDPType.RAW:
+        return data.raw
+    else:
+        raise ValueError(f"Unknown {data.dp_type} datapoint type")
+
+
+def legacy_dp_type(value: Any) -> TuyaDPType:
+    """Return the datapoint type of a value with the former isinstance chain."""
+    if isinstance(value, (t.bitmap8, t.bitmap16, t.bitmap32)):
+        return TuyaDPType.BITMAP
+    elif isinstance(value, (bool, t.Bool)):
+        return TuyaDPType.BOOL
+    elif isinstance(value, enum.Enum):
+        return TuyaDPType.ENUM
+    elif isinstance(value, int):
+        return TuyaDPType.VALUE
+    elif isinstance(value, str):
+        return TuyaDPType.STRING
+    return TuyaDPType.RAW
+
+
+def measure(number: int = DEFAULT_NUMBER) -> Dict[str, Dict[str, float]]:
+    """Time decoding each sample, in microseconds per payload."""
+    result = {}
+
+    for name, wire in SAMPLES:
+        data = TuyaData.deserialize(wire)[0]
+        legacy = min(
+            timeit.repeat(lambda: legacy_payload(data), number=number, repeat=3)
+        )
+        current = min(timeit.repeat(lambda: data.payload, number=number, repeat=3))
+        result[name] = {
+            "legacy_us": legacy / number * 1e6,
+            "current_us": current / number * 1e6,
+            "speedup": legacy / current if current else 0.0,
+        }
+
+    return result
+
+
+def format_report(result: Dict[str, Dict[str, float]]) -> str:
+    """Format a human readable summary of a measurement."""
+    lines = [f"{'dp type':<10} {'legacy us':>10} {'table us':>10} {'speedup':>8}"]
+    for name, stats in result.items():
+        lines.append(
+            f"{name:<10} {stats['legacy_us']:10.3f} {stats['current_us']:10.3f} "
+            f"{stats['speedup']:7.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=DEFAULT_NUMBER)
+    args = parser.parse_args(argv)
+
+    print(format_report(measure(args.number)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Replay harness measuring how fast Tuya quirks handle recorded traffic.
+
+A corpus is a JSON file in `tuya_traffic/` holding the raw ZCL frames
+(hex encoded, header included) received by one cluster of a quirk::
+
+    {
+      "description": "...",
+      "quirk": "zhaquirks.tuya.ts0601_rcbo.TuyaCircuitBreaker",
+      "endpoint": 1,
+      "cluster": "tuya_manufacturer",
+      "frames": ["09000102030101000101", ...]
+    }
+
+Each frame is deserialized and handled by a quirk instance built with the
+`zigpy_device_from_quirk` fixture. The harness reports frames per second,
+the time spent in each stage (`handle_cluster_request`, the command handlers
+such as `handle_get_data` and the datapoint handlers such as
+`_dp_2_attr_update`) and the memory allocated while replaying. Default
+responses are counted instead of sent, so the radio path is not measured.
+
+Usage::
+
+    python -m tests.benchmarks.tuya_replay --repeat 1000 --save baseline.json
+    python -m tests.benchmarks.tuya_replay --repeat 1000 --compare baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import dataclasses
+import functools
+import importlib
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from zigpy.zcl import ClusterPersistingListener
+
+CORPUS_DIR = pathlib.Path(__file__).parent / "tuya_traffic"
+DEFAULT_REPEAT = 200
+
+# Environment variables passing the command line options to the pytest run
+ENV_REPEAT = "TUYA_REPLAY_REPEAT"
+ENV_OUTPUT = "TUYA_REPLAY_OUTPUT"
+
+
+@dataclasses.dataclass
+class TrafficCorpus:
+    """Recorded frames of a single cluster of a quirk."""
+
+    name: str
+    quirk: str
+    frames: List[bytes]
+    endpoint: int = 1
+    cluster: str = "tuya_manufacturer"
+    description: str = ""
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> TrafficCorpus:
+        """Load a corpus file."""
+        data = json.loads(path.read_text())
+        return cls(
+            name=path.stem,
+            quirk=data["quirk"],
+            frames=[bytes.fromhex(frame) for frame in data["frames"]],
+            endpoint=data.get("endpoint", 1),
+            cluster=data.get("cluster", "tuya_manufacturer"),
+            description=data.get("description", ""),
+        )
+
+    def save(self, path: pathlib.Path) -> None:
+        """Save the corpus, e.g. after recording frames from a real device."""
+        data = {
+            "description": self.description,
+            "quirk": self.quirk,
+            "endpoint": self.endpoint,
+            "cluster": self.cluster,
+            "frames": [frame.hex() for frame in self.frames],
+        }
+        path.write_text(json.dumps(data, indent=2) + "\n")
+
+    def quirk_class(self) -> type:
+        """Import the quirk the frames were recorded with."""
+        module, _, name = self.quirk.rpartition(".")
+        return getattr(importlib.import_module(module), name)
+
+
+def load_corpora(directory: pathlib.Path = CORPUS_DIR) -> List[TrafficCorpus]:
+    """Load every corpus of a directory."""
+    return [TrafficCorpus.load(path) for path in sorted(directory.glob("*.json"))]
+
+
+class StageTimer:
+    """Accumulate the time spent in instrumented callables, by stage."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.calls: Dict[str, int] = collections.Counter()
+        self.elapsed: Dict[str, float] = collections.Counter()
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """Return `func` timed as `stage`."""
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.elapsed[stage] += time.perf_counter() - start
+                self.calls[stage] += 1
+
+        return timed
+
+    def reset(self) -> None:
+        """Forget the measurements."""
+        self.calls.clear()
+        self.elapsed.clear()
+
+
+def instrument(cluster: Any, timer: StageTimer) -> Dict[str, int]:
+    """Time the stages of a Tuya cluster, return the default response counter.
+
+    Only the instance is patched, other devices of the quirk are unaffected.
+    """
+    responses: Dict[str, int] = collections.Counter()
+
+    def send_default_rsp(hdr, status=None, **kwargs):
+        responses[getattr(status, "name", str(status))] += 1
+
+    cluster.send_default_rsp = send_default_rsp
+    cluster.handle_cluster_request = timer.wrap(
+        "handle_cluster_request", cluster.handle_cluster_request
+    )
+
+    for table in ("_client_command_handlers", "_server_command_handlers"):
+        handlers = getattr(cluster, table, {})
+        for command_id, handler in handlers.items():
+            if handler is not None:
+                handlers[command_id] = timer.wrap(handler.__name__, handler)
+
+    dp_handlers = getattr(cluster, "_data_point_handlers", None)
+    if dp_handlers is None:
+        # Clusters mapping datapoints to their own attributes
+        cluster._update_attribute = timer.wrap(
+            "_update_attribute", cluster._update_attribute
+        )
+    else:
+        for dp, handler in dp_handlers.items():
+            dp_handlers[dp] = timer.wrap(handler.__name__, handler)
+
+    return responses
+
+
+def detach_persisting_listeners(device: Any) -> None:
+    """Stop persisting attribute updates, as the test application has no database.
+
+    Otherwise every update logs a listener error, which would dominate the
+    measurements.
+    """
+    for endpoint_id, endpoint in device.endpoints.items():
+        if endpoint_id == 0:
+            continue
+        for cluster in (
+            *endpoint.in_clusters.values(),
+            *endpoint.out_clusters.values(),
+        ):
+            for key, (listener, _) in list(cluster._listeners.items()):
+                if isinstance(listener, ClusterPersistingListener):
+                    del cluster._listeners[key]
+
+
+async def replay(
+    device: Any, corpus: TrafficCorpus, repeat: int = 1, trace_memory: bool = True
+) -> Dict[str, Any]:
+    """Replay the corpus `repeat` times through the device, return statistics."""
+    cluster = getattr(device.endpoints[corpus.endpoint], corpus.cluster)
+    detach_persisting_listeners(device)
+    timer = StageTimer()
+    responses = instrument(cluster, timer)
+    deserialize = timer.wrap("deserialize", cluster.deserialize)
+
+    async def replay_once() -> None:
+        for frame in corpus.frames:
+            hdr, args = deserialize(frame)
+            cluster.handle_message(hdr, args)
+        # let the handlers' tasks run
+        await asyncio.sleep(0)
+
+    # a first pass fills caches, so that passes are comparable
+    await replay_once()
+    timer.reset()
+    responses.clear()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await replay_once()
+    elapsed = time.perf_counter() - start
+
+    frames = len(corpus.frames) * repeat
+    result = {
+        "frames": frames,
+        "seconds": elapsed,
+        "frames_per_s": frames / elapsed if elapsed else 0.0,
+        "stages": {
+            stage: {
+                "calls": timer.calls[stage],
+                "total_us": timer.elapsed[stage] * 1e6,
+                "per_frame_us": timer.elapsed[stage] * 1e6 / frames,
+            }
+            for stage in timer.elapsed
+        },
+        "default_responses": dict(responses),
+    }
+
+    if trace_memory:
+        result["memory"] = await _trace_memory(replay_once, len(corpus.frames))
+
+    return result
+
+
+async def _trace_memory(replay_once: Callable, frame_count: int) -> Dict[str, float]:
+    """Measure the memory allocated by a pass over the corpus."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await replay_once()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    return {
+        "peak_bytes_per_frame": (peak - current) / frame_count,
+        "retained_bytes": sum(stat.size_diff for stat in diff),
+        "retained_blocks": sum(stat.count_diff for stat in diff),
+    }
+
+
+def format_report(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> str:
+    """Format a human readable summary, compared to a baseline if given."""
+    lines = [f"{'corpus':<12} {'frames/s':>10} {'peak B/frame':>13} {'vs base':>8}"]
+    for name, result in results.items():
+        peak = result.get("memory", {}).get("peak_bytes_per_frame", 0.0)
+        ratio = ""
+        if baseline and name in baseline and baseline[name]["frames_per_s"]:
+            ratio = f"{result['frames_per_s'] / baseline[name]['frames_per_s']:7.2f}x"
+        lines.append(
+            f"{name:<12} {result['frames_per_s']:10.0f} {peak:13.0f} {ratio:>8}"
+        )
+        for stage, stats in sorted(result["stages"].items()):
+            lines.append(f"  {stage:<30} {stats['per_frame_us']:9.2f} us/frame")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the replay through pytest, which builds the quirk instances."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--save", type=pathlib.Path, help="Save the results as JSON")
+    parser.add_argument("--compare", type=pathlib.Path, help="Baseline JSON")
+    args = parser.parse_args(argv)
+
+    import pytest
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = pathlib.Path(tmp) / "results.json"
+        os.environ[ENV_REPEAT] = str(args.repeat)
+        os.environ[ENV_OUTPUT] = str(output)
+        test = pathlib.Path(__file__).with_name("test_tuya_replay.py")
+        exit_code = pytest.main(
+            [f"{test}::test_replay_report", "-q", "-p", "no:cacheprovider"]
+        )
+        if exit_code:
+            return int(exit_code)
+        results = json.loads(output.read_text())
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print(format_report(results, baseline))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Micro-benchmark of the Xiaomi attribute report parser.
+
+Real Aqara heartbeat frames, some with wrong string lengths, are parsed by
+`XiaomiCluster.deserialize` and by the former recursive parser, kept here as
+the reference implementation. The former parser tried every length offset of
+every broken string recursively and parsed the fixed frame a second time.
+
+Usage::
+
+    python -m tests.benchmarks.xiaomi_reports --number 2000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from typing import Dict, Iterable, List, Optional, Tuple
+from unittest import mock
+
+from zigpy.zcl import Cluster, foundation
+
+from zhaquirks.xiaomi import BasicCluster, XiaomiCluster
+
+DEFAULT_NUMBER = 2000
+
+HEADER = foundation.ZCLHeader.general(
+    manufacturer=4447,
+    tsn=127,
+    command_id=foundation.GeneralCommand.Report_Attributes,
+).serialize()
+
+# (name, attribute report payload) of heartbeats received from real devices
+SAMPLES: List[Tuple[str, bytes]] = [
+    # lumi.weather, reported string length is right
+    (
+        "weather",
+        bytes.fromhex(
+            "01FF42250121630B0421A81305217D2F06240100000000642905006521631D662B4D7F0100"
+            "0A2157DE"
+        ),
+    ),
+    # lumi.sensor_magnet.aq2, string length one too short
+    (
+        "magnet",
+        bytes.fromhex(
+            "01FF421D0121D10B0328150421A8130521A200062403000000000A210000641000"
+        ),
+    ),
+    # lumi.sensor_motion.aq2 model report followed by a heartbeat
+    (
+        "motion",
+        bytes.fromhex(
+            "050042166C756D692E73656E736F725F6D6F74696F6E2E61713201FF42210121950B032816"
+            "0421A83105214400062401000000000A217CBE6410000B210900"
+        ),
+    ),
+    # lumi.plug, GH issue #811
+    (
+        "plug",
+        bytes.fromhex(
+            "01FF424403282305212E0008212E12092100106410006510006E20006F200094200295390A"
+            "078C41963999EB0C4597390030683B983980BB873C9B2100009C20010A2100000C280000"
+        ),
+    ),
+]
+# Heartbeats of several devices with a string length one too short, in one
+# frame. The former parser explores every offset combination of them.
+SAMPLES.append(("broken_x6", b"".join([SAMPLES[1][1]] * 6)))
+
+
+def legacy_interpret_attr_reports(
+    cluster: XiaomiCluster, data: bytes
+) -> Iterable[Tuple[foundation.Attribute, ...]]:
+    """Yield all valid interpretations of a report, like the former parser."""
+    if not data:
+        yield ()
+        return
+
+    try:
+        parsed = list(cluster._iter_parse_attr_report(data))
+    except (KeyError, ValueError):
+        return
+
+    for attr, remaining_data in parsed:
+        for remaining_attrs in legacy_interpret_attr_reports(cluster, remaining_data):
+            yield (attr,) + remaining_attrs
+
+
+def legacy_deserialize(cluster: XiaomiCluster, data: bytes):
+    """Deserialize a report by fixing, serializing and parsing it again."""
+    hdr, data = foundation.ZCLHeader.deserialize(data)
+    reports = list(legacy_interpret_attr_reports(cluster, data))
+    if not reports:
+        return Cluster.deserialize(cluster, hdr.serialize() + data)
+
+    fixed_data = b"".join(attr.serialize() for attr in reports[0])
+    return Cluster.deserialize(cluster, hdr.serialize() + fixed_data)
+
+
+def make_cluster() -> XiaomiCluster:
+    """Return a cluster to parse the samples with."""
+    return BasicCluster(mock.MagicMock())
+
+
+def measure(number: int = DEFAULT_NUMBER) -> Dict[str, Dict[str, float]]:
+    """Time parsing each sample, in microseconds per frame."""
+    cluster = make_cluster()
+    result = {}
+
+    with mock.patch("zhaquirks.xiaomi._LOGGER"):
+        for name, payload in SAMPLES:
+            frame = HEADER + payload
+            legacy = min(
+                timeit.repeat(
+                    lambda: legacy_deserialize(cluster, frame), number=number, repeat=3
+                )
+            )
+            current = min(
+                timeit.repeat(
+                    lambda: cluster.deserialize(frame), number=number, repeat=3
+                )
+            )
+            result[name] = {
+                "legacy_us": legacy / number * 1e6,
+                "current_us": current / number * 1e6,
+                "speedup": legacy / current if current else 0.0,
+            }
+
+    return result
+
+
+def format_report(result: Dict[str, Dict[str, float]]) -> str:
+    """Format a human readable summary of a measurement."""
+    lines = [f"{'frame':<10} {'legacy us':>10} {'memo us':>10} {'speedup':>8}"]
+    for name, stats in result.items():
+        lines.append(
+            f"{name:<10} {stats['legacy_us']:10.1f} {stats['current_us']:10.1f} "
+            f"{stats['speedup']:7.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=DEFAULT_NUMBER)
+    args = parser.parse_args(argv)
+
+    print(format_report(measure(args.number)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 """Quirks common helpers."""
 import asyncio
 import datetime
+import subprocess
+import sys
+import textwrap
 
 ZCL_IAS_MOTION_COMMAND = b"\t!\x00\x01\x00\x00\x00\x00\x00"
 ZCL_OCC_ATTR_RPT_OCC = b"\x18d\n\x00\x00\x18\x01"
@@ -42,13 +45,30 @@ class MockDatetime(datetime.datetime):
 
 async def wait_for_zigpy_tasks() -> None:
     """Wait for all running zigpy tasks to finish."""
+    # let callbacks scheduled with call_soon create their tasks first
+    await asyncio.sleep(0)
     tasks = []
 
     for task in asyncio.all_tasks():
         coro = task.get_coro()
 
         # TODO: track tasks within zigpy
-        if "CatchingTaskMixin" in coro.__qualname__:
+        if "CatchingTaskMixin" in coro.__qualname__ or coro.__qualname__.startswith(
+            "TuyaSendQueue."
+        ):
             tasks.append(task)
 
     await asyncio.gather(*tasks)
+
+
+def run_in_fresh_interpreter(code: str) -> str:
+    """Run code in a new interpreter, quirk modules must not be imported yet."""
+
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        capture_output=True,
+        check=False,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
@@ -1,6 +1,6 @@
 """Fixtures for all tests."""
 
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
 import zigpy.application
@@ -9,6 +9,7 @@ import zigpy.quirks
 import zigpy.types
 import zigpy.zcl.foundation as foundation
 
+import zhaquirks
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -80,6 +81,38 @@ class MockApp(zigpy.application.ControllerApplication):
     request = AsyncMock(return_value=(foundation.Status.SUCCESS, None))
 
 
+class FakeClock:
+    """Clock advanced by the tests."""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        """Init."""
+        self.now = now
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward."""
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock():
+    """Fake monotonic clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def reset_timers(fake_clock):
+    """Reset timer wheel of the motion and occupancy clusters, on a fake clock."""
+    wheel = zhaquirks.TimerWheel(clock=fake_clock)
+    with patch.object(zhaquirks._Motion, "timer_wheel", wheel), patch.object(
+        zhaquirks._Occupancy, "timer_wheel", wheel
+    ):
+        yield wheel
+
+
 @pytest.fixture(name="MockAppController")
 def app_controller_mock():
     """App controller mock."""
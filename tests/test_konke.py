@@ -1,6 +1,5 @@
 """Tests for konke quirks."""
 
-import asyncio
 from unittest import mock
 
 import pytest
@@ -26,7 +25,7 @@ zhaquirks.setup()
 @pytest.mark.parametrize(
     "quirk", (zhaquirks.konke.motion.KonkeMotion, zhaquirks.konke.motion.KonkeMotionB)
 )
-async def test_konke_motion(zigpy_device_from_quirk, quirk):
+async def test_konke_motion(zigpy_device_from_quirk, quirk, fake_clock, reset_timers):
     """Test konke motion sensor."""
 
     motion_dev = zigpy_device_from_quirk(quirk)
@@ -54,7 +53,8 @@ async def test_konke_motion(zigpy_device_from_quirk, quirk):
     assert occupancy_listener.attribute_updates[0][0] == 0x0000
     assert occupancy_listener.attribute_updates[0][1] == 1
 
-    await asyncio.sleep(0.1)
+    fake_clock.advance(1)
+    reset_timers.run_due()
 
     assert len(motion_listener.cluster_commands) == 2
     assert motion_listener.cluster_commands[1][1] == ZONE_STATE
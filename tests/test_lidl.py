@@ -0,0 +1,39 @@
+"""Tests for Lidl quirks."""
+
+from unittest import mock
+
+import zigpy.zcl
+from zigpy.zcl.clusters.general import Basic
+
+import zhaquirks
+import zhaquirks.lidl.ts011f_plug
+from zhaquirks.tuya.mcu import TuyaSpellScheduler
+
+zhaquirks.setup()
+
+
+async def test_lidl_basic_bind_spell(zigpy_device_mock):
+    """Test binding casts the magic spell again through the spell scheduler."""
+
+    device = zigpy_device_mock()
+    endpoint = device.add_endpoint(1)
+    basic_cluster = zhaquirks.lidl.ts011f_plug.TuyaBasicCluster(endpoint)
+    endpoint.add_input_cluster(Basic.cluster_id, basic_cluster)
+
+    scheduler = TuyaSpellScheduler(jitter=0)
+    scheduler._completed[str(device.ieee)] = device.nwk
+
+    with mock.patch(
+        "zhaquirks.lidl.ts011f_plug.TUYA_SPELL_SCHEDULER", scheduler
+    ), mock.patch.object(
+        basic_cluster, "read_attributes", autospec=True, return_value=({}, {})
+    ) as read_attributes, mock.patch.object(
+        zigpy.zcl.Cluster, "bind", new_callable=mock.AsyncMock
+    ) as bind:
+        await basic_cluster.bind()
+
+    assert not scheduler.failed
+    assert read_attributes.call_count == 1
+    assert read_attributes.call_args.kwargs.get("tries", 1) == 1
+    assert bind.call_count == 1
+    assert scheduler.completed == {str(device.ieee): device.nwk}
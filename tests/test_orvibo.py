@@ -1,6 +1,5 @@
 """Tests for Orvibo quirks."""
 
-import asyncio
 from unittest import mock
 
 import pytest
@@ -15,7 +14,7 @@ zhaquirks.setup()
 
 
 @pytest.mark.parametrize("quirk", (zhaquirks.orvibo.motion.SN10ZW,))
-async def test_orvibo_motion(zigpy_device_from_quirk, quirk):
+async def test_orvibo_motion(zigpy_device_from_quirk, quirk, fake_clock, reset_timers):
     """Test Orvibo motion sensor."""
 
     motion_dev = zigpy_device_from_quirk(quirk)
@@ -43,7 +42,8 @@ async def test_orvibo_motion(zigpy_device_from_quirk, quirk):
     assert occupancy_listener.attribute_updates[0][0] == 0x0000
     assert occupancy_listener.attribute_updates[0][1] == 1
 
-    await asyncio.sleep(0.1)
+    fake_clock.advance(1)
+    reset_timers.run_due()
 
     assert len(motion_listener.cluster_commands) == 2
     assert motion_listener.cluster_commands[1][1] == ZONE_STATE
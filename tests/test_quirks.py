@@ -1,10 +1,13 @@
 """General quirk tests."""
 from __future__ import annotations
 
+import asyncio
 import collections
 import importlib
 import json
+import os
 from pathlib import Path
+import sys
 from unittest import mock
 
 import pytest
@@ -48,8 +51,13 @@ from zhaquirks.const import (
     PROFILE_ID,
     SKIP_CONFIGURATION,
 )
+from zhaquirks.custom_quirks import load_custom_quirks
+import zhaquirks.manifest
+import zhaquirks.tuya.mcu
 from zhaquirks.xiaomi import XIAOMI_NODE_DESC
 
+from tests.common import run_in_fresh_interpreter
+
 zhaquirks.setup()
 
 ALL_QUIRK_CLASSES = []
@@ -705,3 +713,469 @@ def test_attributes_updated_not_replaced(quirk: CustomDevice) -> None:
                     f"Cluster {cluster} deletes parent class's attributes instead of"
                     f" extending them: {base_cluster}"
                 )
+
+
+def test_quirk_manifest_up_to_date() -> None:
+    """Ensure the shipped quirk manifest matches the registered quirks."""
+
+    with open(zhaquirks.manifest.MANIFEST_PATH, encoding="utf-8") as manifest_file:
+        shipped = json.load(manifest_file)
+
+    # The registry order depends on the order tests import quirk modules in, it is
+    # checked against a fresh eager setup by `test_lazy_registry_order`
+    manifest = zhaquirks.manifest.build_manifest()
+    del shipped["registry_order"], manifest["registry_order"]
+
+    assert shipped == manifest, (
+        "The quirk manifest is out of date, regenerate it with"
+        " `python -m zhaquirks.manifest`"
+    )
+
+
+def test_lazy_registry_imports_on_lookup() -> None:
+    """Ensure the lazy registry only imports the modules of the model looked up."""
+
+    manifest = zhaquirks.manifest.QuirkManifest.load()
+    loader = zhaquirks.manifest.LazyQuirkLoader(manifest)
+    registry = zq.DeviceRegistry()
+    real_import_module = importlib.import_module
+
+    # Quirk modules are already imported, register their quirks like a fresh import
+    def _import_module(modname):
+        module = real_import_module(modname)
+        for value in vars(module).values():
+            if (
+                isinstance(value, type)
+                and issubclass(value, CustomDevice)
+                and value.__module__ == modname
+            ):
+                registry.add_to_registry(value)
+        return module
+
+    zhaquirks.manifest.install_lazy_registry(loader, registry=registry)
+
+    with mock.patch(
+        "zhaquirks.manifest.importlib.import_module", side_effect=_import_module
+    ) as import_module:
+        quirks = registry.registry[zhaquirks.bosch.BOSCH]["ISW-ZPR1-WP13"]
+        assert quirks == [zhaquirks.bosch.motion.ISWZPR1WP13]
+        assert import_module.mock_calls == [mock.call("zhaquirks.bosch.motion")]
+
+        # Modules are only imported once
+        registry.registry[zhaquirks.bosch.BOSCH]["ISW-ZPR1-WP13"]
+        registry.registry["Unknown manufacturer"]["Unknown model"]
+        assert import_module.call_count == 1
+
+    assert loader.loaded_modules == {"zhaquirks.bosch.motion"}
+
+
+def test_lazy_registry_import_cycle() -> None:
+    """Ensure quirk modules importing each other can be loaded lazily."""
+
+    # `zhaquirks.lidl.ts011f_plug` imports `zhaquirks.tuya.ts011f_plug`, which
+    # registers quirks for the very same (manufacturer, model) pair
+    output = run_in_fresh_interpreter(
+        """
+        import zigpy.quirks
+
+        import zhaquirks
+
+        zhaquirks.setup(lazy=True)
+        quirks = zigpy.quirks.get_quirk_list("_TZ3000_3zofvcaa", "TS011F")
+        print(quirks[0].__module__, quirks[0].__name__)
+        """
+    )
+
+    assert output.split() == ["zhaquirks.tuya.ts011f_plug", "Plug_2AC_2USB"]
+
+
+def test_lazy_registry_setup_twice() -> None:
+    """Ensure a second lazy setup keeps the registry installed by the first."""
+
+    output = run_in_fresh_interpreter(
+        """
+        import zigpy.quirks
+
+        import zhaquirks
+
+        registry = zigpy.quirks._DEVICE_REGISTRY
+        zhaquirks.setup(lazy=True)
+        add_to_registry = registry.add_to_registry
+        storage = registry.registry
+
+        zhaquirks.setup(lazy=True)
+        assert registry.add_to_registry is add_to_registry
+        assert registry.registry is storage
+
+        quirks = zigpy.quirks.get_quirk_list("_TZ3000_3zofvcaa", "TS011F")
+        assert len(quirks) == len(set(quirks))
+        print(len(quirks))
+        """
+    )
+
+    assert int(output) > 0
+
+
+def test_lazy_registry_order() -> None:
+    """Ensure the lazy registry orders quirks like an eager setup."""
+
+    code = """
+        import json
+
+        import zigpy.quirks
+
+        import zhaquirks
+        import zhaquirks.manifest
+
+        zhaquirks.setup(lazy={lazy})
+
+        with open(zhaquirks.manifest.MANIFEST_PATH, encoding="utf-8") as file:
+            manifest = json.load(file)
+
+        keys = sorted(
+            {{
+                (manufacturer, model)
+                for quirks in manifest["modules"].values()
+                for quirk in quirks
+                for manufacturer, model in quirk["models"]
+            }},
+            key=json.dumps,
+        )
+        print(
+            json.dumps(
+                [
+                    [
+                        manufacturer,
+                        model,
+                        [
+                            zhaquirks.manifest.quirk_id(quirk)
+                            for quirk in zigpy.quirks.get_quirk_list(
+                                manufacturer, model
+                            )
+                        ],
+                    ]
+                    for manufacturer, model in keys
+                ]
+            )
+        )
+    """
+
+    eager = json.loads(run_in_fresh_interpreter(code.format(lazy=False)))
+    lazy = json.loads(run_in_fresh_interpreter(code.format(lazy=True)))
+
+    assert lazy == eager
+
+
+async def test_lazy_setup(zigpy_device_from_quirk: CustomDevice) -> None:
+    """Ensure quirks are still matched after a lazy setup."""
+
+    device = zigpy_device_from_quirk(
+        zhaquirks.konke.motion.KonkeMotion, apply_quirk=False
+    )
+
+    zhaquirks.setup(lazy=True)
+    assert type(zq.get_device(device)) is zhaquirks.konke.motion.KonkeMotion
+
+
+def test_lazy_setup_without_manifest(tmp_path: Path, caplog) -> None:
+    """Ensure a missing manifest falls back to loading every quirk."""
+
+    with mock.patch.object(
+        zhaquirks.manifest, "MANIFEST_PATH", tmp_path / "missing.json"
+    ):
+        zhaquirks.setup(lazy=True)
+
+    assert "loading all quirks eagerly" in caplog.text
+
+
+def test_setup_vendor_filter(caplog) -> None:
+    """Ensure only the modules of included, non-excluded vendors are loaded."""
+
+    with mock.patch(
+        "zhaquirks.importlib.import_module", wraps=importlib.import_module
+    ) as import_module:
+        zhaquirks.setup(include=["tuya", "xiaomi", "foobar"], exclude=["xiaomi"])
+
+    modules = {call.args[0] for call in import_module.mock_calls}
+    vendors = {m.split(".")[1] for m in modules if m.count(".") > 1}
+
+    assert vendors == {"tuya"}
+    assert {"zhaquirks.const", "zhaquirks.tuya", "zhaquirks.tuya.mcu"} <= modules
+    assert "zhaquirks.tuya.ts0601_trv" in modules
+    assert "zhaquirks.xiaomi" not in modules
+    assert "zhaquirks.xbee" not in modules
+    assert "Unknown quirk vendor packages: ['foobar']" in caplog.text
+
+
+def test_setup_vendor_filter_dependencies() -> None:
+    """Ensure quirk modules imported by included vendors are registered too."""
+
+    output = run_in_fresh_interpreter(
+        """
+        import zigpy.quirks
+
+        import zhaquirks
+
+        zhaquirks.setup(include=["lidl"])
+        for quirk in zigpy.quirks.get_quirk_list(None, "TS011F"):
+            print(quirk.__module__)
+        """
+    )
+
+    assert set(output.split()) == {
+        "zhaquirks.lidl.ts011f_plug",
+        "zhaquirks.tuya.ts011f_plug",
+    }
+
+
+def test_lazy_registry_vendor_filter() -> None:
+    """Ensure the lazy registry never imports modules of filtered out vendors."""
+
+    loader = zhaquirks.manifest.LazyQuirkLoader(
+        zhaquirks.manifest.QuirkManifest.load(),
+        module_filter=lambda modname: not modname.startswith("zhaquirks.bosch."),
+    )
+    registry = zq.DeviceRegistry()
+    zhaquirks.manifest.install_lazy_registry(loader, registry=registry)
+
+    with mock.patch("zhaquirks.manifest.importlib.import_module") as import_module:
+        assert registry.registry[zhaquirks.bosch.BOSCH]["ISW-ZPR1-WP13"] == []
+
+    assert import_module.call_count == 0
+    assert not loader.loaded_modules
+
+
+def test_setup_from_config() -> None:
+    """Ensure the ZHA configuration is passed on to setup."""
+
+    with mock.patch("zhaquirks.setup") as setup:
+        zhaquirks.setup_from_config(
+            {
+                const.CONF_CUSTOM_QUIRKS_PATH: "/config/custom_quirks",
+                const.CONF_INCLUDE_VENDORS: ["tuya", "ikea"],
+                const.CONF_EXCLUDE_VENDORS: ["xbee"],
+                const.CONF_LAZY_QUIRKS: True,
+            }
+        )
+        zhaquirks.setup_from_config({})
+
+    assert setup.mock_calls == [
+        mock.call(
+            custom_quirks_path="/config/custom_quirks",
+            lazy=True,
+            include=["tuya", "ikea"],
+            exclude=["xbee"],
+        ),
+        mock.call(custom_quirks_path=None, lazy=False, include=None, exclude=None),
+    ]
+
+
+def test_setup_from_config_tuya_spell_progress(tmp_path: Path) -> None:
+    """Ensure the Tuya spell progress is kept in the configured file."""
+
+    progress_path = tmp_path / "tuya_spells.json"
+    progress_path.write_text('{"00:11:22:33:44:55:66:77": 1234}', encoding="utf-8")
+    scheduler = zhaquirks.tuya.mcu.TuyaSpellScheduler()
+
+    with mock.patch("zhaquirks.setup"), mock.patch(
+        "zhaquirks.tuya.mcu.TUYA_SPELL_SCHEDULER", scheduler
+    ):
+        zhaquirks.setup_from_config(
+            {const.CONF_TUYA_SPELL_PROGRESS_PATH: str(progress_path)}
+        )
+
+    assert scheduler.progress_path == str(progress_path)
+    assert scheduler.completed == {"00:11:22:33:44:55:66:77": 1234}
+
+
+def test_custom_quirks_cache(tmp_path: Path) -> None:
+    """Ensure unchanged custom quirks are loaded from the cache."""
+
+    custom_quirks = tmp_path / "custom_zha_quirks"
+    custom_quirks.mkdir()
+    (custom_quirks / "cached_pkg").mkdir()
+    (custom_quirks / "cached_pkg/__init__.py").touch()
+    quirk = custom_quirks / "cached_pkg/quirk.py"
+    quirk.write_text("VALUE = 1\n")
+    (custom_quirks / "broken_quirk.py").write_text("1/")
+
+    def _load():
+        result = load_custom_quirks(custom_quirks)
+        return {module.name: module for module in result.modules}
+
+    modules = _load()
+    assert list(modules) == ["broken_quirk", "cached_pkg", "cached_pkg.quirk"]
+    assert isinstance(modules["broken_quirk"].error, SyntaxError)
+    assert modules["cached_pkg.quirk"].loaded
+    assert not modules["cached_pkg.quirk"].cached
+    assert modules["cached_pkg.quirk"].path == quirk
+
+    # Unchanged files are not compiled again
+    modules = _load()
+    assert modules["cached_pkg"].cached
+    assert modules["cached_pkg.quirk"].cached
+    assert not modules["broken_quirk"].cached
+
+    # Neither are touched files with the same content
+    stat = quirk.stat()
+    os.utime(quirk, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert _load()["cached_pkg.quirk"].cached
+
+    quirk.write_text("VALUE = 2\n")
+    modules = _load()
+    assert not modules["cached_pkg.quirk"].cached
+    assert sys.modules["cached_pkg.quirk"].VALUE == 2
+
+
+def test_custom_quirks_cache_write_failure(tmp_path: Path) -> None:
+    """Ensure the index never points to code files that failed to be written."""
+
+    custom_quirks = tmp_path / "custom_zha_quirks"
+    custom_quirks.mkdir()
+    quirk = custom_quirks / "quirk.py"
+    quirk.write_text("VALUE = 1\n")
+    load_custom_quirks(custom_quirks)
+
+    quirk.write_text("VALUE = 22\n")
+    with mock.patch("zhaquirks.custom_quirks.os.replace", side_effect=OSError):
+        result = load_custom_quirks(custom_quirks)
+
+    assert not result.modules[0].cached
+    assert sys.modules["quirk"].VALUE == 22
+    assert not list((custom_quirks / "__pycache__").glob("*.tmp"))
+
+    # The old code file is not picked up, even if the file is touched back
+    stat = quirk.stat()
+    os.utime(quirk, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    result = load_custom_quirks(custom_quirks)
+    assert not result.modules[0].cached
+    assert sys.modules["quirk"].VALUE == 22
+
+    assert load_custom_quirks(custom_quirks).modules[0].cached
+
+
+def test_custom_quirks_failed_package(tmp_path: Path) -> None:
+    """Ensure submodules of a package failing to load are skipped."""
+
+    custom_quirks = tmp_path / "custom_zha_quirks"
+    custom_quirks.mkdir()
+    (custom_quirks / "broken_pkg").mkdir()
+    (custom_quirks / "broken_pkg/__init__.py").write_text("1/")
+    (custom_quirks / "broken_pkg/quirk.py").write_text("VALUE = 1\n")
+    (custom_quirks / "broken_pkg/sub").mkdir()
+    (custom_quirks / "broken_pkg/sub/__init__.py").touch()
+    (custom_quirks / "broken_pkg/sub/quirk.py").write_text("VALUE = 1\n")
+    (custom_quirks / "working_quirk.py").write_text("VALUE = 1\n")
+
+    result = load_custom_quirks(custom_quirks)
+
+    assert [module.name for module in result.modules] == [
+        "broken_pkg",
+        "working_quirk",
+    ]
+    assert [module.name for module in result.failed] == ["broken_pkg"]
+    assert result.failed[0].skipped == [
+        "broken_pkg.quirk",
+        "broken_pkg.sub",
+        "broken_pkg.sub.quirk",
+    ]
+    assert "broken_pkg.quirk" not in sys.modules
+
+
+def test_custom_quirks_result(tmp_path: Path) -> None:
+    """Ensure setup reports the outcome of loading each custom quirk."""
+
+    custom_quirks = tmp_path / "custom_zha_quirks"
+    custom_quirks.mkdir()
+    (custom_quirks / "working_quirk.py").write_text("VALUE = 1\n")
+    (custom_quirks / "failing_quirk.py").write_text("from os import foobarbaz7")
+
+    result = zhaquirks.setup(custom_quirks_path=str(custom_quirks))
+
+    assert [module.name for module in result.loaded] == ["working_quirk"]
+    assert [module.name for module in result.failed] == ["failing_quirk"]
+    assert isinstance(result.failed[0].error, ImportError)
+    assert result.load_time >= 0
+    assert zhaquirks.setup() is None
+
+
+async def test_timer_wheel(fake_clock) -> None:
+    """Test timers run once their slot expired, and are re-armed in place."""
+
+    wheel = zhaquirks.TimerWheel(clock=fake_clock)
+    calls = []
+
+    def first():
+        calls.append("first")
+
+    def second():
+        calls.append("second")
+
+    wheel.call_later(30, first)
+    wheel.call_later(5.5, second)
+    assert wheel.pending == 2
+
+    # re-arming moves the timer to another slot
+    fake_clock.advance(4)
+    wheel.call_later(5.5, second)
+    assert wheel.pending == 2
+
+    # rounded up to the next slot, never early
+    fake_clock.advance(5.5)
+    assert wheel.run_due() == 0
+
+    fake_clock.advance(0.5)
+    assert wheel.run_due() == 1
+    assert calls == ["second"]
+    assert wheel.pending == 1
+
+    assert wheel.cancel(first) is True
+    assert wheel.cancel(first) is False
+    assert wheel.pending == 0
+
+    fake_clock.advance(60)
+    assert wheel.run_due() == 0
+    assert calls == ["second"]
+
+
+async def test_timer_wheel_callbacks(fake_clock) -> None:
+    """Test callbacks re-arming or failing do not disturb the other timers."""
+
+    wheel = zhaquirks.TimerWheel(clock=fake_clock)
+    calls = []
+
+    def rearm():
+        calls.append("rearm")
+        wheel.call_later(0, rearm)
+
+    def fail():
+        raise RuntimeError("timer failed")
+
+    def last():
+        calls.append("last")
+
+    wheel.call_later(1, rearm)
+    wheel.call_later(1, fail)
+    wheel.call_later(1, last)
+
+    # a large jump only visits the pending slots
+    fake_clock.advance(10_000)
+    assert wheel.run_due() == 3
+    assert calls == ["rearm", "last"]
+    assert wheel.pending == 1
+
+    fake_clock.advance(1)
+    assert wheel.run_due() == 1
+    assert calls == ["rearm", "last", "rearm"]
+
+
+async def test_timer_wheel_ticks() -> None:
+    """Test the wheel ticks on the event loop while timers are pending."""
+
+    wheel = zhaquirks.TimerWheel(resolution=0.01)
+    fired = asyncio.Event()
+
+    wheel.call_later(0.01, fired.set)
+    await asyncio.wait_for(fired.wait(), timeout=1)
+
+    assert wheel.pending == 0
@@ -22,14 +22,22 @@ from zhaquirks.const import (
     PROFILE_ID,
     ZONE_STATE,
 )
-from zhaquirks.tuya import Data, TuyaManufClusterAttributes, TuyaNewManufCluster
+from zhaquirks.tuya import (
+    Data,
+    TuyaManufClusterAttributes,
+    TuyaNewManufCluster,
+    TuyaReportAggregation,
+    TuyaReportAggregator,
+)
 import zhaquirks.tuya.ts0042
 import zhaquirks.tuya.ts0043
 import zhaquirks.tuya.ts0501_fan_switch
+import zhaquirks.tuya.ts0601_din_power
 import zhaquirks.tuya.ts0601_electric_heating
 import zhaquirks.tuya.ts0601_motion
 import zhaquirks.tuya.ts0601_siren
 import zhaquirks.tuya.ts0601_trv
+import zhaquirks.tuya.ts0601_trv_sas
 import zhaquirks.tuya.ts0601_valve
 
 from tests.common import ClusterListener, MockDatetime, wait_for_zigpy_tasks
@@ -84,7 +92,7 @@ ZCL_TUYA_EHEAT_TARGET_TEMP = b"\t3\x01\x03\x05\x10\x02\x00\x04\x00\x00\x00\x15"
 
 
 @pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_motion.TuyaMotion,))
-async def test_motion(zigpy_device_from_quirk, quirk):
+async def test_motion(zigpy_device_from_quirk, quirk, fake_clock, reset_timers):
     """Test tuya motion sensor."""
 
     motion_dev = zigpy_device_from_quirk(quirk)
@@ -104,7 +112,8 @@ async def test_motion(zigpy_device_from_quirk, quirk):
     assert motion_listener.cluster_commands[0][1] == ZONE_STATE
     assert motion_listener.cluster_commands[0][2][0] == ON
 
-    await asyncio.gather(asyncio.sleep(0), asyncio.sleep(0), asyncio.sleep(0))
+    fake_clock.advance(1)
+    reset_timers.run_due()
 
     assert len(motion_listener.cluster_commands) == 2
     assert motion_listener.cluster_commands[1][1] == ZONE_STATE
@@ -710,6 +719,133 @@ async def test_valve_send_attribute(zigpy_device_from_quirk, quirk):
         assert status == foundation.Status.UNSUP_CLUSTER_COMMAND
 
 
+@pytest.mark.parametrize(
+    "quirk, attributes",
+    (
+        (
+            zhaquirks.tuya.ts0601_trv.SiterwellGS361_Type1,
+            {"child_lock": 1, "window_detection": 1},
+        ),
+        (
+            zhaquirks.tuya.ts0601_trv.MoesHY368_Type1,
+            {"child_lock": 1, "valve_detect": 1},
+        ),
+        (
+            zhaquirks.tuya.ts0601_trv.ZonnsmartTV01_ZG,
+            {"child_lock": 1, "window_detection": 1},
+        ),
+        (
+            zhaquirks.tuya.ts0601_trv_sas.Thermostat_TZE200_c88teujp,
+            {"state": 1, "schedule_enabled": 1},
+        ),
+    ),
+)
+async def test_valve_pipeline_writes(zigpy_device_from_quirk, quirk, attributes):
+    """Test the set_data commands of one TRV write are sent concurrently."""
+
+    valve_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = valve_dev.endpoints[1].tuya_manufacturer
+    events = []
+
+    async def async_success(*args, **kwargs):
+        events.append(("start", args[1]))
+        await asyncio.sleep(0)
+        events.append(("end", args[1]))
+        return foundation.Status.SUCCESS
+
+    with mock.patch.object(tuya_cluster.endpoint, "request", side_effect=async_success):
+        (status,) = await tuya_cluster.write_attributes(attributes)
+
+    assert status == [foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]
+    assert events == [("start", 1), ("start", 2), ("end", 1), ("end", 2)]
+
+
+async def test_valve_relative_setpoint_cached(zigpy_device_from_quirk):
+    """Test relative setpoint changes use the reported setpoint without a read."""
+
+    valve_dev = zigpy_device_from_quirk(zhaquirks.tuya.ts0601_trv.SiterwellGS361_Type1)
+    tuya_cluster = valve_dev.endpoints[1].tuya_manufacturer
+    thermostat_cluster = valve_dev.endpoints[1].thermostat
+
+    thermostat_cluster._update_attribute(
+        thermostat_cluster.attributes_by_name["occupied_heating_setpoint"].id, 2000
+    )
+    with mock.patch.object(
+        tuya_cluster.endpoint, "request", return_value=foundation.Status.SUCCESS
+    ) as request_mock, mock.patch.object(
+        thermostat_cluster, "read_attributes"
+    ) as read_mock:
+        _, status = await thermostat_cluster.command(0x0000, 0x00, 5)
+
+    assert status == foundation.Status.SUCCESS
+    assert read_mock.call_count == 0
+    assert request_mock.call_count == 1
+
+
+async def test_valve_sequential_writes(zigpy_device_from_quirk):
+    """Test clusters without pipelined writes wait for each set_data command."""
+
+    valve_dev = zigpy_device_from_quirk(zhaquirks.tuya.ts0601_trv.SiterwellGS361_Type1)
+    tuya_cluster = valve_dev.endpoints[1].tuya_manufacturer
+    events = []
+
+    async def async_success(*args, **kwargs):
+        events.append(("start", args[1]))
+        await asyncio.sleep(0)
+        events.append(("end", args[1]))
+        return foundation.Status.SUCCESS
+
+    with mock.patch.object(tuya_cluster, "pipeline_writes", False), mock.patch.object(
+        tuya_cluster.endpoint, "request", side_effect=async_success
+    ):
+        await tuya_cluster.write_attributes({"child_lock": 1, "window_detection": 1})
+
+    assert events == [("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+
+
+def test_moes_schedule_codec():
+    """Test schedule payloads decode into periods and encode back."""
+
+    trv = zhaquirks.tuya.ts0601_trv
+    payload = trv.data144(
+        [15, 0, 22, 20, 30, 17, 15, 30, 12, 15, 30, 11, 15, 0, 8, 20, 0, 6 | 0x80]
+    )
+
+    slots = trv.decode_moes_schedule(payload)
+    assert slots == (
+        trv.MoesScheduleSlot(6, 0, 2000),
+        trv.MoesScheduleSlot(8, 0, 1500),
+        trv.MoesScheduleSlot(11, 30, 1500),
+        trv.MoesScheduleSlot(12, 30, 1500),
+        trv.MoesScheduleSlot(17, 30, 2000),
+        trv.MoesScheduleSlot(22, 0, 1500),
+    )
+    # the current period indicator bit is not written back
+    encoded = trv.encode_moes_schedule(slots)
+    assert encoded == payload[:17] + [6]
+    assert encoded.serialize() == payload.serialize()[:17] + b"\x06"
+
+
+@pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_trv.MoesHY368_Type1,))
+async def test_moes_schedule_unchanged(zigpy_device_from_quirk, quirk):
+    """Test only changed schedule periods are updated."""
+
+    valve_dev = zigpy_device_from_quirk(quirk)
+    tuya_cluster = valve_dev.endpoints[1].tuya_manufacturer
+    thermostat_listener = ClusterListener(valve_dev.endpoints[1].thermostat)
+
+    hdr, args = tuya_cluster.deserialize(ZCL_TUYA_VALVE_WORKDAY_SCHEDULE)
+    tuya_cluster.handle_message(hdr, args)
+    assert len(thermostat_listener.attribute_updates) == 18
+
+    tuya_cluster.handle_message(hdr, args)
+    assert len(thermostat_listener.attribute_updates) == 18
+
+    args[0].data[2] = 45  # first period starts at 6:45
+    tuya_cluster.handle_message(hdr, args)
+    assert thermostat_listener.attribute_updates[18:] == [(0x4111, 45)]
+
+
 @pytest.mark.parametrize("quirk", (zhaquirks.tuya.ts0601_trv.MoesHY368_Type1,))
 async def test_moes(zigpy_device_from_quirk, quirk):
     """Test thermostatic valve outgoing commands."""
@@ -1527,3 +1663,153 @@ async def test_fan_switch_writes_attributes(zigpy_device_from_quirk, quirk):
             1,
             b"\x00\x01\x02\x01\x000\x00",
         )
+
+
+@pytest.mark.parametrize(
+    "set_time_offset, set_time_local_offset", ((1970, None), (2000, 1970), (2000, None))
+)
+def test_tuya_time_sync(set_time_offset, set_time_local_offset):
+    """Test cached set_time payloads match the per request encoding."""
+
+    class MockDatetimeMicro(MockDatetime):
+        second = 7
+
+        @classmethod
+        def utcnow(cls):
+            return cls(2023, 3, 4, 5, 6, cls.second, 890123)
+
+        @classmethod
+        def now(cls):
+            return cls(2023, 3, 4, 6, 6, cls.second, 890123)
+
+    time_sync = zhaquirks.tuya.TuyaTimeSync()
+
+    with mock.patch("datetime.datetime", MockDatetimeMicro):
+        utc_timestamp = int(
+            (
+                datetime.datetime.utcnow() - datetime.datetime(set_time_offset, 1, 1)
+            ).total_seconds()
+        )
+        local_timestamp = int(
+            (
+                datetime.datetime.now()
+                - datetime.datetime(set_time_local_offset or set_time_offset, 1, 1)
+            ).total_seconds()
+        )
+        expected = zhaquirks.tuya.TuyaTimePayload()
+        expected.extend(utc_timestamp.to_bytes(4, "big", signed=False))
+        expected.extend(local_timestamp.to_bytes(4, "big", signed=False))
+
+        payloads = [
+            time_sync.payload(set_time_offset, set_time_local_offset) for _ in range(3)
+        ]
+
+    assert all(payload == expected for payload in payloads)
+    assert all(type(payload) is zhaquirks.tuya.TuyaTimePayload for payload in payloads)
+    assert payloads[0].serialize() == expected.serialize()
+    assert payloads[0] is not payloads[1]
+    assert (time_sync.misses, time_sync.hits) == (1, 2)
+
+    # a new second computes the payload again
+    MockDatetimeMicro.second = 8
+    with mock.patch("datetime.datetime", MockDatetimeMicro):
+        payload = time_sync.payload(set_time_offset, set_time_local_offset)
+    assert time_sync.misses == 2
+    assert payload.serialize()[2:6] == (utc_timestamp + 1).to_bytes(4, "big")
+
+
+@pytest.mark.parametrize(
+    "settings, samples, reports",
+    (
+        (TuyaReportAggregation(), [1, 2, 2, 3], [1, 2, 2, 3]),
+        (TuyaReportAggregation(window=3, mode="min"), [5, 3, 4, 9, 8, 7], [3, 7]),
+        (TuyaReportAggregation(window=3, mode="max"), [5, 3, 4, 9, 8, 7], [5, 9]),
+        (TuyaReportAggregation(window=2, mode="mean"), [1, 2, 4, 4], [2, 4]),
+        (TuyaReportAggregation(window=2, mode="mean"), [1.0, 2.0], [1.5]),
+        (TuyaReportAggregation(deadband=5), [100, 104, 96, 105, 110], [100, 105, 110]),
+    ),
+)
+def test_tuya_report_aggregator(settings, samples, reports):
+    """Test window and deadband of the report aggregator."""
+
+    aggregator = TuyaReportAggregator(settings)
+    reported = [aggregator.add(sample) for sample in samples]
+    assert [value for value in reported if value is not None] == reports
+    assert aggregator.raw == samples[-1]
+
+
+def test_tuya_report_aggregator_rate_limit():
+    """Test the report aggregator holds back reports within min_interval."""
+
+    now = 100.0
+    aggregator = TuyaReportAggregator(
+        TuyaReportAggregation(min_interval=10), clock=lambda: now
+    )
+
+    assert aggregator.add(1) == 1
+    now += 5
+    assert aggregator.add(2) is None
+    now += 5
+    assert aggregator.add(3) == 3
+    now += 1
+    assert aggregator.add(4) is None
+
+    with pytest.raises(ValueError):
+        TuyaReportAggregation(mode="median")
+    with pytest.raises(ValueError):
+        TuyaReportAggregation(window=0)
+
+
+async def test_tuya_din_power_aggregation(zigpy_device_from_quirk, fake_clock):
+    """Test the default aggregation of the DIN power meter reports."""
+
+    with mock.patch("time.monotonic", fake_clock):
+        device = zigpy_device_from_quirk(zhaquirks.tuya.ts0601_din_power.TuyaPowerMeter)
+
+    tuya_cluster = device.endpoints[1].tuya_manufacturer
+    measurement = device.endpoints[1].electrical_measurement
+    listener = ClusterListener(measurement)
+    power_id = measurement.attributes_by_name["active_power"].id
+
+    def report_power(power, seconds=0):
+        fake_clock.advance(seconds)
+        tuya_cluster._update_attribute(
+            zhaquirks.tuya.ts0601_din_power.TUYA_POWER_ATTR, power
+        )
+
+    report_power(1000)
+    report_power(1050, 1)  # within min_interval
+    report_power(1004, 5)  # within deadband
+    report_power(1020)
+    tuya_cluster._update_attribute(
+        zhaquirks.tuya.ts0601_din_power.TUYA_VOLTAGE_ATTR, 2300
+    )
+
+    assert listener.attribute_updates == [
+        (power_id, 100),
+        (power_id, 102),
+        (measurement.VOLTAGE_ID, 230.0),
+    ]
+    # aggregated values keep the attribute type
+    assert type(measurement.get("active_power")) is t.int16s
+    assert measurement.raw_value("active_power") == 102.0
+    assert measurement.raw_value(measurement.VOLTAGE_ID) == 230.0
+    assert measurement.held_reports[power_id] == 2
+
+
+async def test_tuya_aggregation_mean_type(zigpy_device_from_quirk):
+    """Test a mean of integer attribute samples is reported as an integer."""
+
+    with mock.patch.object(
+        zhaquirks.tuya.ts0601_din_power.TuyaPowerMeasurement,
+        "report_aggregation",
+        {"active_power": TuyaReportAggregation(window=2, mode="mean")},
+    ):
+        device = zigpy_device_from_quirk(zhaquirks.tuya.ts0601_din_power.TuyaPowerMeter)
+
+    measurement = device.endpoints[1].electrical_measurement
+    measurement.power_reported(100.0)
+    measurement.power_reported(103.0)
+
+    assert measurement.get("active_power") == 102
+    assert type(measurement.get("active_power")) is t.int16s
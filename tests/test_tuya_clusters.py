@@ -3,7 +3,9 @@
 from unittest import mock
 
 import pytest
+from zigpy.quirks import CustomCluster
 import zigpy.types as t
+from zigpy.zcl.clusters.general import OnOff
 import zigpy.zcl.foundation as zcl_f
 
 from zhaquirks.tuya import (
@@ -11,10 +13,14 @@ from zhaquirks.tuya import (
     TUYA_GET_DATA,
     TUYA_SET_DATA_RESPONSE,
     TUYA_SET_TIME,
+    DPToAttributeMapping,
     TuyaCommand,
     TuyaData,
     TuyaDatapointData,
+    TuyaManufCluster,
     TuyaNewManufCluster,
+    TuyaPowerConfigurationCluster,
+    iter_tuya_datapoints,
 )
 
 
@@ -254,8 +260,13 @@ def test_tuya_cluster_request(
     hdr = zcl_f.ZCLHeader.general(1, cmd_id, direction=zcl_f.Direction.Client_to_Server)
     hdr.frame_control.disable_default_response = False
 
-    with mock.patch.object(TuyaCluster, handler_name) as handler:
-        handler.return_value = mock.sentinel.status
+    # handlers are bound when the cluster is created
+    assert TuyaCluster._client_command_handlers[cmd_id] == getattr(
+        TuyaCluster, handler_name
+    )
+
+    handler = mock.MagicMock(return_value=mock.sentinel.status)
+    with mock.patch.dict(TuyaCluster._client_command_handlers, {cmd_id: handler}):
         TuyaCluster.handle_cluster_request(hdr, args)
         assert handler.call_count == 1
         assert default_rsp_mock.call_count == 1
@@ -291,3 +302,190 @@ def test_tuya_cluster_request_no_handler(default_rsp_mock, TuyaCluster):
 
     assert default_rsp_mock.call_count == 1
     assert default_rsp_mock.call_args[1]["status"] == zcl_f.Status.UNSUP_CLUSTER_COMMAND
+
+
+def test_tuya_data_point_handlers_checked():
+    """Test unknown datapoint handlers fail at class creation."""
+
+    with pytest.raises(TypeError, match="no_such_handler"):
+
+        class BadCluster(TuyaNewManufCluster):
+            data_point_handlers = {1: "no_such_handler"}
+
+    class Cluster(TuyaNewManufCluster):
+        data_point_handlers = {1: "_dp_2_attr_update"}
+
+    assert Cluster.data_point_handlers == {1: "_dp_2_attr_update"}
+
+
+def test_tuya_dp_to_attribute_compiled():
+    """Test dp_to_attribute is checked and its handlers derived at class creation."""
+
+    class Cluster(TuyaNewManufCluster):
+        attributes = {0xEF01: ("dp_1", t.uint8_t, True)}
+        dp_to_attribute = {
+            1: DPToAttributeMapping(TuyaNewManufCluster.ep_attribute, "dp_1"),
+            2: DPToAttributeMapping(
+                TuyaPowerConfigurationCluster.ep_attribute,
+                ("battery_voltage", "battery_percentage_remaining"),
+                lambda x: (x // 10, x * 2),
+                endpoint_id=2,
+            ),
+            3: DPToAttributeMapping("smartenergy_metering", "get_profile"),
+        }
+        data_point_handlers = {4: "_dp_2_attr_update"}
+
+    # datapoint 3 is mapped to a command, it is only sent
+    assert Cluster.data_point_handlers == {
+        1: "_dp_2_attr_update",
+        2: "_dp_2_attr_update",
+        4: "_dp_2_attr_update",
+    }
+    plans = Cluster._dp_plans_cache[1]
+    assert plans[1].local
+    assert plans[1].attribute_names == ("dp_1",)
+    assert not plans[2].local
+    assert plans[2].multiple
+    assert plans[2].endpoint_id == 2
+
+    assert plans[1].verified and plans[2].verified
+
+    with pytest.raises(
+        TypeError, match="datapoint 1 maps to unknown 'tuya_manufacturer'"
+    ):
+
+        class BadAttributeCluster(TuyaNewManufCluster):
+            dp_to_attribute = {
+                1: DPToAttributeMapping(TuyaNewManufCluster.ep_attribute, "no_such")
+            }
+
+    with pytest.raises(TypeError, match="datapoint 1 maps to unknown 'on_off'"):
+
+        class BadStandardAttributeCluster(TuyaNewManufCluster):
+            dp_to_attribute = {1: DPToAttributeMapping(OnOff.ep_attribute, "of_off")}
+
+    # Clusters unknown yet may be custom clusters of the quirk, checked on reports
+    class CustomTargetCluster(TuyaNewManufCluster):
+        dp_to_attribute = {2: DPToAttributeMapping("no_such", "on_off")}
+
+    plans = CustomTargetCluster._dp_plans_cache[1]
+    assert not plans[2].verified
+    assert CustomTargetCluster.data_point_handlers == {2: "_dp_2_attr_update"}
+
+
+def test_tuya_dp_to_attribute_unknown_target_attribute(zigpy_device_mock):
+    """Test reports of datapoints mapped to unknown attributes are skipped."""
+
+    class TuyaCluster(TuyaNewManufCluster):
+        dp_to_attribute = {
+            1: DPToAttributeMapping("custom_on_off", "no_such_attr"),
+            2: DPToAttributeMapping("custom_on_off", "on_off"),
+        }
+
+    class CustomOnOff(CustomCluster, OnOff):
+        ep_attribute = "custom_on_off"
+
+    endpoint = zigpy_device_mock().add_endpoint(1)
+    on_off = endpoint.add_input_cluster(OnOff.cluster_id, CustomOnOff(endpoint))
+    cluster = TuyaCluster(endpoint)
+
+    with mock.patch.object(on_off, "update_attribute") as update_attribute:
+        for dp in (1, 2):
+            cluster._dp_2_attr_update(
+                TuyaDatapointData(dp, TuyaData(1, 0, b"\x01\x01"))
+            )
+
+    assert update_attribute.mock_calls == [mock.call("on_off", True)]
+
+
+def test_tuya_dp_plans_compiled_once(zigpy_device_mock):
+    """Test datapoint reports don't walk dp_to_attribute."""
+
+    class WatchedMappings(dict):
+        items_calls = 0
+
+        def items(self):
+            WatchedMappings.items_calls += 1
+            return super().items()
+
+        def __iter__(self):
+            raise AssertionError("dp_to_attribute iterated")
+
+    class TuyaCluster(TuyaNewManufCluster):
+        dp_to_attribute = {1: DPToAttributeMapping(OnOff.ep_attribute, "on_off")}
+
+    endpoint = zigpy_device_mock().add_endpoint(1)
+    on_off = endpoint.add_input_cluster(OnOff.cluster_id)
+    cluster = TuyaCluster(endpoint)
+    cluster.dp_to_attribute = WatchedMappings(TuyaCluster.dp_to_attribute)
+    report = TuyaDatapointData(1, TuyaData(1, 0, b"\x01\x01"))
+
+    with mock.patch.object(on_off, "update_attribute") as update_attribute:
+        cluster._dp_2_attr_update(report)
+        items_calls = WatchedMappings.items_calls
+        for _ in range(10):
+            cluster._dp_2_attr_update(report)
+
+        assert WatchedMappings.items_calls == items_calls
+        assert update_attribute.call_count == 11
+
+        # Changes in place must be notified
+        cluster.dp_to_attribute[1] = DPToAttributeMapping(OnOff.ep_attribute, "on_time")
+        cluster._invalidate_dp_index()
+        cluster._dp_2_attr_update(report)
+
+    assert update_attribute.mock_calls[-1] == mock.call("on_time", True)
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        b"\x00\x01",
+        b"\x00\x05\x01\x01\x00\x01\x01",
+        b"\x00\x05\x01\x01\x00\x01\x01\x02\x02\x00\x04\x00\x00\x02\xdb"
+        b"\x10\x05\x00\x02\x01\x02\x11\x03\x00\x03abc\x12\x00\x00\x00",
+    ),
+)
+def test_tuya_command_deserialize(data):
+    """Test the TuyaCommand parser matches the generic Struct one."""
+
+    command, rest = TuyaCommand.deserialize(data)
+    expected, expected_rest = t.Struct.deserialize.__func__(TuyaCommand, data)
+
+    assert rest == expected_rest
+    assert command == expected
+    assert repr(command) == repr(expected)
+    assert command.serialize() == data
+    assert [tuple(dp[:3]) for dp in iter_tuya_datapoints(data[2:])] == [
+        (r.dp, r.data.dp_type, r.data.function) for r in expected.datapoints
+    ]
+
+
+@pytest.mark.parametrize(
+    "data",
+    (b"\x00", b"\x00\x01\x02\x02\x00", b"\x00\x01\x02\x02\x00\x04\x00"),
+)
+def test_tuya_command_deserialize_short(data):
+    """Test truncated frames are rejected."""
+
+    with pytest.raises(ValueError):
+        TuyaCommand.deserialize(data)
+
+
+@pytest.mark.parametrize(
+    "data", (b"\x00\x01\x02\x04\x00", b"\x00\x01\x02\x04\x00\x01\x02\x03")
+)
+def test_tuya_legacy_command_deserialize(data):
+    """Test the legacy command parser matches the generic Struct one."""
+
+    command, rest = TuyaManufCluster.Command.deserialize(data)
+    expected, expected_rest = t.Struct.deserialize.__func__(
+        TuyaManufCluster.Command, data
+    )
+
+    assert rest == expected_rest
+    assert repr(command) == repr(expected)
+    assert command.serialize() == data
+
+    with pytest.raises(ValueError):
+        TuyaManufCluster.Command.deserialize(data[:4])
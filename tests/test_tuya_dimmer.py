@@ -96,21 +96,16 @@ async def test_command(zigpy_device_from_quirk, quirk):
         rsp = await dimmer1_cluster.command(0x0004, 25)  # move_to_level_with_on_off
         await wait_for_zigpy_tasks()
 
-        # Should switch on and then switch to level
-        m1.assert_any_call(
-            61184,
-            13,
-            b"\x01\r\x00\x00\x0b\x01\x01\x00\x01\x01",
-            expect_reply=True,
-            command_id=0,
-        )
+        # Should switch on and switch to level in a single command
         m1.assert_called_with(
             61184,
-            14,
-            b"\x01\x0e\x00\x00\x0c\x02\x02\x00\x04\x00\x00\x00\x62",
+            13,
+            b"\x01\r\x00\x00\x0b\x01\x01\x00\x01\x01"
+            b"\x02\x02\x00\x04\x00\x00\x00\x62",
             expect_reply=True,
             command_id=0,
         )
+        assert m1.call_count == 6
         assert rsp.status == foundation.Status.SUCCESS
 
 
@@ -1,22 +1,38 @@
 """Tests for Tuya quirks."""
 
+import asyncio
 import datetime
+import functools
 from unittest import mock
 
 import pytest
+import zigpy.quirks
+import zigpy.types as t
 from zigpy.zcl import foundation
 
 import zhaquirks
-from zhaquirks.tuya import TUYA_MCU_VERSION_RSP, TUYA_SET_TIME, TuyaDPType
+from zhaquirks.const import ENDPOINTS, INPUT_CLUSTERS
+from zhaquirks.tuya import (
+    TUYA_MCU_VERSION_RSP,
+    TUYA_SET_DATA,
+    TUYA_SET_TIME,
+    TuyaCommand,
+    TuyaData,
+    TuyaDatapointData,
+    TuyaDPType,
+    TuyaSendQueue,
+)
 from zhaquirks.tuya.mcu import (
     ATTR_MCU_VERSION,
     TUYA_MCU_CONNECTION_STATUS,
+    DPToAttributeMapping,
     TuyaAttributesCluster,
     TuyaClusterData,
     TuyaMCUCluster,
+    TuyaSpellScheduler,
 )
 
-from tests.common import ClusterListener, MockDatetime
+from tests.common import ClusterListener, MockDatetime, wait_for_zigpy_tasks
 
 zhaquirks.setup()
 
@@ -159,7 +175,10 @@ async def test_tuya_version(zigpy_device_from_quirk, quirk):
     assert cluster_listener.attribute_updates[0][0] == ATTR_MCU_VERSION
     assert cluster_listener.attribute_updates[0][1] == "2.0.2"
 
-    with mock.patch.object(tuya_cluster, "handle_mcu_version_response") as m1:
+    m1 = mock.MagicMock()
+    with mock.patch.dict(
+        tuya_cluster._client_command_handlers, {TUYA_MCU_VERSION_RSP: m1}
+    ):
         tuya_cluster.handle_message(hdr, args)
 
         assert len(cluster_listener.cluster_commands) == 2
@@ -376,3 +395,426 @@ async def test_tuya_mcu_classes():
         TuyaClusterData(manufacturer="xiaomi")
     with pytest.raises(ValueError):
         TuyaClusterData(manufacturer=b"")
+
+
+def _get_dp_mapping_scan(cluster, endpoint_id, attribute_name):
+    """Scan dp_to_attribute like the unindexed get_dp_mapping."""
+
+    result = {}
+    for dp, dp_mapping in cluster.dp_to_attribute.items():
+        if (
+            attribute_name == dp_mapping.attribute_name
+            or (
+                isinstance(dp_mapping.attribute_name, tuple)
+                and attribute_name in dp_mapping.attribute_name
+            )
+        ) and (
+            (
+                dp_mapping.endpoint_id is None
+                and endpoint_id == cluster.endpoint.endpoint_id
+            )
+            or (endpoint_id == dp_mapping.endpoint_id)
+        ):
+            result[dp] = dp_mapping
+    return result
+
+
+TUYA_MCU_QUIRKS = sorted(
+    {
+        quirk
+        for manufacturer in zigpy.quirks._DEVICE_REGISTRY.registry.values()
+        for quirks in manufacturer.values()
+        for quirk in quirks
+        if any(
+            isinstance(cluster, type) and issubclass(cluster, TuyaMCUCluster)
+            for ep in quirk.replacement.get(ENDPOINTS, {}).values()
+            for cluster in ep.get(INPUT_CLUSTERS, [])
+        )
+    },
+    key=lambda quirk: f"{quirk.__module__}.{quirk.__name__}",
+)
+
+
+@pytest.mark.parametrize("quirk", TUYA_MCU_QUIRKS)
+async def test_tuya_get_dp_mapping_index(zigpy_device_from_quirk, quirk):
+    """Test the indexed get_dp_mapping matches a scan of dp_to_attribute."""
+
+    tuya_device = zigpy_device_from_quirk(quirk)
+    tuya_cluster = next(
+        cluster
+        for ep_id, ep in tuya_device.endpoints.items()
+        if ep_id != 0
+        for cluster in ep.in_clusters.values()
+        if isinstance(cluster, TuyaMCUCluster)
+    )
+
+    attribute_names = {"not_exists_attribute"}
+    for dp_mapping in tuya_cluster.dp_to_attribute.values():
+        if isinstance(dp_mapping.attribute_name, tuple):
+            attribute_names.update(dp_mapping.attribute_name)
+        else:
+            attribute_names.add(dp_mapping.attribute_name)
+
+    for endpoint_id in [*tuya_device.endpoints, 7]:
+        for attribute_name in attribute_names:
+            expected = _get_dp_mapping_scan(tuya_cluster, endpoint_id, attribute_name)
+            result = tuya_cluster.get_dp_mapping(endpoint_id, attribute_name)
+            assert list(result.items()) == list(expected.items())
+
+
+async def test_tuya_get_dp_mapping_rebuild(zigpy_device_from_quirk):
+    """Test the get_dp_mapping index follows dp_to_attribute changes."""
+
+    tuya_device = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer
+    )
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    assert list(tuya_cluster.get_dp_mapping(2, "bulb_type")) == [10]
+
+    with mock.patch.object(
+        tuya_cluster, "dp_to_attribute", tuya_cluster.dp_to_attribute.copy()
+    ):
+        tuya_cluster.dp_to_attribute[99] = DPToAttributeMapping(
+            "level", "bulb_type", endpoint_id=2
+        )
+        assert list(tuya_cluster.get_dp_mapping(2, "bulb_type")) == [10, 99]
+
+        # Changes in place must be notified
+        tuya_cluster.dp_to_attribute[99] = DPToAttributeMapping(
+            "level", "minimum_level", endpoint_id=2
+        )
+        tuya_cluster._invalidate_dp_index()
+        assert list(tuya_cluster.get_dp_mapping(2, "bulb_type")) == [10]
+        assert 99 in tuya_cluster.get_dp_mapping(2, "minimum_level")
+
+    assert list(tuya_cluster.get_dp_mapping(2, "bulb_type")) == [10]
+
+
+async def test_tuya_get_dp_mapping_indexed(zigpy_device_from_quirk):
+    """Test get_dp_mapping doesn't walk dp_to_attribute on lookups."""
+
+    class WatchedMappings(dict):
+        items_calls = 0
+
+        def items(self):
+            WatchedMappings.items_calls += 1
+            return super().items()
+
+        def __iter__(self):
+            raise AssertionError("dp_to_attribute iterated")
+
+    tuya_device = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer
+    )
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    tuya_cluster.dp_to_attribute = WatchedMappings(tuya_cluster.dp_to_attribute)
+
+    assert list(tuya_cluster.get_dp_mapping(2, "bulb_type")) == [10]
+    items_calls = WatchedMappings.items_calls
+
+    for _ in range(10):
+        assert list(tuya_cluster.get_dp_mapping(2, "bulb_type")) == [10]
+
+    assert WatchedMappings.items_calls == items_calls
+
+
+async def test_tuya_target_cluster_cache(zigpy_device_from_quirk):
+    """Test datapoint target clusters are cached until their endpoint changes."""
+
+    tuya_device = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer
+    )
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    on_off_2 = tuya_device.endpoints[2].on_off
+
+    def report(value):
+        tuya_cluster._dp_2_attr_update(TuyaDatapointData(7, TuyaData(t.Bool(value))))
+
+    report(True)
+    assert on_off_2.get("on_off") == t.Bool.true
+    assert tuya_cluster._target_clusters[(2, "on_off")] == (
+        tuya_device.endpoints[2],
+        on_off_2,
+    )
+
+    endpoint_2 = tuya_device.endpoints.pop(2)
+    report(False)
+    assert on_off_2.get("on_off") == t.Bool.true
+    assert tuya_cluster.target_cluster("on_off", 2) is None
+    assert (2, "on_off") not in tuya_cluster._target_clusters
+
+    tuya_device.endpoints[2] = endpoint_2
+    report(False)
+    assert on_off_2.get("on_off") == t.Bool.false
+    assert tuya_cluster.target_cluster("no_such_cluster") is None
+
+    tuya_cluster.invalidate_target_clusters()
+    assert tuya_cluster._target_clusters == {}
+
+
+@pytest.mark.parametrize("batch_window", (0, 0.01))
+async def test_tuya_set_data_batching(zigpy_device_from_quirk, batch_window):
+    """Test writes are merged into a single multi-datapoint set_data command."""
+
+    tuya_device = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer
+    )
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    dimmer2_cluster = tuya_device.endpoints[2].level
+
+    with mock.patch.object(
+        tuya_cluster, "set_data_batch_window", batch_window
+    ), mock.patch.object(tuya_cluster, "send_interval", None), mock.patch.object(
+        tuya_cluster, "command"
+    ) as m1:
+        await dimmer2_cluster.write_attributes({"bulb_type": 1, "minimum_level": 25})
+        await asyncio.sleep(0)
+        await dimmer2_cluster.write_attributes({"bulb_type": 2})
+
+        await asyncio.sleep(batch_window * 2)
+
+    if batch_window:
+        # Writes within the window are merged, a DP keeps its newest value
+        assert m1.call_count == 1
+        datapoints = m1.mock_calls[0].args[1].datapoints
+        assert [dp.dp for dp in datapoints] == [9, 10]
+        assert [dp.data.payload for dp in datapoints] == [98, 2]
+    else:
+        # Only the writes issued before yielding to the event loop are merged
+        assert m1.call_count == 2
+        datapoints = m1.mock_calls[0].args[1].datapoints
+        assert [dp.dp for dp in datapoints] == [9, 10]
+        assert [dp.data.payload for dp in datapoints] == [98, 1]
+        assert [dp.dp for dp in m1.mock_calls[1].args[1].datapoints] == [10]
+
+    assert m1.mock_calls[0].args[0] == TUYA_SET_DATA
+    assert dimmer2_cluster.get("bulb_type") == 2
+
+
+async def test_tuya_set_data_batching_options(zigpy_device_from_quirk):
+    """Test batched writes with other command options are not merged."""
+
+    tuya_device = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer
+    )
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+
+    with mock.patch.object(tuya_cluster, "set_data_batch_window", 0), mock.patch.object(
+        tuya_cluster, "send_interval", None
+    ), mock.patch.object(tuya_cluster, "command") as m1:
+        tuya_cluster.tuya_mcu_command(
+            TuyaClusterData(
+                endpoint_id=1,
+                cluster_name="on_off",
+                cluster_attr="on_off",
+                attr_value=1,
+                expect_reply=False,
+            )
+        )
+        tuya_cluster.tuya_mcu_command(
+            TuyaClusterData(
+                endpoint_id=2,
+                cluster_name="on_off",
+                cluster_attr="on_off",
+                attr_value=1,
+                expect_reply=True,
+            )
+        )
+        await asyncio.sleep(0)
+
+    assert m1.call_count == 2
+    assert m1.mock_calls[0].kwargs["expect_reply"] is False
+    assert [dp.dp for dp in m1.mock_calls[0].args[1].datapoints] == [1]
+    assert m1.mock_calls[1].kwargs["expect_reply"] is True
+    assert [dp.dp for dp in m1.mock_calls[1].args[1].datapoints] == [7]
+
+
+async def test_tuya_send_queue():
+    """Test the send queue paces, coalesces and drops commands."""
+
+    sent = []
+
+    def send(value, fail=False):
+        async def _send():
+            sent.append((value, asyncio.get_running_loop().time()))
+            if fail:
+                raise asyncio.TimeoutError
+
+        return _send
+
+    queue = TuyaSendQueue(interval=0.01, max_size=3)
+    queue.enqueue(1, send("a"))
+    queue.enqueue(2, send("b", fail=True))
+    queue.enqueue(1, send("c"))
+    queue.enqueue(3, send("d"))
+    queue.enqueue(None, send("e"))
+    assert queue.depth == 3
+
+    await asyncio.sleep(0.05)
+
+    # "c" replaced "a" in place, then was dropped to make room for "e"
+    assert [value for value, _ in sent] == ["b", "d", "e"]
+    assert all(b[1] - a[1] >= 0.01 for a, b in zip(sent, sent[1:]))
+    assert queue.depth == 0
+    assert (queue.sent, queue.failed, queue.coalesced, queue.dropped) == (2, 1, 1, 1)
+
+
+async def test_tuya_send_queue_cluster(zigpy_device_from_quirk):
+    """Test commands sent through the device send queue."""
+
+    tuya_device = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer
+    )
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    dimmer2_cluster = tuya_device.endpoints[2].level
+
+    with mock.patch.object(tuya_cluster, "send_interval", 0.01), mock.patch.object(
+        tuya_cluster, "set_data_batch_window", None
+    ), mock.patch.object(tuya_cluster, "command") as m1:
+        await dimmer2_cluster.write_attributes({"bulb_type": 1})
+        await dimmer2_cluster.write_attributes({"minimum_level": 25})
+        await dimmer2_cluster.write_attributes({"bulb_type": 2})
+
+        await asyncio.sleep(0.05)
+
+    # The second bulb_type write replaces the queued one, keeping its place
+    assert m1.call_count == 2
+    datapoints = m1.mock_calls[0].args[1].datapoints
+    assert [(dp.dp, dp.data.payload) for dp in datapoints] == [(10, 2)]
+    assert [dp.dp for dp in m1.mock_calls[1].args[1].datapoints] == [9]
+    assert tuya_device.tuya_send_queue.coalesced == 1
+
+
+async def test_tuya_dimmer_send_queue(zigpy_device_from_quirk):
+    """Test dimmers pace a burst of level changes and only send the newest."""
+
+    tuya_device = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer
+    )
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    dimmer_cluster = tuya_device.endpoints[1].level
+
+    with mock.patch.object(tuya_cluster, "command") as m1:
+        for level in (50, 100, 150, 200):
+            await dimmer_cluster.command(0x0000, level)  # move_to_level
+            await asyncio.sleep(0)
+
+        await wait_for_zigpy_tasks()
+
+    assert m1.call_count == 2
+    payloads = [call.args[1].datapoints[0].data.payload for call in m1.mock_calls]
+    assert payloads == [50 * 1000 // 255, 200 * 1000 // 255]
+    assert tuya_device.tuya_send_queue.coalesced == 2
+    assert tuya_device.tuya_send_queue.depth == 0
+
+
+async def test_tuya_suppress_unchanged_reports(zigpy_device_from_quirk):
+    """Test byte-identical datapoint reports are skipped when enabled."""
+
+    tuya_device = zigpy_device_from_quirk(
+        zhaquirks.tuya.ts0601_dimmer.TuyaDoubleSwitchDimmer
+    )
+    tuya_cluster = tuya_device.endpoints[1].tuya_manufacturer
+    on_off_listener = ClusterListener(tuya_device.endpoints[1].on_off)
+
+    def report(value):
+        return TuyaCommand(
+            status=0,
+            tsn=1,
+            datapoints=[TuyaDatapointData(1, TuyaData(t.Bool(value)))],
+        )
+
+    with mock.patch.object(tuya_cluster, "suppress_unchanged_reports", True):
+        tuya_cluster.handle_get_data(report(True))
+        tuya_cluster.handle_active_status_report(report(True))
+        assert len(on_off_listener.attribute_updates) == 1
+        assert tuya_cluster.suppressed_reports[1] == 1
+
+        tuya_cluster.handle_get_data(report(False))
+        assert len(on_off_listener.attribute_updates) == 2
+
+        # a command for the datapoint makes the next report count again
+        with mock.patch.object(tuya_cluster, "command"):
+            tuya_cluster.tuya_mcu_command(
+                TuyaClusterData(
+                    endpoint_id=1,
+                    cluster_name="on_off",
+                    cluster_attr="on_off",
+                    attr_value=1,
+                    expect_reply=False,
+                )
+            )
+        tuya_cluster.handle_get_data(report(False))
+        assert on_off_listener.attribute_updates[-1] == (0x0000, False)
+        assert tuya_cluster.suppressed_reports[1] == 1
+
+    # disabled by default
+    tuya_cluster.handle_get_data(report(False))
+    assert tuya_cluster.suppressed_reports[1] == 1
+
+
+async def test_tuya_spell_scheduler(tmp_path):
+    """Test spells are limited, retried and remembered."""
+
+    progress_path = tmp_path / "tuya_spells.json"
+    scheduler = TuyaSpellScheduler(
+        concurrency=2, jitter=0.001, tries=3, backoff=0.001, progress_path=progress_path
+    )
+    devices = [
+        mock.Mock(ieee=t.EUI64.convert(f"00:00:00:00:00:00:00:{i:02x}"), nwk=0x1000 + i)
+        for i in range(5)
+    ]
+    running = 0
+    max_running = 0
+    attempts = {}
+
+    async def spell(device):
+        nonlocal running, max_running
+        attempts[device.nwk] = attempts.get(device.nwk, 0) + 1
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.005)
+        running -= 1
+        # the first device fails once, the last one always
+        if device is devices[-1] or (
+            device is devices[0] and attempts[device.nwk] == 1
+        ):
+            raise asyncio.TimeoutError
+
+    tasks = [
+        scheduler.schedule(device, functools.partial(spell, device))
+        for device in devices
+    ]
+    assert scheduler.schedule(devices[0], functools.partial(spell, devices[0])) is (
+        tasks[0]
+    )
+    assert scheduler.pending == 5
+
+    with mock.patch.object(
+        scheduler, "_write_progress", wraps=scheduler._write_progress
+    ) as write_progress:
+        assert await asyncio.gather(*tasks) == [True, True, True, True, False]
+        await scheduler.flush_progress()
+
+    # progress is written once, when no spell is left
+    assert write_progress.call_count == 1
+    assert max_running == 2
+    assert attempts == {0x1000: 2, 0x1001: 1, 0x1002: 1, 0x1003: 1, 0x1004: 3}
+    assert list(scheduler.failed) == [str(devices[-1].ieee)]
+
+    # progress is kept across restarts
+    scheduler = TuyaSpellScheduler(progress_path=progress_path)
+    assert len(scheduler.completed) == 4
+    assert scheduler.schedule(devices[1], functools.partial(spell, devices[1])) is None
+
+    # devices joining again with a new address are enchanted again
+    devices[1].nwk = 0x2000
+    scheduler.jitter = 0
+    assert await scheduler.schedule(devices[1], functools.partial(spell, devices[1]))
+
+    scheduler.forget(devices[2].ieee)
+    await scheduler.flush_progress()
+    assert (
+        str(devices[2].ieee)
+        not in TuyaSpellScheduler(progress_path=progress_path).completed
+    )
@@ -317,10 +317,13 @@ async def test_write_attr_rcbo(
         ]
 
 
-async def test_power_factor(zigpy_device_from_quirk):
+async def test_power_factor(zigpy_device_from_quirk, fake_clock):
     """Test calculating apparent_power and power_factor attributes."""
 
-    rcbo_dev = zigpy_device_from_quirk(zhaquirks.tuya.ts0601_rcbo.TuyaCircuitBreaker)
+    with mock.patch("time.monotonic", fake_clock):
+        rcbo_dev = zigpy_device_from_quirk(
+            zhaquirks.tuya.ts0601_rcbo.TuyaCircuitBreaker
+        )
     tuya_cluster = rcbo_dev.endpoints[1].tuya_manufacturer
     electrical_measurement_cluster = rcbo_dev.endpoints[1].electrical_measurement
     tuya_listener = ClusterListener(electrical_measurement_cluster)
@@ -348,9 +351,16 @@ async def test_power_factor(zigpy_device_from_quirk):
     tuya_cluster.handle_message(hdr, args)  # active_power
     assert tuya_listener.attribute_updates == [(0x050B, 2495), (0x0510, 1000)]
 
+    # power reports are rate limited by default
     tuya_listener.attribute_updates = []
     hdr, args = tuya_cluster.deserialize(
         b"\x09\x08\x01\x02\x03g\x00\x00\x0c\x00\x06\x4b\x00\x06\x4b\x00\x00\x00\x00\x00\x00"
     )
     tuya_cluster.handle_message(hdr, args)  # active_power
+    assert tuya_listener.attribute_updates == [(0x0510, 1000)]
+    assert electrical_measurement_cluster.raw_value("active_power") == 1611
+
+    fake_clock.advance(5)
+    tuya_listener.attribute_updates = []
+    tuya_cluster.handle_message(hdr, args)  # active_power
     assert tuya_listener.attribute_updates == [(0x050B, 1611), (0x0510, 987)]
@@ -1,9 +1,9 @@
 """Tests for xiaomi."""
-import asyncio
 from unittest import mock
 
 import pytest
 import zigpy.device
+import zigpy.quirks
 import zigpy.types as t
 from zigpy.zcl import foundation
 
@@ -14,6 +14,7 @@ from zhaquirks.const import (
     INPUT_CLUSTERS,
     MANUFACTURER,
     MODEL,
+    MODELS_INFO,
     NODE_DESCRIPTOR,
     OFF,
     ON,
@@ -22,10 +23,10 @@ from zhaquirks.const import (
     ZONE_STATE,
 )
 from zhaquirks.xiaomi import (
-    CONSUMPTION_REPORTED,
+    CONSUMPTION,
     LUMI,
-    POWER_REPORTED,
-    VOLTAGE_REPORTED,
+    POWER,
+    VOLTAGE,
     XIAOMI_NODE_DESC,
     BasicCluster,
     XiaomiCustomDevice,
@@ -51,9 +52,10 @@ from zhaquirks.xiaomi.aqara.feeder_acn001 import (
 import zhaquirks.xiaomi.aqara.motion_aq2
 import zhaquirks.xiaomi.aqara.motion_aq2b
 import zhaquirks.xiaomi.aqara.plug_eu
+import zhaquirks.xiaomi.aqara.weather
 import zhaquirks.xiaomi.mija.motion
 
-from tests.common import ZCL_OCC_ATTR_RPT_OCC, ClusterListener
+from tests.common import ZCL_OCC_ATTR_RPT_OCC, ClusterListener, run_in_fresh_interpreter
 
 zhaquirks.setup()
 
@@ -91,7 +93,7 @@ def test_basic_cluster_deserialize_wrong_len_2():
         zhaquirks.xiaomi.mija.motion.Motion,
     ),
 )
-async def test_xiaomi_motion(zigpy_device_from_quirk, quirk):
+async def test_xiaomi_motion(zigpy_device_from_quirk, quirk, fake_clock, reset_timers):
     """Test Xiaomi motion sensor."""
 
     motion_dev = zigpy_device_from_quirk(quirk)
@@ -119,7 +121,8 @@ async def test_xiaomi_motion(zigpy_device_from_quirk, quirk):
     assert occupancy_listener.attribute_updates[0][0] == 0x0000
     assert occupancy_listener.attribute_updates[0][1] == 1
 
-    await asyncio.sleep(0.1)
+    fake_clock.advance(1)
+    reset_timers.run_due()
 
     assert len(motion_listener.cluster_commands) == 2
     assert motion_listener.cluster_commands[1][1] == ZONE_STATE
@@ -191,6 +194,81 @@ def test_xiaomi_quick_init_wrong_cluster_or_message(raw_device, cluster, message
     assert raw_device.application.device_initialized.call_count == 0
 
 
+@pytest.mark.parametrize(
+    "cluster, message, is_report",
+    (
+        (0, b"\x18\x00\n\x05\x00B\x11lumi.sensor_sm0ke", True),
+        (0, b"\x1c\x5f\x11\x00\n\xf7\x00A\x00", True),  # manufacturer specific
+        (0, b"\x19\x00\n\x05\x00B\x11lumi.sensor_sm0ke", False),  # cluster command
+        (0, b"\x18\x00\x01\x05\x00", False),  # read attributes response
+        (0, b"\x1c\x5f\x11\x00", False),  # truncated
+        (0, b"", False),
+        (6, b"\x18\x00\n\x00\x00\x10\x01", False),  # on/off report
+    ),
+)
+def test_xiaomi_quick_init_prefilter(raw_device, cluster, message, is_report):
+    """Test frames are rejected from their raw header when not a Basic report."""
+
+    assert zhaquirks.xiaomi._is_basic_report(cluster, message) is is_report
+
+    with mock.patch(
+        "zigpy.zcl.foundation.ZCLHeader.deserialize",
+        wraps=foundation.ZCLHeader.deserialize,
+    ) as hdr_deserialize:
+        assert handle_quick_init(raw_device, 0x0260, cluster, 1, 1, message) is None
+        assert hdr_deserialize.call_count == int(is_report)
+
+
+def test_xiaomi_quick_init_index():
+    """Test QuickInit quirks are indexed by the LUMI models of their signature."""
+
+    class XiaomiIndexedQuirk(XiaomiQuickInitDevice):
+        signature = {
+            MODELS_INFO: [(LUMI, "lumi.indexed.1"), ("other", "lumi.indexed.2")],
+        }
+
+    assert zhaquirks.xiaomi._quick_init_quirks("lumi.indexed.1") == [XiaomiIndexedQuirk]
+
+    # Defining a quirk drops the cached quirks of its models
+    class XiaomiIndexedQuirk2(XiaomiQuickInitDevice):
+        signature = {
+            MANUFACTURER: LUMI,
+            MODEL: "lumi.indexed.1",
+        }
+
+    assert "lumi.indexed.1" not in zhaquirks.xiaomi._QUICK_INIT_QUIRKS
+    assert zhaquirks.xiaomi._quick_init_quirks("lumi.indexed.1") == [
+        XiaomiIndexedQuirk2,
+        XiaomiIndexedQuirk,
+    ]
+    assert zhaquirks.xiaomi._quick_init_quirks("lumi.indexed.2") == []
+    assert (
+        zhaquirks.xiaomi.aqara.motion_aq2.MotionAQ2
+        in zhaquirks.xiaomi._quick_init_quirks("lumi.sensor_motion.aq2")
+    )
+
+
+def test_xiaomi_quick_init_lazy_setup():
+    """Test QuickInit quirks are found when quirk modules are loaded lazily."""
+
+    output = run_in_fresh_interpreter(
+        """
+        import sys
+
+        import zhaquirks
+        import zhaquirks.xiaomi
+
+        zhaquirks.setup(lazy=True)
+        assert "zhaquirks.xiaomi.aqara.motion_aq2" not in sys.modules
+
+        for quirk in zhaquirks.xiaomi._quick_init_quirks("lumi.sensor_motion.aq2"):
+            print(quirk.__module__, quirk.__name__)
+        """
+    )
+
+    assert output.split() == ["zhaquirks.xiaomi.aqara.motion_aq2", "MotionAQ2"]
+
+
 def test_xiaomi_quick_init_wrong_quirk_type(raw_device):
     """Test quick init for existing quirk which is not enabled for quick joining."""
 
@@ -448,6 +526,75 @@ def test_attribute_parsing(raw_report):
     assert len(raw_report) == 2 * len(reports[0])
 
 
+@pytest.mark.parametrize(
+    "model, expected",
+    (
+        (
+            "lumi.weather",
+            {
+                "battery_voltage_mV": 3005,
+                "temperature": 26,
+                "temperature_measurement": 2155,
+                "humidity_measurement": 4321,
+                "pressure_measurement": 100320,
+                "0xff01-149": 7,
+            },
+        ),
+        (
+            "lumi.airmonitor.acn01",
+            {
+                "battery_voltage_mV": 3005,
+                "temperature": 26,
+                "temperature_measurement": 2155,
+                "humidity_measurement": 4321,
+                "tvoc_measurement": 100320,
+                "0xff01-149": 7,
+            },
+        ),
+        (
+            "lumi.plug.maeu01",
+            {
+                "battery_voltage_mV": 3005,
+                "temperature": 26,
+                "0xff01-100": 2155,
+                "0xff01-101": 4321,
+                "0xff01-102": 100320,
+                "consumption": 7,
+            },
+        ),
+        (
+            "lumi.unknown",
+            {
+                "battery_voltage_mV": 3005,
+                "temperature": 26,
+                "0xff01-100": 2155,
+                "0xff01-101": 4321,
+                "0xff01-102": 100320,
+                "0xff01-149": 7,
+            },
+        ),
+    ),
+)
+def test_aqara_attribute_names(model, expected):
+    """Test heartbeat attributes are named after the model of the device."""
+
+    heartbeat = b"".join(
+        t.uint8_t(key).serialize() + foundation.TypeValue(type, value).serialize()
+        for key, type, value in (
+            (1, 0x21, t.uint16_t(3005)),
+            (3, 0x28, t.int8s(26)),
+            (100, 0x29, t.int16s(2155)),
+            (101, 0x21, t.uint16_t(4321)),
+            (102, 0x2B, t.int32s(100320)),
+            (149, 0x39, t.Single(7)),
+        )
+    )
+    cluster = BasicCluster(mock.MagicMock())
+    cluster.endpoint.device.model = model
+
+    assert cluster._parse_aqara_attributes(heartbeat + b"\x00") == expected
+
+
 @mock.patch("zigpy.zcl.Cluster.bind", mock.AsyncMock())
 @pytest.mark.parametrize("quirk", (zhaquirks.xiaomi.aqara.plug_eu.PlugMAEU01,))
 async def test_xiaomi_eu_plug_binding(zigpy_device_from_quirk, quirk):
@@ -495,21 +642,19 @@ async def test_xiaomi_eu_plug_power(zigpy_device_from_quirk, quirk):
     em_listener = ClusterListener(em_cluster)
 
     # Test voltage on ElectricalMeasurement cluster
-    em_cluster.endpoint.device.voltage_bus.listener_event(VOLTAGE_REPORTED, 230)
+    em_cluster.endpoint.device.event_router.route(VOLTAGE, 2300)
     assert len(em_listener.attribute_updates) == 1
     assert em_listener.attribute_updates[0][0] == 1285
     assert em_listener.attribute_updates[0][1] == 230
 
     # Test current power consumption on ElectricalMeasurement cluster
-    em_cluster.endpoint.device.power_bus.listener_event(POWER_REPORTED, 15)
+    em_cluster.endpoint.device.event_router.route(POWER, 15)
     assert len(em_listener.attribute_updates) == 2
     assert em_listener.attribute_updates[1][0] == 1291
     assert em_listener.attribute_updates[1][1] == 150  # multiplied by 10
 
     # Test total power consumption on ElectricalMeasurement cluster
-    em_cluster.endpoint.device.consumption_bus.listener_event(
-        CONSUMPTION_REPORTED, 0.001
-    )
+    em_cluster.endpoint.device.event_router.route(CONSUMPTION, 0.001)
     assert len(em_listener.attribute_updates) == 3
     assert em_listener.attribute_updates[2][0] == 772
     assert em_listener.attribute_updates[2][1] == 1  # multiplied by 1000
@@ -518,9 +663,7 @@ async def test_xiaomi_eu_plug_power(zigpy_device_from_quirk, quirk):
     se_cluster = device.endpoints[1].smartenergy_metering
     se_listener = ClusterListener(se_cluster)
 
-    se_cluster.endpoint.device.consumption_bus.listener_event(
-        CONSUMPTION_REPORTED, 0.001
-    )
+    se_cluster.endpoint.device.event_router.route(CONSUMPTION, 0.001)
     assert len(se_listener.attribute_updates) == 1
     assert se_listener.attribute_updates[0][0] == 0
     assert se_listener.attribute_updates[0][1] == 1  # multiplied by 1000
@@ -699,3 +842,61 @@ async def test_aqara_feeder_attr_reports(
     assert cluster_listener.attribute_updated.call_count == call_count
     for call in calls:
         assert call in cluster_listener.attribute_updated.mock_calls
+
+
+def test_xiaomi_event_router():
+    """Test reported values are routed to the bound handlers, converted."""
+
+    router = zhaquirks.xiaomi.XiaomiEventRouter()
+    pressure, voltage, power = mock.MagicMock(), mock.MagicMock(), mock.MagicMock()
+    router.bind(zhaquirks.xiaomi.PRESSURE_MEASUREMENT, pressure)
+    router.bind(VOLTAGE, voltage)
+    router.bind(POWER, power)
+
+    router.dispatch(
+        {zhaquirks.xiaomi.PRESSURE_MEASUREMENT: 100500, VOLTAGE: 2300, "other": 1}
+    )
+    router.route(POWER, 15)
+
+    pressure.assert_called_once_with(1005)
+    voltage.assert_called_once_with(230)
+    power.assert_called_once_with(15)
+
+
+async def test_xiaomi_heartbeat_skipped(zigpy_device_from_quirk):
+    """Test repeated and too frequent heartbeats are not routed to the clusters."""
+
+    device = zigpy_device_from_quirk(zhaquirks.xiaomi.aqara.weather.Weather)
+    router = device.event_router
+    router._clock = mock.MagicMock(return_value=0)
+    basic_cluster = device.endpoints[1].basic
+    temperature_listener = ClusterListener(device.endpoints[1].temperature)
+
+    def heartbeat(temperature):
+        return (
+            b"\x01\x21\xbd\x0b"
+            + b"\x64\x29"
+            + t.int16s(temperature).serialize()
+            + b"\x65\x21\xe1\x10"
+        )
+
+    basic_cluster._update_attribute(0xFF01, heartbeat(2155))
+    basic_cluster._update_attribute(0xFF01, heartbeat(2155))
+
+    assert temperature_listener.attribute_updates == [(0x0000, 2155)]
+    assert router.skipped_heartbeats == 1
+    assert basic_cluster._attr_cache[0xFF01] == heartbeat(2155)
+
+    router.heartbeat_min_interval = 60
+    router._clock.return_value = 59
+    basic_cluster._update_attribute(0xFF01, heartbeat(2160))
+
+    assert temperature_listener.attribute_updates == [(0x0000, 2155)]
+    assert router.skipped_heartbeats == 2
+    assert basic_cluster._attr_cache[0xFF01] == heartbeat(2160)
+
+    router._clock.return_value = 60
+    basic_cluster._update_attribute(0xFF01, heartbeat(2160))
+
+    assert temperature_listener.attribute_updates == [(0x0000, 2155), (0x0000, 2160)]
+    assert router.skipped_heartbeats == 2
@@ -4,9 +4,20 @@ from __future__ import annotations
 import asyncio
 import importlib
 import logging
-import pathlib
+import math
 import pkgutil
-from typing import Any, Dict, List, Optional, Union
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
 
 import zigpy.device
 import zigpy.endpoint
@@ -24,6 +35,11 @@ from .const import (
     ATTRIBUTE_NAME,
     CLUSTER_COMMAND,
     COMMAND_ATTRIBUTE_UPDATED,
+    CONF_CUSTOM_QUIRKS_PATH,
+    CONF_EXCLUDE_VENDORS,
+    CONF_INCLUDE_VENDORS,
+    CONF_LAZY_QUIRKS,
+    CONF_TUYA_SPELL_PROGRESS_PATH,
     DEVICE_TYPE,
     ENDPOINTS,
     INPUT_CLUSTERS,
@@ -43,10 +59,118 @@ from .const import (
     ZHA_SEND_EVENT,
     ZONE_STATE,
 )
+from .custom_quirks import CustomQuirksLoadResult, load_custom_quirks
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class TimerWheel:
+    """Coarse timers sharing a single event loop timer.
+
+    Deadlines are rounded up to slots of `resolution` seconds and a timer
+    never runs early. While timers are pending, the wheel ticks once per
+    slot. Arming or re-arming a timer only moves its callback to another
+    slot, instead of cancelling and creating an event loop timer.
+    """
+
+    def __init__(
+        self, resolution: float = 1.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Init."""
+        self.resolution = resolution
+        self._clock = clock
+        self._slots: Dict[int, Dict[Callable[[], Any], None]] = {}
+        self._timers: Dict[Callable[[], Any], int] = {}
+        # next slot to run, None while no timer is pending
+        self._cursor: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._handle_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        """Return the number of pending timers."""
+        return len(self._timers)
+
+    def call_later(self, delay: float, callback: Callable[[], Any]) -> None:
+        """Run `callback` in `delay` seconds, re-arming it if already pending."""
+        now = self._clock()
+        slot = math.ceil((now + delay) / self.resolution)
+        if self._cursor is None:
+            self._cursor = math.floor(now / self.resolution)
+        slot = max(slot, self._cursor)
+
+        self.cancel(callback)
+        self._slots.setdefault(slot, {})[callback] = None
+        self._timers[callback] = slot
+        self._schedule_tick(asyncio.get_running_loop())
+
+    def cancel(self, callback: Callable[[], Any]) -> bool:
+        """Cancel the timer of `callback`, return whether it was pending."""
+        slot = self._timers.pop(callback, None)
+        if slot is None:
+            return False
+
+        callbacks = self._slots.get(slot)
+        if callbacks is not None:
+            callbacks.pop(callback, None)
+            if not callbacks:
+                del self._slots[slot]
+        return True
+
+    def run_due(self) -> int:
+        """Run the callbacks of the expired timers, return how many ran."""
+        if self._cursor is None:
+            return 0
+        due = math.floor(self._clock() / self.resolution)
+        if due < self._cursor:
+            return 0
+
+        if due - self._cursor < len(self._slots):
+            slots: Iterable[int] = range(self._cursor, due + 1)
+        else:
+            slots = sorted(slot for slot in self._slots if slot <= due)
+        # callbacks re-arming their timer land in later slots
+        self._cursor = due + 1
+
+        ran = 0
+        for slot in slots:
+            for callback in self._slots.pop(slot, {}):
+                # cancelled or re-armed by a previous callback
+                if self._timers.get(callback) != slot:
+                    continue
+                del self._timers[callback]
+                ran += 1
+                try:
+                    callback()
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Timer callback %s failed", callback)
+
+        if not self._timers:
+            self._cursor = None
+        return ran
+
+    def _schedule_tick(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Tick at the end of the current slot, unless already scheduled."""
+        if self._handle is not None and self._handle_loop is loop:
+            return
+
+        now = self._clock()
+        delay = (math.floor(now / self.resolution) + 1) * self.resolution - now
+        self._handle = loop.call_later(delay, self._tick)
+        self._handle_loop = loop
+
+    def _tick(self) -> None:
+        loop = self._handle_loop
+        self._handle = None
+        self.run_due()
+        if self._timers:
+            self._schedule_tick(loop)
+
+
+# Reset timers of the self resetting motion and occupancy clusters
+RESET_TIMERS = TimerWheel()
+
+
 class Bus(ListenableMixin):
     """Event bus implementation."""
 
@@ -233,15 +357,9 @@ class _Motion(CustomCluster, IasZone):
     """Self reset Motion cluster."""
 
     reset_s: int = 30
-
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        super().__init__(*args, **kwargs)
-        self._loop = asyncio.get_running_loop()
-        self._timer_handle = None
+    timer_wheel: TimerWheel = RESET_TIMERS
 
     def _turn_off(self):
-        self._timer_handle = None
         _LOGGER.debug("%s - Resetting motion sensor", self.endpoint.device.ieee)
         self.listener_event(CLUSTER_COMMAND, 253, ZONE_STATE, [OFF, 0, 0, 0])
         self._update_attribute(ZONE_STATE, OFF)
@@ -266,9 +384,7 @@ class MotionWithReset(_Motion):
     ):
         """Handle the cluster command."""
         if hdr.command_id == ZONE_STATE:
-            if self._timer_handle:
-                self._timer_handle.cancel()
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self.timer_wheel.call_later(self.reset_s, self._turn_off)
             if self.send_occupancy_event:
                 self.endpoint.device.occupancy_bus.listener_event(OCCUPANCY_EVENT)
 
@@ -290,25 +406,16 @@ class MotionOnEvent(_Motion):
 
         _LOGGER.debug("%s - Received motion event message", self.endpoint.device.ieee)
 
-        if self._timer_handle:
-            self._timer_handle.cancel()
-
-        self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+        self.timer_wheel.call_later(self.reset_s, self._turn_off)
 
 
 class _Occupancy(CustomCluster, OccupancySensing):
     """Self reset Occupancy cluster."""
 
     reset_s: int = 600
-
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        super().__init__(*args, **kwargs)
-        self._timer_handle = None
-        self._loop = asyncio.get_running_loop()
+    timer_wheel: TimerWheel = RESET_TIMERS
 
     def _turn_off(self):
-        self._timer_handle = None
         self._update_attribute(OCCUPANCY_STATE, OFF)
 
 
@@ -324,10 +431,7 @@ class OccupancyOnEvent(_Occupancy):
         """Occupancy event."""
         self._update_attribute(OCCUPANCY_STATE, ON)
 
-        if self._timer_handle:
-            self._timer_handle.cancel()
-
-        self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+        self.timer_wheel.call_later(self.reset_s, self._turn_off)
 
 
 class OccupancyWithReset(_Occupancy):
@@ -337,10 +441,8 @@ class OccupancyWithReset(_Occupancy):
         super()._update_attribute(attrid, value)
 
         if attrid == OCCUPANCY_STATE and value == ON:
-            if self._timer_handle:
-                self._timer_handle.cancel()
             self.endpoint.device.motion_bus.listener_event(MOTION_EVENT)
-            self._timer_handle = self._loop.call_later(self.reset_s, self._turn_off)
+            self.timer_wheel.call_later(self.reset_s, self._turn_off)
 
 
 class QuickInitDevice(CustomDevice):
@@ -389,37 +491,140 @@ class QuickInitDevice(CustomDevice):
         return device
 
 
-def setup(custom_quirks_path: str | None = None) -> None:
-    """Register all quirks with zigpy, including optional custom quirks."""
+def _load_manifest():
+    """Load the prebuilt quirk manifest, if it is usable."""
+    from .manifest import QuirkManifest  # pylint: disable=import-outside-toplevel
 
-    # Import all quirks in the `zhaquirks` package first
-    for importer, modname, _ispkg in pkgutil.walk_packages(
-        path=__path__,
-        prefix=__name__ + ".",
-    ):
-        _LOGGER.debug("Loading quirks module %r", modname)
-        importlib.import_module(modname)
+    try:
+        return QuirkManifest.load()
+    except (OSError, ValueError, KeyError) as exc:
+        _LOGGER.warning(
+            "Quirk manifest is unavailable, loading all quirks eagerly: %r", exc
+        )
+        return None
 
-    if custom_quirks_path is None:
-        return
 
-    path = pathlib.Path(custom_quirks_path)
-    _LOGGER.debug("Loading custom quirks from %r", path)
+def _vendor_filter(
+    include: Iterable[str] | None, exclude: Iterable[str] | None
+) -> Callable[[str], bool]:
+    """Return a predicate telling whether a vendor package should be loaded."""
+    include = None if include is None else set(include)
+    exclude = set() if exclude is None else set(exclude)
 
-    loaded = False
+    vendors = {name for _, name, ispkg in pkgutil.iter_modules(__path__) if ispkg}
+    unknown = ((include or set()) | exclude) - vendors
+    if unknown:
+        _LOGGER.warning("Unknown quirk vendor packages: %s", sorted(unknown))
+
+    def _enabled(vendor: str) -> bool:
+        return (include is None or vendor in include) and vendor not in exclude
+
+    return _enabled
 
-    # Treat the custom quirk path (e.g. `/config/custom_quirks/`) itself as a module
-    for importer, modname, _ispkg in pkgutil.walk_packages(path=[str(path)]):
-        try:
-            _LOGGER.debug("Loading custom quirk module %r", modname)
-            importer.find_module(modname).load_module(modname)
-        except Exception:
-            _LOGGER.exception("Unexpected exception importing custom quirk %r", modname)
-        else:
-            loaded = True
 
-    if loaded:
+def _iter_quirk_modules(vendor_enabled: Callable[[str], bool]) -> Iterator[str]:
+    """Yield the modules of the `zhaquirks` package, skipping disabled vendors."""
+    for _, name, ispkg in pkgutil.iter_modules(__path__):
+        if ispkg and not vendor_enabled(name):
+            _LOGGER.debug("Skipping quirks package %r", name)
+            continue
+
+        modname = f"{__name__}.{name}"
+        yield modname
+
+        if ispkg:
+            package = importlib.import_module(modname)
+            for _, submodname, _ in pkgutil.walk_packages(
+                path=package.__path__,
+                prefix=modname + ".",
+            ):
+                yield submodname
+
+
+def setup(
+    custom_quirks_path: str | None = None,
+    lazy: bool = False,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+) -> CustomQuirksLoadResult | None:
+    """Register all quirks with zigpy, including optional custom quirks.
+
+    With `lazy`, quirk modules listed in the prebuilt manifest are only imported
+    the first time zigpy looks up one of their (manufacturer, model) pairs.
+
+    `include` and `exclude` are vendor package names (e.g. `tuya`, `xiaomi`):
+    quirk modules of vendors not included, or excluded, are not loaded. Quirk
+    modules other loaded quirks import, e.g. `zhaquirks.tuya.ts011f_plug` for
+    `zhaquirks.lidl.ts011f_plug`, are imported anyway and their quirks are
+    registered too, whatever their vendor.
+
+    Returns the outcome of loading each custom quirk module, if any.
+    """
+
+    vendor_enabled = _vendor_filter(include, exclude)
+    manifest = _load_manifest() if lazy else None
+
+    if manifest is None:
+        # Import all quirks in the `zhaquirks` package first
+        for modname in _iter_quirk_modules(vendor_enabled):
+            _LOGGER.debug("Loading quirks module %r", modname)
+            importlib.import_module(modname)
+    else:
+        from .manifest import (  # pylint: disable=import-outside-toplevel
+            LazyQuirkLoader,
+            install_lazy_registry,
+        )
+
+        loader = LazyQuirkLoader(
+            manifest,
+            module_filter=lambda modname: vendor_enabled(modname.split(".")[1]),
+        )
+        for modname in manifest.eager_modules:
+            loader.import_module(modname)
+        install_lazy_registry(loader)
+
+    if custom_quirks_path is None:
+        return None
+
+    _LOGGER.debug("Loading custom quirks from %r", custom_quirks_path)
+    result = load_custom_quirks(custom_quirks_path)
+
+    _LOGGER.debug(
+        "Loaded %d custom quirk modules in %0.3fs (%d cached, %d failed)",
+        len(result.modules),
+        result.load_time,
+        sum(module.cached for module in result.modules),
+        len(result.failed),
+    )
+
+    if result.loaded:
         _LOGGER.warning(
             "Loaded custom quirks. Please contribute them to"
             " https://github.com/zigpy/zha-device-handlers"
         )
+
+    return result
+
+
+def setup_from_config(config: Mapping[str, Any]) -> CustomQuirksLoadResult | None:
+    """Register quirks according to the ZHA configuration.
+
+    `include_vendors` and `exclude_vendors` only filter the vendor packages
+    loaded directly, see `setup`. With `tuya_spell_progress_path`, the Tuya
+    devices whose magic spell succeeded are remembered across restarts.
+    """
+    progress_path = config.get(CONF_TUYA_SPELL_PROGRESS_PATH)
+    if progress_path is not None:
+        from .tuya.mcu import (  # pylint: disable=import-outside-toplevel
+            TUYA_SPELL_SCHEDULER,
+        )
+
+        TUYA_SPELL_SCHEDULER.progress_path = progress_path
+        TUYA_SPELL_SCHEDULER.load_progress()
+
+    return setup(
+        custom_quirks_path=config.get(CONF_CUSTOM_QUIRKS_PATH),
+        lazy=config.get(CONF_LAZY_QUIRKS, False),
+        include=config.get(CONF_INCLUDE_VENDORS),
+        exclude=config.get(CONF_EXCLUDE_VENDORS),
+    )
@@ -62,6 +62,11 @@ COMMAND_STOP_ON_OFF = "stop_with_on_off"
 COMMAND_TILT = "Tilt"
 COMMAND_TOGGLE = "toggle"
 COMMAND_TRIPLE = "triple"
+CONF_CUSTOM_QUIRKS_PATH = "custom_quirks_path"
+CONF_EXCLUDE_VENDORS = "exclude_vendors"
+CONF_INCLUDE_VENDORS = "include_vendors"
+CONF_LAZY_QUIRKS = "lazy_quirks"
+CONF_TUYA_SPELL_PROGRESS_PATH = "tuya_spell_progress_path"
 DESCRIPTION = "description"
 DEVICE_TYPE = SIG_EP_TYPE
 DIM_DOWN = "dim_down"
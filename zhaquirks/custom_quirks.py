@@ -0,0 +1,280 @@
+"""Cached, change-detected loading of custom quirks."""
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import hashlib
+import importlib.machinery
+import importlib.util
+import json
+import logging
+import marshal
+import os
+import pathlib
+import sys
+import time
+from types import CodeType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+CACHE_DIR_NAME = "__pycache__"
+INDEX_FILE_NAME = "zhaquirks_custom_quirks.json"
+
+
+@dataclasses.dataclass
+class CustomQuirkLoad:
+    """Outcome of loading a single custom quirk module.
+
+    `skipped` lists the submodules not loaded because this package failed.
+    """
+
+    name: str
+    path: pathlib.Path
+    load_time: float
+    cached: bool = False
+    error: Optional[BaseException] = None
+    skipped: List[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def loaded(self) -> bool:
+        """Return True if the module was executed without error."""
+        return self.error is None
+
+
+@dataclasses.dataclass
+class CustomQuirksLoadResult:
+    """Outcome of loading a custom quirks directory."""
+
+    path: pathlib.Path
+    modules: List[CustomQuirkLoad] = dataclasses.field(default_factory=list)
+
+    @property
+    def loaded(self) -> List[CustomQuirkLoad]:
+        """Modules loaded without error."""
+        return [module for module in self.modules if module.loaded]
+
+    @property
+    def failed(self) -> List[CustomQuirkLoad]:
+        """Modules failing to load."""
+        return [module for module in self.modules if not module.loaded]
+
+    @property
+    def load_time(self) -> float:
+        """Total time spent loading modules."""
+        return sum(module.load_time for module in self.modules)
+
+
+def iter_custom_quirk_modules(
+    path: pathlib.Path, prefix: str = ""
+) -> Iterator[Tuple[str, pathlib.Path, bool]]:
+    """Yield (name, source path, is package) in `pkgutil.walk_packages` order."""
+    for entry in sorted(path.iterdir()):
+        if entry.is_dir():
+            init = entry / "__init__.py"
+            if not entry.name.isidentifier() or not init.is_file():
+                continue
+
+            yield prefix + entry.name, init, True
+            yield from iter_custom_quirk_modules(entry, prefix + entry.name + ".")
+        elif (
+            entry.suffix == ".py"
+            and entry.stem != "__init__"
+            and entry.stem.isidentifier()
+        ):
+            yield prefix + entry.stem, entry, False
+
+
+class _CachedSourceLoader(importlib.machinery.SourceFileLoader):
+    """Source loader getting code objects from the custom quirks cache."""
+
+    def __init__(self, fullname: str, path: str, cache: CustomQuirksCache) -> None:
+        super().__init__(fullname, path)
+        self._cache = cache
+        self.cached = False
+
+    def get_code(self, fullname: str) -> CodeType:
+        code, self.cached = self._cache.get_code(fullname, pathlib.Path(self.path))
+        return code
+
+
+class CustomQuirksCache:
+    """Index of custom quirk sources and their compiled code objects.
+
+    A source is recompiled only when its size and modification time changed and
+    its content hash does not match the indexed one.
+    """
+
+    def __init__(self, cache_dir: pathlib.Path) -> None:
+        """Init."""
+        self.cache_dir = cache_dir
+        self.index_path = cache_dir / INDEX_FILE_NAME
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+
+        if (
+            data.get("version") == INDEX_VERSION
+            and data.get("magic") == importlib.util.MAGIC_NUMBER.hex()
+        ):
+            self._index = data["modules"]
+
+    def _code_path(self, fullname: str) -> pathlib.Path:
+        return self.cache_dir / f"{fullname}.{sys.implementation.cache_tag}.code"
+
+    def _read_code(self, fullname: str) -> Optional[CodeType]:
+        try:
+            return marshal.loads(self._code_path(fullname).read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+
+    def get_code(self, fullname: str, path: pathlib.Path) -> Tuple[CodeType, bool]:
+        """Return the code object for a source and whether it came from the cache."""
+        stat = path.stat()
+        entry = self._index.get(fullname)
+
+        if (
+            entry is not None
+            and entry["path"] == str(path)
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            code = self._read_code(fullname)
+            if code is not None:
+                return code, True
+
+        source = path.read_bytes()
+        digest = hashlib.sha256(source).hexdigest()
+        code = None
+
+        # Touched but unchanged files keep their compiled code
+        if entry is not None and entry["path"] == str(path) and entry["hash"] == digest:
+            code = self._read_code(fullname)
+
+        cached = code is not None
+        if code is None:
+            code = compile(source, str(path), "exec", dont_inherit=True)
+
+            # An index entry must never point to a stale code file
+            if not self._write_code(fullname, code):
+                if self._index.pop(fullname, None) is not None:
+                    self._dirty = True
+                return code, cached
+
+        self._index[fullname] = {
+            "path": str(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": digest,
+        }
+        self._dirty = True
+
+        return code, cached
+
+    def _write_code(self, fullname: str, code: CodeType) -> bool:
+        code_path = self._code_path(fullname)
+        tmp_path = code_path.with_name(f"{code_path.name}.{os.getpid()}.tmp")
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(marshal.dumps(code))
+            os.replace(tmp_path, code_path)
+        except OSError as exc:
+            _LOGGER.debug("Failed to cache custom quirk %r: %r", fullname, exc)
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+            return False
+
+        return True
+
+    def save(self) -> None:
+        """Write the index, if it changed."""
+        if not self._dirty:
+            return
+
+        data = {
+            "version": INDEX_VERSION,
+            "magic": importlib.util.MAGIC_NUMBER.hex(),
+            "modules": self._index,
+        }
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.index_path.write_text(json.dumps(data, indent=1), encoding="utf-8")
+        except OSError as exc:
+            _LOGGER.debug("Failed to write the custom quirks index: %r", exc)
+        else:
+            self._dirty = False
+
+
+def _load_module(
+    name: str, path: pathlib.Path, is_package: bool, cache: CustomQuirksCache
+) -> CustomQuirkLoad:
+    loader = _CachedSourceLoader(name, str(path), cache)
+    spec = importlib.util.spec_from_file_location(
+        name,
+        path,
+        loader=loader,
+        submodule_search_locations=[str(path.parent)] if is_package else None,
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+
+    start = time.perf_counter()
+
+    try:
+        loader.exec_module(module)
+    except Exception as exc:  # pylint: disable=broad-except
+        sys.modules.pop(name, None)
+        return CustomQuirkLoad(
+            name, path, time.perf_counter() - start, loader.cached, exc
+        )
+
+    return CustomQuirkLoad(name, path, time.perf_counter() - start, loader.cached)
+
+
+def load_custom_quirks(
+    custom_quirks_path: str | pathlib.Path,
+    cache_dir: str | pathlib.Path | None = None,
+) -> CustomQuirksLoadResult:
+    """Load every module of a custom quirks directory.
+
+    The directory itself is treated as a module search path: a
+    `bosch/custom_quirk.py` file is loaded as the `bosch.custom_quirk` module.
+    Compiled code is cached in `cache_dir`, the `__pycache__` directory of the
+    custom quirks by default.
+    """
+    path = pathlib.Path(custom_quirks_path)
+    cache = CustomQuirksCache(
+        path / CACHE_DIR_NAME if cache_dir is None else pathlib.Path(cache_dir)
+    )
+    result = CustomQuirksLoadResult(path)
+    failed_package: Optional[CustomQuirkLoad] = None
+
+    for name, source, is_package in iter_custom_quirk_modules(path):
+        # Submodules of a failed package are yielded right after it
+        if failed_package is not None and name.startswith(failed_package.name + "."):
+            failed_package.skipped.append(name)
+            continue
+
+        _LOGGER.debug("Loading custom quirk module %r", name)
+        module = _load_module(name, source, is_package, cache)
+        result.modules.append(module)
+
+        if module.error is not None:
+            _LOGGER.error(
+                "Unexpected exception importing custom quirk %r",
+                name,
+                exc_info=module.error,
+            )
+
+            if is_package:
+                failed_package = module
+
+    cache.save()
+    return result
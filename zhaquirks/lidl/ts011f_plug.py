@@ -1,7 +1,7 @@
 """LIDL TS011F plug."""
 from __future__ import annotations
 
-import asyncio
+import functools
 import logging
 
 import zigpy
@@ -27,6 +27,7 @@ from zhaquirks.const import (
     OUTPUT_CLUSTERS,
     PROFILE_ID,
 )
+from zhaquirks.tuya.mcu import TUYA_SPELL_SCHEDULER
 from zhaquirks.tuya.ts011f_plug import Plug_3AC_4USB
 
 _LOGGER = logging.getLogger(__name__)
@@ -85,13 +86,14 @@ async def cast_tuya_magic_spell_task(
         app.devices.pop(dev.ieee, None)
 
 
-def cast_tuya_magic_spell(dev: zigpy.device.Device, tries: int = 3) -> None:
+def cast_tuya_magic_spell(dev: zigpy.device.Device, tries: int = 1) -> None:
     """Set up the magic spell asynchronously."""
 
-    # Note for sleepy devices the number of tries may need to be increased to 100.
+    # Failed spells are retried by the scheduler: for sleepy devices, increase
+    # `TUYA_SPELL_SCHEDULER.tries` rather than the tries of each attempt.
 
-    dev._magic_spell_task = asyncio.create_task(
-        cast_tuya_magic_spell_task(dev, tries=tries)
+    dev._magic_spell_task = TUYA_SPELL_SCHEDULER.schedule(
+        dev, functools.partial(cast_tuya_magic_spell_task, dev, tries=tries)
     )
 
 
@@ -112,11 +114,17 @@ class TuyaBasicCluster(CustomCluster, Basic):
     async def bind(self):
         """Bind cluster."""
 
+        device = self.endpoint.device
         _LOGGER.debug(
-            f"Requesting Tuya Magic Spell for {self.ieee!r} in basic bind method"
+            f"Requesting Tuya Magic Spell for {device.ieee!r} in basic bind method"
         )
-        tries = 3
-        await asyncio.create_task(cast_tuya_magic_spell_task(self, tries=tries))
+        # Binding is an explicit request, cast the spell even if it was cast already
+        TUYA_SPELL_SCHEDULER.forget(device.ieee)
+        task = TUYA_SPELL_SCHEDULER.schedule(
+            device, functools.partial(cast_tuya_magic_spell_task, device, tries=1)
+        )
+        if task is not None:
+            await task
 
         return await super().bind()
 
@@ -130,7 +138,7 @@ class Lidl_Plug_3AC_4USB(Plug_3AC_4USB):
 
         # Use 'external' version that could be called from cluster
         # customiation
-        cast_tuya_magic_spell(self, tries=3)
+        cast_tuya_magic_spell(self)
 
     signature = {
         MODEL: "TS011F",
@@ -0,0 +1,353 @@
+"""Prebuilt (manufacturer, model) manifest used to load quirk modules lazily.
+
+Regenerate the shipped manifest after adding or changing a quirk with::
+
+    python -m zhaquirks.manifest
+"""
+from __future__ import annotations
+
+import collections
+import contextlib
+import hashlib
+import importlib
+import json
+import logging
+import pathlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import zigpy.quirks
+from zigpy.quirks.registry import DeviceRegistry
+
+from zhaquirks.const import (
+    DEVICE_TYPE,
+    ENDPOINTS,
+    INPUT_CLUSTERS,
+    MANUFACTURER,
+    MODEL,
+    MODELS_INFO,
+    OUTPUT_CLUSTERS,
+    PROFILE_ID,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+PACKAGE = "zhaquirks"
+MANIFEST_VERSION = 2
+MANIFEST_PATH = pathlib.Path(__file__).parent / "quirks_manifest.json"
+
+ModelKey = Tuple[Optional[str], Optional[str]]
+
+
+def _cluster_id(cluster: Any) -> int:
+    return getattr(cluster, "cluster_id", cluster)
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+def quirk_models(quirk: type[zigpy.quirks.CustomDevice]) -> List[ModelKey]:
+    """Return the (manufacturer, model) pairs a quirk is registered under."""
+    models_info = quirk.signature.get(MODELS_INFO)
+    if models_info:
+        return [(manufacturer, model) for manufacturer, model in models_info]
+
+    return [(quirk.signature.get(MANUFACTURER), quirk.signature.get(MODEL))]
+
+
+def quirk_id(quirk: type[zigpy.quirks.CustomDevice]) -> str:
+    """Return the dotted path identifying a quirk in the manifest."""
+    return f"{quirk.__module__}.{quirk.__name__}"
+
+
+def signature_fingerprint(signature: Dict[str, Any]) -> str:
+    """Return a short, stable fingerprint of the endpoints of a quirk signature."""
+    endpoints = [
+        (
+            int(ep_id),
+            _optional_int(ep_data.get(PROFILE_ID)),
+            _optional_int(ep_data.get(DEVICE_TYPE)),
+            sorted(_cluster_id(c) for c in ep_data.get(INPUT_CLUSTERS, [])),
+            sorted(_cluster_id(c) for c in ep_data.get(OUTPUT_CLUSTERS, [])),
+        )
+        for ep_id, ep_data in sorted(signature.get(ENDPOINTS, {}).items())
+    ]
+    return hashlib.sha1(repr(endpoints).encode()).hexdigest()[:16]
+
+
+def build_manifest(registry: DeviceRegistry | None = None) -> Dict[str, Any]:
+    """Build the manifest from the `zhaquirks` quirks registered with zigpy."""
+    if registry is None:
+        registry = zigpy.quirks._DEVICE_REGISTRY  # pylint: disable=W0212
+
+    modules: Dict[str, List[Dict[str, Any]]] = collections.defaultdict(list)
+    seen = set()
+
+    for models in list(registry.registry.values()):
+        for quirks in list(models.values()):
+            for quirk in quirks:
+                if quirk in seen or not quirk.__module__.startswith(PACKAGE + "."):
+                    continue
+
+                seen.add(quirk)
+                modules[quirk.__module__].append(
+                    {
+                        "quirk": quirk.__name__,
+                        "fingerprint": signature_fingerprint(quirk.signature),
+                        "models": [list(key) for key in quirk_models(quirk)],
+                    }
+                )
+
+    for quirks in modules.values():
+        quirks.sort(key=lambda entry: entry["quirk"])
+
+    # Modules import each other, so the registry order of a pair defined by more
+    # than one module depends on the import order and can't be derived from it
+    registry_order = []
+    for manufacturer, models in list(registry.registry.items()):
+        for model, quirks in list(dict.items(models)):
+            quirk_ids = [
+                quirk_id(quirk)
+                for quirk in quirks
+                if quirk.__module__.startswith(PACKAGE + ".")
+            ]
+            if len({quirk.rpartition(".")[0] for quirk in quirk_ids}) > 1:
+                registry_order.append([manufacturer, model, quirk_ids])
+
+    registry_order.sort(key=lambda entry: json.dumps(entry[:2]))
+
+    # Modules hooking into zigpy outside of the device registry must always load
+    eager_modules = sorted(
+        {
+            handler.__module__
+            for handler in zigpy.quirks._uninitialized_device_message_handlers  # pylint: disable=W0212
+            if handler.__module__.startswith(PACKAGE + ".")
+        }
+    )
+
+    return {
+        "version": MANIFEST_VERSION,
+        "eager_modules": eager_modules,
+        "modules": dict(sorted(modules.items())),
+        "registry_order": registry_order,
+    }
+
+
+def write_manifest(path: pathlib.Path = MANIFEST_PATH) -> Dict[str, Any]:
+    """Import every quirk module and write the manifest to `path`."""
+    import zhaquirks  # pylint: disable=import-outside-toplevel
+
+    zhaquirks.setup()
+    manifest = build_manifest()
+    path.write_text(json.dumps(manifest, indent=1) + "\n", encoding="utf-8")
+    return manifest
+
+
+class QuirkManifest:
+    """Index of the quirk modules defining each (manufacturer, model) pair."""
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        """Init."""
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(
+                f"Unsupported quirk manifest version: {data.get('version')}"
+            )
+
+        self.eager_modules: Tuple[str, ...] = tuple(data["eager_modules"])
+        self.fingerprints: Dict[str, str] = {}
+        self._modules_by_model: Dict[ModelKey, List[str]] = collections.defaultdict(
+            list
+        )
+        self._registry_order: Dict[ModelKey, Dict[str, int]] = {}
+
+        for module, quirks in data["modules"].items():
+            for quirk in quirks:
+                self.fingerprints[f"{module}.{quirk['quirk']}"] = quirk["fingerprint"]
+                for manufacturer, model in quirk["models"]:
+                    modules = self._modules_by_model[(manufacturer, model)]
+                    if module not in modules:
+                        modules.append(module)
+
+        for manufacturer, model, quirk_ids in data["registry_order"]:
+            key = (manufacturer, model)
+            self._registry_order[key] = {
+                quirk: position for position, quirk in enumerate(quirk_ids)
+            }
+            # Quirks are inserted first, import modules in eager setup order
+            modules = []
+            for quirk in reversed(quirk_ids):
+                module = quirk.rpartition(".")[0]
+                if module not in modules:
+                    modules.append(module)
+            self._modules_by_model[key] = modules
+
+    @classmethod
+    def load(cls, path: pathlib.Path | None = None) -> QuirkManifest:
+        """Load a manifest from a JSON file, the shipped manifest by default."""
+        if path is None:
+            path = MANIFEST_PATH
+
+        with open(path, encoding="utf-8") as manifest_file:
+            return cls(json.load(manifest_file))
+
+    @property
+    def modules(self) -> List[str]:
+        """All modules referenced by the manifest."""
+        return sorted(
+            {
+                module
+                for modules in self._modules_by_model.values()
+                for module in modules
+            }
+        )
+
+    def modules_for(self, manufacturer: str | None, model: str | None) -> List[str]:
+        """Return the modules defining quirks for a (manufacturer, model) pair."""
+        return self._modules_by_model.get((manufacturer, model), [])
+
+    def sort_quirks(
+        self,
+        manufacturer: str | None,
+        model: str | None,
+        quirks: List[type[zigpy.quirks.CustomDevice]],
+    ) -> None:
+        """Sort the quirks of a (manufacturer, model) pair in eager setup order.
+
+        Quirks missing from the manifest, e.g. custom quirks, are kept first.
+        """
+        positions = self._registry_order.get((manufacturer, model))
+        if positions is not None:
+            quirks.sort(key=lambda quirk: positions.get(quirk_id(quirk), -1))
+
+
+class LazyQuirkLoader:
+    """Import quirk modules the first time their (manufacturer, model) is looked up."""
+
+    def __init__(
+        self,
+        manifest: QuirkManifest,
+        module_filter: Callable[[str], bool] | None = None,
+    ) -> None:
+        """Init."""
+        self.manifest = manifest
+        self.module_filter = module_filter
+        self.loaded_modules: set[str] = set()
+        self._loaded_models: set[ModelKey] = set()
+        self._suspended = 0
+
+    @contextlib.contextmanager
+    def suspended(self) -> Iterator[None]:
+        """Do not load modules on lookup, e.g. while registering a quirk."""
+        self._suspended += 1
+        try:
+            yield
+        finally:
+            self._suspended -= 1
+
+    def load(self, manufacturer: str | None, model: str | None) -> bool:
+        """Import every module defining quirks for a (manufacturer, model) pair.
+
+        Lookups made while a quirk module is importing or a quirk is being
+        registered load nothing: the module may import another quirk module
+        that is only partially initialized yet. The pair is loaded on its next
+        lookup instead.
+
+        Returns whether the pair was loaded by this call.
+        """
+        key = (manufacturer, model)
+        if self._suspended or key in self._loaded_models:
+            return False
+
+        # Mark first: importing the module registers quirks, looking the key up again
+        self._loaded_models.add(key)
+
+        for modname in self.manifest.modules_for(manufacturer, model):
+            self.import_module(modname)
+
+        return True
+
+    def import_module(self, modname: str) -> None:
+        """Import a single quirk module, unless it is filtered out."""
+        if modname in self.loaded_modules:
+            return
+
+        if self.module_filter is not None and not self.module_filter(modname):
+            return
+
+        self.loaded_modules.add(modname)
+        _LOGGER.debug("Lazily loading quirks module %r", modname)
+        with self.suspended():
+            importlib.import_module(modname)
+
+
+class _LazyModelQuirks(dict):
+    """Model -> quirk list mapping that loads quirk modules on lookup."""
+
+    def __init__(self, loader: LazyQuirkLoader, manufacturer: str | None) -> None:
+        super().__init__()
+        self._loader = loader
+        self._manufacturer = manufacturer
+
+    def __getitem__(self, model: str | None) -> list:
+        if not self._loader.load(self._manufacturer, model):
+            return super().__getitem__(model)
+
+        # Modules may have been imported earlier for another pair
+        quirks = super().__getitem__(model)
+        self._loader.manifest.sort_quirks(self._manufacturer, model, quirks)
+        return quirks
+
+    def __missing__(self, model: str | None) -> list:
+        return self.setdefault(model, [])
+
+
+class _LazyRegistry(dict):
+    """Manufacturer -> model mapping creating lazy model mappings on demand."""
+
+    def __init__(self, loader: LazyQuirkLoader) -> None:
+        super().__init__()
+        self._loader = loader
+
+    def __missing__(self, manufacturer: str | None) -> _LazyModelQuirks:
+        return self.setdefault(
+            manufacturer, _LazyModelQuirks(self._loader, manufacturer)
+        )
+
+
+def install_lazy_registry(
+    loader: LazyQuirkLoader, registry: DeviceRegistry | None = None
+) -> None:
+    """Replace the registry storage with one that loads quirk modules on lookup.
+
+    Quirks already registered are kept, in their current order. Registering a
+    quirk never loads the modules of its (manufacturer, model) pairs. Installing
+    it again on the same registry does nothing.
+    """
+    if registry is None:
+        registry = zigpy.quirks._DEVICE_REGISTRY  # pylint: disable=W0212
+
+    add_to_registry = registry.add_to_registry
+    if getattr(add_to_registry, "_zhaquirks_lazy", False):
+        return
+
+    def _add_to_registry(custom_device: type[zigpy.quirks.CustomDevice]) -> None:
+        with loader.suspended():
+            add_to_registry(custom_device)
+
+    _add_to_registry._zhaquirks_lazy = True  # type: ignore[attr-defined]
+    registry.add_to_registry = _add_to_registry  # type: ignore[method-assign]
+
+    lazy_registry = _LazyRegistry(loader)
+    for manufacturer, models in registry.registry.items():
+        for model, quirks in dict.items(models):
+            dict.__setitem__(lazy_registry[manufacturer], model, quirks)
+
+    registry._registry = lazy_registry  # pylint: disable=W0212
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    _manifest = write_manifest()
+    _LOGGER.info(
+        "Wrote %d quirk modules to %s", len(_manifest["modules"]), MANIFEST_PATH
+    )
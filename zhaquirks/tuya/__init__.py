@@ -1,13 +1,29 @@
 """Tuya devices."""
+import asyncio
+import collections
 import dataclasses
 import datetime
 import enum
+import functools
 import logging
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import sys
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from zigpy.quirks import CustomCluster, CustomDevice
 import zigpy.types as t
-from zigpy.zcl import foundation
+from zigpy.zcl import Cluster, foundation
 from zigpy.zcl.clusters.closures import WindowCovering
 from zigpy.zcl.clusters.general import LevelControl, OnOff, PowerConfiguration
 from zigpy.zcl.clusters.homeautomation import ElectricalMeasurement
@@ -131,6 +147,59 @@ class TuyaTimePayload(t.LVList, item_type=t.uint8_t, length_type=t.uint16_t_be):
     """Tuya set time payload definition."""
 
 
+class TuyaTimeSync:
+    """Build set_time payloads, reusing them for every request in the same second.
+
+    Payloads are cached per (set_time_offset, set_time_local_offset), so
+    devices asking for the time at once, for example after a power cut, are
+    all answered from a single computation.
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        self.hits = 0
+        self.misses = 0
+        self._second: Optional[datetime.datetime] = None
+        self._payloads: Dict[Tuple[int, Optional[int]], Tuple[int, ...]] = {}
+
+    def payload(
+        self, set_time_offset: int, set_time_local_offset: Optional[int] = None
+    ) -> TuyaTimePayload:
+        """Return the UTC and local timestamps since the offset years, big endian."""
+        utc_now = datetime.datetime.utcnow()
+        second = utc_now.replace(microsecond=0)
+        if second != self._second:
+            self._second = second
+            self._payloads.clear()
+
+        key = (set_time_offset, set_time_local_offset)
+        try:
+            encoded = self._payloads[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            return TuyaTimePayload(encoded)
+
+        utc_timestamp = int(
+            (utc_now - datetime.datetime(set_time_offset, 1, 1)).total_seconds()
+        )
+        local_timestamp = int(
+            (
+                datetime.datetime.now()
+                - datetime.datetime(set_time_local_offset or set_time_offset, 1, 1)
+            ).total_seconds()
+        )
+        encoded = self._payloads[key] = tuple(
+            utc_timestamp.to_bytes(4, "big", signed=False)
+            + local_timestamp.to_bytes(4, "big", signed=False)
+        )
+        return TuyaTimePayload(encoded)
+
+
+TUYA_TIME_SYNC = TuyaTimeSync()
+
+
 class TuyaDPType(t.enum8):
     """DataPoint Type."""
 
@@ -142,6 +211,77 @@ class TuyaDPType(t.enum8):
     BITMAP = 0x05
 
 
+def _decode_int(raw: bytes, size: int) -> int:
+    if len(raw) < size:
+        raise ValueError(f"Data is too short to contain {size} bytes")
+    return int.from_bytes(raw[:size], "big", signed=size > 1)
+
+
+_TUYA_BITMAPS = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
+
+
+def _decode_bitmap(raw: bytes) -> Union[t.bitmap8, t.bitmap16, t.bitmap32]:
+    try:
+        bitmap = _TUYA_BITMAPS[len(raw)]
+    except KeyError as exc:
+        raise ValueError(f"Wrong bitmap length: {len(raw)}") from exc
+    return bitmap(int.from_bytes(raw, "little"))
+
+
+def _encode_bitmap(value: Any) -> bytes:
+    if not isinstance(value, (t.bitmap8, t.bitmap16, t.bitmap32)):
+        value = t.bitmap8(value)
+    return value.serialize()[::-1]
+
+
+# Payload decoders and encoders by datapoint type
+TUYA_DP_DECODERS: Dict[int, Callable[[bytes], Any]] = {
+    TuyaDPType.RAW: lambda raw: raw,
+    TuyaDPType.BOOL: lambda raw: t.Bool(_decode_int(raw, 1)),
+    TuyaDPType.VALUE: lambda raw: t.int32s_be(_decode_int(raw, 4)),
+    TuyaDPType.STRING: lambda raw: t.CharacterString(raw.decode("utf8")),
+    TuyaDPType.ENUM: lambda raw: t.enum8(_decode_int(raw, 1)),
+    TuyaDPType.BITMAP: _decode_bitmap,
+}
+
+TUYA_DP_ENCODERS: Dict[int, Callable[[Any], bytes]] = {
+    TuyaDPType.RAW: lambda value: value.serialize(),
+    TuyaDPType.BOOL: lambda value: t.Bool(value).serialize(),
+    TuyaDPType.VALUE: lambda value: t.int32s_be(value).serialize(),
+    TuyaDPType.STRING: lambda value: value.encode("utf8"),
+    TuyaDPType.ENUM: lambda value: t.enum8(value).serialize(),
+    TuyaDPType.BITMAP: _encode_bitmap,
+}
+
+# Datapoint type of python types, filled on first use
+_TUYA_DP_TYPES: Dict[type, TuyaDPType] = {}
+
+
+def _dp_type_of(value: Any) -> TuyaDPType:
+    """Return the datapoint type a value is sent as."""
+    value_type = type(value)
+    try:
+        return _TUYA_DP_TYPES[value_type]
+    except KeyError:
+        pass
+
+    if issubclass(value_type, (t.bitmap8, t.bitmap16, t.bitmap32)):
+        dp_type = TuyaDPType.BITMAP
+    elif issubclass(value_type, (bool, t.Bool)):
+        dp_type = TuyaDPType.BOOL
+    elif issubclass(value_type, enum.Enum):
+        dp_type = TuyaDPType.ENUM
+    elif issubclass(value_type, int):
+        dp_type = TuyaDPType.VALUE
+    elif issubclass(value_type, str):
+        dp_type = TuyaDPType.STRING
+    else:
+        dp_type = TuyaDPType.RAW
+
+    _TUYA_DP_TYPES[value_type] = dp_type
+    return dp_type
+
+
 class TuyaData(t.Struct):
     """Tuya Data type."""
 
@@ -163,44 +303,20 @@ class TuyaData(t.Struct):
         t.LVBytes,
     ]:
         """Payload accordingly to data point type."""
-        if self.dp_type == TuyaDPType.VALUE:
-            return t.int32s_be.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.BOOL:
-            return t.Bool.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.STRING:
-            return t.CharacterString(self.raw.decode("utf8"))
-        elif self.dp_type == TuyaDPType.ENUM:
-            return t.enum8.deserialize(self.raw)[0]
-        elif self.dp_type == TuyaDPType.BITMAP:
-            bitmaps = {1: t.bitmap8, 2: t.bitmap16, 4: t.bitmap32}
-            try:
-                return bitmaps[len(self.raw)].deserialize(self.raw)[0]
-            except KeyError as exc:
-                raise ValueError(f"Wrong bitmap length: {len(self.raw)}") from exc
-        elif self.dp_type == TuyaDPType.RAW:
-            return self.raw
-        else:
-            raise ValueError(f"Unknown {self.dp_type} datapoint type")
+        try:
+            decoder = TUYA_DP_DECODERS[self.dp_type]
+        except KeyError:
+            raise ValueError(f"Unknown {self.dp_type} datapoint type") from None
+        return decoder(self.raw)
 
     @payload.setter
     def payload(self, value):
         """Set payload accordingly to data point type."""
-        if self.dp_type == TuyaDPType.VALUE:
-            self.raw = t.int32s_be(value).serialize()
-        elif self.dp_type == TuyaDPType.BOOL:
-            self.raw = t.Bool(value).serialize()
-        elif self.dp_type == TuyaDPType.STRING:
-            self.raw = value.encode("utf8")
-        elif self.dp_type == TuyaDPType.ENUM:
-            self.raw = t.enum8(value).serialize()
-        elif self.dp_type == TuyaDPType.BITMAP:
-            if not isinstance(value, (t.bitmap8, t.bitmap16, t.bitmap32)):
-                value = t.bitmap8(value)
-            self.raw = value.serialize()[::-1]
-        elif self.dp_type == TuyaDPType.RAW:
-            self.raw = value.serialize()
-        else:
-            raise ValueError(f"Unknown {self.dp_type} datapoint type")
+        try:
+            encoder = TUYA_DP_ENCODERS[self.dp_type]
+        except KeyError:
+            raise ValueError(f"Unknown {self.dp_type} datapoint type") from None
+        self.raw = encoder(value)
 
     def __new__(cls, *args, **kwargs):
         """Disable copy constrctor."""
@@ -212,19 +328,8 @@ class TuyaData(t.Struct):
 
         if value is None:
             return
-        elif isinstance(value, (t.bitmap8, t.bitmap16, t.bitmap32)):
-            self.dp_type = TuyaDPType.BITMAP
-        elif isinstance(value, (bool, t.Bool)):
-            self.dp_type = TuyaDPType.BOOL
-        elif isinstance(value, enum.Enum):
-            self.dp_type = TuyaDPType.ENUM
-        elif isinstance(value, int):
-            self.dp_type = TuyaDPType.VALUE
-        elif isinstance(value, str):
-            self.dp_type = TuyaDPType.STRING
-        else:
-            self.dp_type = TuyaDPType.RAW
 
+        self.dp_type = _dp_type_of(value)
         self.payload = value
 
 
@@ -278,6 +383,49 @@ class TuyaDatapointData(t.Struct):
     data: TuyaData
 
 
+# Shared instances of every uint8_t and datapoint type, to skip per-frame allocations
+_UINT8 = [t.uint8_t(value) for value in range(256)]
+_DP_TYPES = [TuyaDPType(value) for value in range(256)]
+
+
+def iter_tuya_datapoints(data: bytes) -> Iterator[Tuple[int, int, int, memoryview]]:
+    """Yield (dp, dp_type, function, raw) of serialized datapoints, without copies.
+
+    `raw` is a view into `data`, only valid as long as `data` is.
+    """
+    view = memoryview(data)
+    size = len(view)
+    offset = 0
+
+    while offset < size:
+        if size - offset < 4:
+            raise ValueError(
+                f"Data is too short to contain a datapoint: {bytes(view[offset:])!r}"
+            )
+        dp, dp_type, function, length = view[offset : offset + 4]
+        offset += 4
+
+        if size - offset < length:
+            raise ValueError(f"Data is too short to contain {length} bytes")
+        yield dp, dp_type, function, view[offset : offset + length]
+        offset += length
+
+
+def _tuya_datapoint(
+    dp: int, dp_type: int, function: int, raw: memoryview
+) -> TuyaDatapointData:
+    """Build a datapoint without going through the generic Struct constructor."""
+    data = object.__new__(TuyaData)
+    data.dp_type = _DP_TYPES[dp_type]
+    data.function = _UINT8[function]
+    data.raw = t.LVBytes(raw)
+
+    datapoint = object.__new__(TuyaDatapointData)
+    datapoint.dp = _UINT8[dp]
+    datapoint.data = data
+    return datapoint
+
+
 class TuyaCommand(t.Struct):
     """Tuya manufacturer cluster command."""
 
@@ -285,6 +433,24 @@ class TuyaCommand(t.Struct):
     tsn: t.uint8_t
     datapoints: t.List[TuyaDatapointData]
 
+    @classmethod
+    def deserialize(cls, data: bytes) -> Tuple["TuyaCommand", bytes]:
+        """Deserialize a command, walking its datapoints in place."""
+        if cls is not TuyaCommand:
+            return super().deserialize(data)
+
+        if len(data) < 2:
+            raise ValueError(f"Data is too short to contain a command: {data!r}")
+
+        command = object.__new__(cls)
+        command.status = _UINT8[data[0]]
+        command.tsn = _UINT8[data[1]]
+        command.datapoints = t.List[TuyaDatapointData](
+            _tuya_datapoint(*datapoint)
+            for datapoint in iter_tuya_datapoints(memoryview(data)[2:])
+        )
+        return command, b""
+
 
 class NoManufacturerCluster(CustomCluster):
     """Forces the NO manufacturer id in command."""
@@ -310,6 +476,89 @@ class NoManufacturerCluster(CustomCluster):
         )
 
 
+class TuyaSendQueue:
+    """Per-device outbound queue pacing the commands sent to a Tuya MCU.
+
+    Commands are sent one at a time, at least `interval` seconds apart. A new
+    command for the key (datapoint) of a command not sent yet replaces it,
+    keeping its place in the queue. When the queue is full the oldest command
+    is dropped.
+    """
+
+    def __init__(self, interval: float, max_size: int = 32) -> None:
+        """Init."""
+        self.interval = interval
+        self.max_size = max_size
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: Dict[Any, Callable[[], Awaitable]] = collections.OrderedDict()
+        self._last_sent: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        """Return the number of commands waiting to be sent."""
+        return len(self._queue)
+
+    def enqueue(self, key: Any, send: Callable[[], Awaitable]) -> None:
+        """Queue `send`, replacing a queued command with the same key."""
+        if key is None:
+            key = object()
+
+        if key in self._queue:
+            self.coalesced += 1
+        elif len(self._queue) >= self.max_size:
+            self._queue.popitem(last=False)
+            self.dropped += 1
+
+        self._queue[key] = send
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while self._queue:
+            if self._last_sent is not None:
+                delay = self._last_sent + self.interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            _, send = self._queue.popitem(last=False)
+            self._last_sent = loop.time()
+
+            try:
+                await send()
+            except Exception as exc:  # pylint: disable=broad-except
+                self.failed += 1
+                _LOGGER.debug("Failed to send queued Tuya command: %r", exc)
+            else:
+                self.sent += 1
+
+
+def enqueue_tuya_command(
+    cluster: CustomCluster, key: Any, send: Callable[[], Awaitable]
+) -> None:
+    """Send a command now, or through the device send queue if the cluster has one.
+
+    Clusters opt into the queue by setting `send_interval` (in seconds).
+    """
+    if cluster.send_interval is None:
+        cluster.create_catching_task(send())
+        return
+
+    device = cluster.endpoint.device
+    queue = getattr(device, "tuya_send_queue", None)
+    if queue is None:
+        queue = device.tuya_send_queue = TuyaSendQueue(
+            cluster.send_interval, cluster.send_queue_size
+        )
+    queue.enqueue(key, send)
+
+
 class TuyaManufCluster(CustomCluster):
     """Tuya manufacturer specific cluster."""
 
@@ -318,6 +567,9 @@ class TuyaManufCluster(CustomCluster):
     ep_attribute = "tuya_manufacturer"
     set_time_offset = 0
     set_time_local_offset = None
+    # Seconds between frames sent through the device send queue, None to send at once
+    send_interval: Optional[float] = None
+    send_queue_size: int = 32
 
     class Command(t.Struct):
         """Tuya manufacturer cluster command."""
@@ -328,6 +580,23 @@ class TuyaManufCluster(CustomCluster):
         function: t.uint8_t
         data: Data
 
+        @classmethod
+        def deserialize(cls, data: bytes) -> Tuple["TuyaManufCluster.Command", bytes]:
+            """Deserialize a command without the generic Struct machinery."""
+            if cls is not TuyaManufCluster.Command:
+                return super().deserialize(data)
+
+            if len(data) < 5:
+                raise ValueError(f"Data is too short to contain a command: {data!r}")
+
+            command = object.__new__(cls)
+            command.status = _UINT8[data[0]]
+            command.tsn = _UINT8[data[1]]
+            command.command_id = t.uint16_t(data[2] | data[3] << 8)
+            command.function = _UINT8[data[4]]
+            command.data = Data([_UINT8[value] for value in data[5:]])
+            return command, b""
+
     class MCUVersionRsp(t.Struct):
         """Tuya MCU version response Zcl payload."""
 
@@ -397,8 +666,10 @@ class TuyaManufCluster(CustomCluster):
     def tuya_mcu_command(self, command: Command):
         """Tuya MCU command listener. Only endpoint:1 must listen to MCU commands."""
 
-        self.create_catching_task(
-            self.command(TUYA_SET_DATA, command, expect_reply=True)
+        enqueue_tuya_command(
+            self,
+            command.command_id,
+            functools.partial(self.command, TUYA_SET_DATA, command, expect_reply=True),
         )
 
     def handle_cluster_request(
@@ -428,23 +699,9 @@ class TuyaManufCluster(CustomCluster):
             self.cluster_id,
             hdr.command_id,
         )
-        payload = TuyaTimePayload()
-        utc_timestamp = int(
-            (
-                datetime.datetime.utcnow()
-                - datetime.datetime(self.set_time_offset, 1, 1)
-            ).total_seconds()
+        payload = TUYA_TIME_SYNC.payload(
+            self.set_time_offset, self.set_time_local_offset
         )
-        local_timestamp = int(
-            (
-                datetime.datetime.now()
-                - datetime.datetime(
-                    self.set_time_local_offset or self.set_time_offset, 1, 1
-                )
-            ).total_seconds()
-        )
-        payload.extend(utc_timestamp.to_bytes(4, "big", signed=False))
-        payload.extend(local_timestamp.to_bytes(4, "big", signed=False))
 
         self.create_catching_task(
             super().command(TUYA_SET_TIME, payload, expect_reply=False)
@@ -454,6 +711,10 @@ class TuyaManufCluster(CustomCluster):
 class TuyaManufClusterAttributes(TuyaManufCluster):
     """Manufacturer specific cluster for Tuya converting attributes <-> commands."""
 
+    # Send the set_data commands of a write_attributes call without waiting
+    # for each other, instead of one after the other
+    pipeline_writes: bool = False
+
     def handle_cluster_request(
         self,
         hdr: foundation.ZCLHeader,
@@ -508,6 +769,7 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
 
         records = self._write_attr_records(attributes)
 
+        cmd_payloads = []
         for record in records:
             cmd_payload = TuyaManufCluster.Command()
             cmd_payload.status = 0
@@ -515,14 +777,25 @@ class TuyaManufClusterAttributes(TuyaManufCluster):
             cmd_payload.command_id = record.attrid
             cmd_payload.function = 0
             cmd_payload.data = record.value.value
+            cmd_payloads.append(cmd_payload)
 
-            await super().command(
-                TUYA_SET_DATA,
-                cmd_payload,
-                manufacturer=manufacturer,
-                expect_reply=False,
-                tsn=cmd_payload.tsn,
+        send = functools.partial(
+            super().command,
+            TUYA_SET_DATA,
+            manufacturer=manufacturer,
+            expect_reply=False,
+        )
+
+        if self.pipeline_writes:
+            await asyncio.gather(
+                *(
+                    send(cmd_payload, tsn=cmd_payload.tsn)
+                    for cmd_payload in cmd_payloads
+                )
             )
+        else:
+            for cmd_payload in cmd_payloads:
+                await send(cmd_payload, tsn=cmd_payload.tsn)
 
         return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
 
@@ -729,10 +1002,9 @@ class TuyaThermostatCluster(LocalDataCluster, Thermostat):
 
         attrid = self.attributes_by_name["occupied_heating_setpoint"].id
 
-        success, _ = await self.read_attributes((attrid,), manufacturer=manufacturer)
-        try:
-            current = success[attrid]
-        except KeyError:
+        # The setpoint is only known from device reports, skip the local read
+        current = self._attr_cache.get(attrid)
+        if current is None:
             return foundation.GENERAL_COMMANDS[
                 foundation.GeneralCommand.Default_Response
             ].schema(command_id=command_id, status=foundation.Status.FAILURE)
@@ -1009,31 +1281,164 @@ class TuyaSmartRemoteOnOffCluster(OnOff, EventableCluster):
             )
 
 
+@dataclasses.dataclass(frozen=True)
+class TuyaReportAggregation:
+    """Aggregation settings of a frequently reported attribute.
+
+    `window` samples are collected and reduced with `mode` ("min", "max",
+    "mean" or "last") before being reported. The reduced value is then only
+    reported if it differs by at least `deadband` from the last reported value
+    and at least `min_interval` seconds passed since that report.
+    """
+
+    window: int = 1
+    mode: str = "last"
+    deadband: float = 0
+    min_interval: float = 0
+
+    def __post_init__(self):
+        """Validate the settings."""
+        if self.window < 1:
+            raise ValueError(f"window must be at least 1, got {self.window}")
+        if self.mode not in _TUYA_AGGREGATION_MODES:
+            raise ValueError(f"Unknown aggregation mode {self.mode!r}")
+
+
+def _mean(samples: List[Any]) -> Any:
+    mean = sum(samples) / len(samples)
+    if all(isinstance(sample, int) for sample in samples):
+        return round(mean)
+    return mean
+
+
+_TUYA_AGGREGATION_MODES = {
+    "min": min,
+    "max": max,
+    "mean": _mean,
+    "last": lambda samples: samples[-1],
+}
+
+
+class TuyaReportAggregator:
+    """Window, deadband and rate limit state of a single attribute."""
+
+    def __init__(
+        self,
+        settings: TuyaReportAggregation,
+        clock: Optional[Callable[[], float]] = None,
+    ) -> None:
+        """Init."""
+        self.settings = settings
+        self._reduce = _TUYA_AGGREGATION_MODES[settings.mode]
+        self._clock = clock or time.monotonic
+        self._samples: List[Any] = []
+        self._reported: Optional[Any] = None
+        self._reported_at: Optional[float] = None
+        self.raw: Optional[Any] = None
+
+    def add(self, value: Any) -> Optional[Any]:
+        """Add a sample, return the value to report or None to hold it back."""
+        self.raw = value
+        self._samples.append(value)
+        if len(self._samples) < self.settings.window:
+            return None
+
+        value = self._reduce(self._samples)
+        self._samples.clear()
+
+        if self._reported is not None:
+            if abs(value - self._reported) < self.settings.deadband:
+                return None
+            now = self._clock()
+            if now - self._reported_at < self.settings.min_interval:
+                return None
+
+        self._reported = value
+        self._reported_at = self._clock()
+        return value
+
+
+class TuyaAggregatingCluster:
+    """Mixin aggregating attribute updates before they reach the cache.
+
+    `report_aggregation` maps attribute names or ids to the
+    `TuyaReportAggregation` applied to them; other attributes are updated
+    as usual. The last raw sample of an aggregated attribute is kept in
+    `raw_values`.
+    """
+
+    report_aggregation: Dict[Union[int, str], TuyaReportAggregation] = {}
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self.raw_values: Dict[int, Any] = {}
+        self.held_reports = collections.Counter()
+        self._aggregators: Dict[int, TuyaReportAggregator] = {}
+        for attr, settings in self.report_aggregation.items():
+            if isinstance(attr, str):
+                attr = self.attributes_by_name[attr].id
+            self._aggregators[attr] = TuyaReportAggregator(settings)
+
+    def raw_value(self, attr: Union[int, str]) -> Optional[Any]:
+        """Return the last sample received for an attribute, before aggregation."""
+        if isinstance(attr, str):
+            attr = self.attributes_by_name[attr].id
+        return self.raw_values.get(attr, self._attr_cache.get(attr))
+
+    def _update_attribute(self, attrid, value):
+        aggregator = self._aggregators.get(attrid)
+        if aggregator is not None:
+            self.raw_values[attrid] = value
+            value = aggregator.add(value)
+            if value is None:
+                self.held_reports[attrid] += 1
+                return
+            # a mean of integer attribute samples is still reported as an integer
+            if issubclass(self.attributes[attrid].type, int):
+                value = self.attributes[attrid].type(round(value))
+        super()._update_attribute(attrid, value)
+
+
+# Default aggregation of the power and energy of Tuya meters, some of which
+# report every few seconds
+TUYA_POWER_AGGREGATION = {
+    "active_power": TuyaReportAggregation(deadband=1, min_interval=5),
+}
+TUYA_ENERGY_AGGREGATION = {
+    "current_summ_delivered": TuyaReportAggregation(min_interval=30),
+}
+
 MULTIPLIER = 0x0301
 DIVISOR = 0x0302
 
 
 # Tuya Zigbee Metering Cluster Correction Implementation
-class TuyaZBMeteringCluster(CustomCluster, Metering):
+class TuyaZBMeteringCluster(TuyaAggregatingCluster, CustomCluster, Metering):
     """Divides the kWh for tuya."""
 
     _CONSTANT_ATTRIBUTES = {MULTIPLIER: 1, DIVISOR: 100}
+    report_aggregation = TUYA_ENERGY_AGGREGATION
 
 
 # Tuya Zigbee Metering Cluster Correction Implementation
-class TuyaZBMeteringClusterWithUnit(CustomCluster, Metering):
+class TuyaZBMeteringClusterWithUnit(TuyaAggregatingCluster, CustomCluster, Metering):
     """Divides the kWh for tuya."""
 
     UNIT_OF_MEASURE = 0x0300
     _CONSTANT_ATTRIBUTES = {UNIT_OF_MEASURE: 0, MULTIPLIER: 1, DIVISOR: 100}
+    report_aggregation = TUYA_ENERGY_AGGREGATION
 
 
-class TuyaZBElectricalMeasurement(CustomCluster, ElectricalMeasurement):
+class TuyaZBElectricalMeasurement(
+    TuyaAggregatingCluster, CustomCluster, ElectricalMeasurement
+):
     """Divides the Current for tuya."""
 
     AC_CURRENT_MULTIPLIER = 0x0602
     AC_CURRENT_DIVISOR = 0x0603
     _CONSTANT_ATTRIBUTES = {AC_CURRENT_MULTIPLIER: 1, AC_CURRENT_DIVISOR: 1000}
+    report_aggregation = TUYA_POWER_AGGREGATION
 
 
 # Tuya Zigbee Cluster 0xE000 Implementation
@@ -1401,6 +1806,88 @@ class AttributeWithMask:
     mask: int
 
 
+class TuyaDPPlan(NamedTuple):
+    """Precompiled handling of a datapoint report."""
+
+    ep_attribute: str
+    endpoint_id: Optional[int]
+    attribute_names: Tuple[str, ...]
+    # attribute_name is a tuple, the converter returns a value per attribute
+    multiple: bool
+    converter: Optional[Callable[[Any], Any]]
+    # the mapping targets the Tuya cluster itself
+    local: bool
+    # the target attributes were found at class creation, see _compile_dp_plans
+    verified: bool
+
+
+def _clusters_by_ep_attribute(cls: type, ep_attribute: str) -> Iterator[type]:
+    """Yield the known cluster classes a datapoint mapping may target.
+
+    Besides the standard clusters, the clusters the module of `cls` defined or
+    imported so far are looked at, for the attributes custom clusters add.
+    """
+    if ep_attribute == cls.ep_attribute:
+        yield cls
+    for cluster in Cluster._registry.values():
+        if cluster.ep_attribute == ep_attribute:
+            yield cluster
+
+    module = sys.modules.get(cls.__module__)
+    for value in list(vars(module).values()) if module is not None else ():
+        if (
+            isinstance(value, type)
+            and issubclass(value, Cluster)
+            and getattr(value, "ep_attribute", None) == ep_attribute
+        ):
+            yield value
+
+
+def _compile_dp_plans(
+    cls: type, dp_to_attribute: Dict[int, "DPToAttributeMapping"], validate: bool
+) -> Dict[int, TuyaDPPlan]:
+    """Compile the reports plans of the datapoints mapped to attributes.
+
+    Datapoints mapped to a command of the target cluster are only sent, they
+    get no plan. With `validate`, unknown attributes of known clusters raise.
+    Mappings to a cluster unknown yet, e.g. a custom cluster defined later,
+    are checked once the target cluster is known, by `_dp_2_attr_update`.
+    """
+    plans = {}
+    for dp, dp_map in dp_to_attribute.items():
+        multiple = isinstance(dp_map.attribute_name, tuple)
+        names = dp_map.attribute_name if multiple else (dp_map.attribute_name,)
+        local = dp_map.ep_attribute == cls.ep_attribute and not dp_map.endpoint_id
+        targets = tuple(_clusters_by_ep_attribute(cls, dp_map.ep_attribute))
+        verified = any(
+            all(name in cluster.attributes_by_name for name in names)
+            for cluster in targets
+        )
+        if not verified:
+            if any(
+                command.name in names
+                for cluster in targets
+                for command in cluster.server_commands.values()
+            ):
+                continue
+            if validate and targets:
+                raise TypeError(
+                    f"{cls.__name__}: datapoint {dp} maps to unknown "
+                    f"'{dp_map.ep_attribute}' attribute {dp_map.attribute_name!r}"
+                )
+
+        plans[dp] = TuyaDPPlan(
+            ep_attribute=dp_map.ep_attribute,
+            endpoint_id=dp_map.endpoint_id or None,
+            attribute_names=names,
+            multiple=multiple,
+            converter=dp_map.converter,
+            local=local,
+            verified=verified,
+        )
+    return plans
+
+
 class TuyaNewManufCluster(CustomCluster):
     """Tuya manufacturer specific cluster.
 
@@ -1413,6 +1900,9 @@ class TuyaNewManufCluster(CustomCluster):
     name: str = "Tuya Manufacturer Specific"
     cluster_id: t.uint16_t = TUYA_CLUSTER_ID
     ep_attribute: str = "tuya_manufacturer"
+    # Seconds between frames sent through the device send queue, None to send at once
+    send_interval: Optional[float] = None
+    send_queue_size: int = 32
 
     server_commands = {
         TUYA_SET_DATA: foundation.ZCLCommandDef(
@@ -1447,7 +1937,68 @@ class TuyaNewManufCluster(CustomCluster):
         ),
     }
 
+    dp_to_attribute: Dict[int, DPToAttributeMapping] = {}
+    # Handlers of the datapoints not simply mapped to an attribute by dp_to_attribute
     data_point_handlers: Dict[int, str] = {}
+    # Skip datapoint reports byte-identical to the last one handled
+    suppress_unchanged_reports: bool = False
+    # (dp_to_attribute, plans) of the class, see _dp_plans
+    _dp_plans_cache = (None, {})
+
+    def __init_subclass__(cls) -> None:
+        """Compile dp_to_attribute and check the datapoint handlers.
+
+        Datapoints mapped to an attribute are handled by `_dp_2_attr_update`
+        unless `data_point_handlers` says otherwise.
+        """
+        super().__init_subclass__()
+
+        plans = _compile_dp_plans(cls, cls.dp_to_attribute, validate=True)
+        cls._dp_plans_cache = (cls.dp_to_attribute, plans)
+
+        data_point_handlers = dict.fromkeys(plans, "_dp_2_attr_update")
+        data_point_handlers.update(cls.data_point_handlers)
+        cls.data_point_handlers = data_point_handlers
+
+        for dp, handler_name in cls.data_point_handlers.items():
+            if not callable(getattr(cls, handler_name, None)):
+                raise TypeError(
+                    f"{cls.__name__}: no '{handler_name}' handler for datapoint {dp}"
+                )
+
+    def __init__(self, *args, **kwargs):
+        """Init."""
+        super().__init__(*args, **kwargs)
+        self._last_reports: Dict[int, Tuple[TuyaDPType, bytes]] = {}
+        self.suppressed_reports: Dict[int, int] = collections.Counter()
+        # Datapoint target clusters and their endpoint, by (endpoint_id, ep_attribute)
+        self._target_clusters: Dict[Tuple[int, str], Tuple[Any, Cluster]] = {}
+
+        # Bound handlers by command id, None if the cluster doesn't handle the command
+        self._client_command_handlers: Dict[int, Optional[Callable]] = {
+            command_id: getattr(self, f"handle_{command.name}", None)
+            for command_id, command in self.client_commands.items()
+        }
+        self._server_command_handlers: Dict[int, Optional[Callable]] = {
+            command_id: getattr(self, f"handle_{command.name}", None)
+            for command_id, command in self.server_commands.items()
+        }
+        self._data_point_handlers: Dict[int, Callable] = {
+            dp: getattr(self, handler_name)
+            for dp, handler_name in self.data_point_handlers.items()
+        }
+
+    def invalidate_reports(self, dps: Optional[List[int]] = None) -> None:
+        """Forget the last reports of datapoints, all of them by default.
+
+        The next report of these datapoints is handled even if unchanged.
+        """
+        if dps is None:
+            self._last_reports.clear()
+            return
+
+        for dp in dps:
+            self._last_reports.pop(dp, None)
 
     def handle_cluster_request(
         self,
@@ -1460,12 +2011,14 @@ class TuyaNewManufCluster(CustomCluster):
     ) -> None:
         """Handle cluster specific request."""
 
+        if hdr.direction == foundation.Direction.Client_to_Server:
+            # server_cluster -> client_cluster cluster specific command
+            handlers, commands = self._client_command_handlers, self.client_commands
+        else:
+            handlers, commands = self._server_command_handlers, self.server_commands
+
         try:
-            if hdr.direction == foundation.Direction.Client_to_Server:
-                # server_cluster -> client_cluster cluster specific command
-                handler_name = f"handle_{self.client_commands[hdr.command_id].name}"
-            else:
-                handler_name = f"handle_{self.server_commands[hdr.command_id].name}"
+            handler = handlers[hdr.command_id]
         except KeyError:
             self.debug(
                 "Received unknown manufacturer command %s: %s", hdr.command_id, args
@@ -1474,17 +2027,17 @@ class TuyaNewManufCluster(CustomCluster):
                 self.send_default_rsp(
                     hdr, status=foundation.Status.UNSUP_CLUSTER_COMMAND
                 )
-                return
+            return
 
-        try:
-            status = getattr(self, handler_name)(*args)
-        except AttributeError:
+        if handler is None:
             self.warning(
                 "No '%s' tuya handler found for %s",
-                handler_name,
+                f"handle_{commands[hdr.command_id].name}",
                 args,
             )
             status = foundation.Status.UNSUP_CLUSTER_COMMAND
+        else:
+            status = handler(*args)
 
         if not hdr.frame_control.disable_default_response:
             self.send_default_rsp(hdr, status=status)
@@ -1494,8 +2047,7 @@ class TuyaNewManufCluster(CustomCluster):
         dp_error = False
         for record in command.datapoints:
             try:
-                dp_handler = self.data_point_handlers[record.dp]
-                getattr(self, dp_handler)(record)
+                self._data_point_handlers[record.dp](record)
             except (AttributeError, KeyError):
                 self.debug("No datapoint handler for %s", record)
                 dp_error = True
@@ -1514,30 +2066,99 @@ class TuyaNewManufCluster(CustomCluster):
         """Handle Time set request."""
         return foundation.Status.SUCCESS
 
+    def target_cluster(
+        self, ep_attribute: str, endpoint_id: Optional[int] = None
+    ) -> Optional[Cluster]:
+        """Return the cluster a datapoint is mapped to, None if the device has none.
+
+        Clusters are resolved once and cached. A cached cluster is dropped when
+        its endpoint is replaced on the device.
+        """
+        endpoint_id = endpoint_id or self.endpoint.endpoint_id
+        endpoint = self.endpoint.device.endpoints.get(endpoint_id)
+        key = (endpoint_id, ep_attribute)
+        cached = self._target_clusters.get(key)
+        if cached is not None and cached[0] is endpoint:
+            return cached[1]
+
+        cluster = getattr(endpoint, ep_attribute, None)
+        if cluster is None:
+            self._target_clusters.pop(key, None)
+            return None
+
+        self._target_clusters[key] = (endpoint, cluster)
+        return cluster
+
+    def invalidate_target_clusters(self) -> None:
+        """Resolve the datapoint target clusters again, e.g. after replacing one."""
+        self._target_clusters.clear()
+
+    def _invalidate_dp_index(self) -> None:
+        """Compile dp_to_attribute again, after changing it in place."""
+        self._dp_plans_cache = (
+            self.dp_to_attribute,
+            _compile_dp_plans(type(self), self.dp_to_attribute, validate=False),
+        )
+
+    def _dp_plans(self) -> Dict[int, TuyaDPPlan]:
+        """Return the compiled dp_to_attribute.
+
+        The plans are compiled once per class, and again for a cluster whose
+        dp_to_attribute is replaced. Changing dp_to_attribute in place needs
+        `_invalidate_dp_index`.
+        """
+        dp_to_attribute, plans = self._dp_plans_cache
+        if dp_to_attribute is not self.dp_to_attribute:
+            self._invalidate_dp_index()
+            plans = self._dp_plans_cache[1]
+
+        return plans
+
     def _dp_2_attr_update(self, datapoint: TuyaDatapointData) -> None:
         """Handle data point to attribute report conversion."""
         try:
-            dp_map = self.dp_to_attribute[datapoint.dp]
+            plan = self._dp_plans()[datapoint.dp]
         except KeyError:
             self.debug("No attribute mapping for %s data point", datapoint.dp)
             return
 
-        endpoint = self.endpoint
-        if dp_map.endpoint_id:
-            endpoint = self.endpoint.device.endpoints[dp_map.endpoint_id]
-        cluster = getattr(endpoint, dp_map.ep_attribute)
-        value = datapoint.data.payload
-        if dp_map.converter:
-            value = dp_map.converter(value)
-
-        if isinstance(dp_map.attribute_name, tuple):
-            for k, v in zip(dp_map.attribute_name, value):
-                if isinstance(v, AttributeWithMask):
-                    v = cluster.get(k, 0) & (~v.mask) | v.value
-                cluster.update_attribute(k, v)
+        if self.suppress_unchanged_reports:
+            report = (datapoint.data.dp_type, bytes(datapoint.data.raw))
+            if self._last_reports.get(datapoint.dp) == report:
+                self.suppressed_reports[datapoint.dp] += 1
+                return
+            self._last_reports[datapoint.dp] = report
+
+        if plan.local:
+            cluster = self
         else:
-            if isinstance(value, AttributeWithMask):
-                value = (
-                    cluster.get(dp_map.attribute_name, 0) & (~value.mask) | value.value
+            cluster = self.target_cluster(plan.ep_attribute, plan.endpoint_id)
+            if cluster is None:
+                self.debug(
+                    "No '%s' cluster on endpoint %s for %s data point",
+                    plan.ep_attribute,
+                    plan.endpoint_id or self.endpoint.endpoint_id,
+                    datapoint.dp,
                 )
-            cluster.update_attribute(dp_map.attribute_name, value)
+                return
+
+        if not plan.verified and not all(
+            name in cluster.attributes_by_name for name in plan.attribute_names
+        ):
+            self.debug(
+                "No %s attribute on '%s' cluster for %s data point",
+                plan.attribute_names,
+                plan.ep_attribute,
+                datapoint.dp,
+            )
+            return
+
+        value = datapoint.data.payload
+        if plan.converter:
+            value = plan.converter(value)
+
+        values = value if plan.multiple else (value,)
+        for k, v in zip(plan.attribute_names, values):
+            if isinstance(v, AttributeWithMask):
+                v = cluster.get(k, 0) & (~v.mask) | v.value
+            cluster.update_attribute(k, v)
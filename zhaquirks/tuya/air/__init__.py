@@ -71,11 +71,3 @@ class TuyaCO2ManufCluster(TuyaNewManufCluster):
             lambda x: x * 1e-6,
         ),
     }
-
-    data_point_handlers = {
-        2: "_dp_2_attr_update",
-        18: "_dp_2_attr_update",
-        19: "_dp_2_attr_update",
-        21: "_dp_2_attr_update",
-        22: "_dp_2_attr_update",
-    }
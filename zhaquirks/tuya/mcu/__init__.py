@@ -1,8 +1,12 @@
 """Tuya MCU comunications."""
 import asyncio
 import dataclasses
-import datetime
-from typing import Any, Callable, Dict, Optional, Tuple, Union
+import functools
+import json
+import logging
+import pathlib
+import random
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 from zigpy.quirks import CustomDevice
 import zigpy.types as t
@@ -15,15 +19,18 @@ from zhaquirks.tuya import (
     TUYA_MCU_VERSION_RSP,
     TUYA_SET_DATA,
     TUYA_SET_TIME,
+    TUYA_TIME_SYNC,
     NoManufacturerCluster,
     PowerOnState,
     TuyaCommand,
     TuyaDatapointData,
     TuyaLocalCluster,
     TuyaNewManufCluster,
-    TuyaTimePayload,
+    enqueue_tuya_command,
 )
 
+_LOGGER = logging.getLogger(__name__)
+
 # New manufacturer attributes
 ATTR_MCU_VERSION = 0xEF00
 
@@ -122,11 +129,36 @@ class TuyaAttributesCluster(TuyaLocalCluster):
         return [[foundation.WriteAttributesStatusRecord(foundation.Status.SUCCESS)]]
 
 
+def _index_dp_mappings(
+    dp_to_attribute: Dict[int, DPToAttributeMapping]
+) -> Dict[Tuple[Optional[int], str], List[Tuple[int, int, DPToAttributeMapping]]]:
+    """Index datapoint mappings by (endpoint_id, attribute_name).
+
+    Entries keep the position of their DP in dp_to_attribute.
+    """
+    index = {}
+    for position, (dp, dp_mapping) in enumerate(dp_to_attribute.items()):
+        attribute_names = dp_mapping.attribute_name
+        if not isinstance(attribute_names, tuple):
+            attribute_names = (attribute_names,)
+        for attribute_name in attribute_names:
+            index.setdefault((dp_mapping.endpoint_id, attribute_name), []).append(
+                (position, dp, dp_mapping)
+            )
+    return index
+
+
 class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
     """Manufacturer specific cluster for sending Tuya MCU commands."""
 
     set_time_offset = 1970  # MCU timestamp from 1/1/1970
     set_time_local_offset = None
+    # Seconds to collect writes into a single multi-datapoint set_data command:
+    # None sends one command per datapoint, 0 batches the writes issued before
+    # yielding to the event loop (e.g. the records of one write_attributes call).
+    set_data_batch_window: Optional[float] = None
+    # (dp_to_attribute, index) of the class, see _dp_mapping_index
+    _dp_mapping_index_cache = (None, {})
 
     class MCUVersion(t.Struct):
         """Tuya MCU version response Zcl payload."""
@@ -203,6 +235,10 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
+        self._set_data_batch: Dict[int, TuyaDatapointData] = {}
+        self._set_data_batch_options: Tuple[bool, Optional[int]] = (False, None)
+        self._set_data_batch_tsn = 0
+        self._set_data_batch_handle: Optional[asyncio.Handle] = None
         # Cluster for endpoint: 1 (listen MCU commands)
         self.endpoint.device.command_bus = Bus()
         self.endpoint.device.command_bus.add_listener(self)
@@ -230,10 +266,16 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
             if mapping.dp_converter:
                 args = []
                 if isinstance(mapping.attribute_name, tuple):
-                    endpoint = self.endpoint
-                    if mapping.endpoint_id:
-                        endpoint = endpoint.device.endpoints[mapping.endpoint_id]
-                    cluster = getattr(endpoint, mapping.ep_attribute)
+                    cluster = self.target_cluster(
+                        mapping.ep_attribute, mapping.endpoint_id
+                    )
+                    if cluster is None:
+                        self.warning(
+                            "No '%s' cluster for %s data point",
+                            mapping.ep_attribute,
+                            dp,
+                        )
+                        continue
                     for attr in mapping.attribute_name:
                         args.append(
                             val if attr == data.cluster_attr else cluster.get(attr)
@@ -267,42 +309,143 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
             )
             return
 
-        for tuya_command in tuya_commands:
-            self.create_catching_task(
-                self.command(
-                    TUYA_SET_DATA,
-                    tuya_command,
-                    expect_reply=cluster_data.expect_reply,
-                    manufacturer=cluster_data.manufacturer,
+        # the device may answer with the value reported before the change
+        self.invalidate_reports(
+            [dp.dp for command in tuya_commands for dp in command.datapoints]
+        )
+
+        if self.set_data_batch_window is None:
+            for tuya_command in tuya_commands:
+                self._send_set_data(
+                    tuya_command, cluster_data.expect_reply, cluster_data.manufacturer
                 )
+        else:
+            self._batch_set_data(
+                tuya_commands, cluster_data.expect_reply, cluster_data.manufacturer
             )
 
-        endpoint = self.endpoint.device.endpoints[cluster_data.endpoint_id]
-        cluster = getattr(endpoint, cluster_data.cluster_name)
-        cluster.update_attribute(cluster_data.cluster_attr, cluster_data.attr_value)
+        cluster = self.target_cluster(
+            cluster_data.cluster_name, cluster_data.endpoint_id
+        )
+        if cluster is not None:
+            cluster.update_attribute(cluster_data.cluster_attr, cluster_data.attr_value)
+
+    def _send_set_data(
+        self, tuya_command: TuyaCommand, expect_reply: bool, manufacturer: int
+    ) -> None:
+        """Send a set_data command to the MCU."""
+
+        enqueue_tuya_command(
+            self,
+            tuple(datapoint.dp for datapoint in tuya_command.datapoints),
+            functools.partial(
+                self.command,
+                TUYA_SET_DATA,
+                tuya_command,
+                expect_reply=expect_reply,
+                manufacturer=manufacturer,
+            ),
+        )
+
+    def _batch_set_data(
+        self, tuya_commands: List[TuyaCommand], expect_reply: bool, manufacturer: int
+    ) -> None:
+        """Queue datapoints to be sent in a single set_data command."""
+
+        if self._set_data_batch and self._set_data_batch_options != (
+            expect_reply,
+            manufacturer,
+        ):
+            self._flush_set_data()
+
+        if not self._set_data_batch:
+            # a batch of one write is sent as it would be without batching
+            self._set_data_batch_tsn = tuya_commands[0].tsn
+
+        self._set_data_batch_options = (expect_reply, manufacturer)
+        for tuya_command in tuya_commands:
+            for datapoint in tuya_command.datapoints:
+                # a newer value for the same DP replaces the queued one
+                self._set_data_batch[datapoint.dp] = datapoint
+
+        if self._set_data_batch_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.set_data_batch_window:
+                self._set_data_batch_handle = loop.call_later(
+                    self.set_data_batch_window, self._flush_set_data
+                )
+            else:
+                self._set_data_batch_handle = loop.call_soon(self._flush_set_data)
+
+    def _flush_set_data(self) -> None:
+        """Send the queued datapoints, ordered by DP, in one set_data command."""
+
+        if self._set_data_batch_handle is not None:
+            self._set_data_batch_handle.cancel()
+            self._set_data_batch_handle = None
+
+        if not self._set_data_batch:
+            return
+
+        cmd_payload = TuyaCommand()
+        cmd_payload.status = 0
+        cmd_payload.tsn = self._set_data_batch_tsn
+        cmd_payload.datapoints = [
+            self._set_data_batch[dp] for dp in sorted(self._set_data_batch)
+        ]
+        self._set_data_batch = {}
+
+        self.debug("Sending batched datapoints: %s", cmd_payload)
+        self._send_set_data(cmd_payload, *self._set_data_batch_options)
+
+    def __init_subclass__(cls) -> None:
+        """Index dp_to_attribute for get_dp_mapping."""
+        super().__init_subclass__()
+        cls._dp_mapping_index_cache = (
+            cls.dp_to_attribute,
+            _index_dp_mappings(cls.dp_to_attribute),
+        )
+
+    def _invalidate_dp_index(self) -> None:
+        """Compile and index dp_to_attribute again, after changing it in place."""
+        super()._invalidate_dp_index()
+        self._dp_mapping_index_cache = (
+            self.dp_to_attribute,
+            _index_dp_mappings(self.dp_to_attribute),
+        )
+
+    def _dp_mapping_index(
+        self,
+    ) -> Dict[Tuple[Optional[int], str], List[Tuple[int, int, DPToAttributeMapping]]]:
+        """Return dp_to_attribute indexed by (endpoint_id, attribute_name).
+
+        The index is built once per class, and again for a cluster whose
+        dp_to_attribute is replaced. Changing dp_to_attribute in place needs
+        `_invalidate_dp_index`.
+        """
+        dp_to_attribute, index = self._dp_mapping_index_cache
+        if dp_to_attribute is not self.dp_to_attribute:
+            self._invalidate_dp_index()
+            index = self._dp_mapping_index_cache[1]
+
+        return index
 
     def get_dp_mapping(
         self, endpoint_id: int, attribute_name: str
-    ) -> Optional[Tuple[int, DPToAttributeMapping]]:
+    ) -> Dict[int, DPToAttributeMapping]:
         """Search for the DP in dp_to_attribute."""
 
-        result = {}
-        for dp, dp_mapping in self.dp_to_attribute.items():
-            if (
-                attribute_name == dp_mapping.attribute_name
-                or (
-                    isinstance(dp_mapping.attribute_name, tuple)
-                    and attribute_name in dp_mapping.attribute_name
-                )
-            ) and (
-                (
-                    dp_mapping.endpoint_id is None
-                    and endpoint_id == self.endpoint.endpoint_id
-                )
-                or (endpoint_id == dp_mapping.endpoint_id)
-            ):
-                self.debug("get_dp_mapping --> found DP: %s", dp)
-                result[dp] = dp_mapping
+        index = self._dp_mapping_index()
+        entries = index.get((endpoint_id, attribute_name), [])
+
+        # Mappings without endpoint_id target the endpoint of this cluster
+        if endpoint_id == self.endpoint.endpoint_id:
+            default_entries = index.get((None, attribute_name))
+            if default_entries:
+                entries = sorted(entries + default_entries, key=lambda e: e[0])
+
+        result = {dp: dp_mapping for _, dp, dp_mapping in entries}
+        self.debug("get_dp_mapping --> found DPs: %s", list(result))
         return result
 
     def handle_mcu_version_response(self, payload: MCUVersion) -> foundation.Status:
@@ -316,22 +459,10 @@ class TuyaMCUCluster(TuyaAttributesCluster, TuyaNewManufCluster):
         """Handle set_time requests (0x24)."""
 
         self.debug("handle_set_time_request payload: %s", payload)
-        payload_rsp = TuyaTimePayload()
-
-        utc_now = datetime.datetime.utcnow()
-        now = datetime.datetime.now()
-
-        offset_time = datetime.datetime(self.set_time_offset, 1, 1)
-        offset_time_local = datetime.datetime(
-            self.set_time_local_offset or self.set_time_offset, 1, 1
+        payload_rsp = TUYA_TIME_SYNC.payload(
+            self.set_time_offset, self.set_time_local_offset
         )
 
-        utc_timestamp = int((utc_now - offset_time).total_seconds())
-        local_timestamp = int((now - offset_time_local).total_seconds())
-
-        payload_rsp.extend(utc_timestamp.to_bytes(4, "big", signed=False))
-        payload_rsp.extend(local_timestamp.to_bytes(4, "big", signed=False))
-
         self.debug("handle_set_time_request response: %s", payload_rsp)
         self.create_catching_task(
             super().command(TUYA_SET_TIME, payload_rsp, expect_reply=False)
@@ -437,15 +568,6 @@ class TuyaOnOffManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        3: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        6: "_dp_2_attr_update",
-    }
-
 
 class MoesSwitchManufCluster(TuyaOnOffManufCluster):
     """On/Off Tuya cluster with extra device attributes."""
@@ -480,10 +602,6 @@ class MoesSwitchManufCluster(TuyaOnOffManufCluster):
         }
     )
 
-    data_point_handlers = TuyaOnOffManufCluster.data_point_handlers.copy()
-    data_point_handlers.update({14: "_dp_2_attr_update"})
-    data_point_handlers.update({15: "_dp_2_attr_update"})
-
 
 class TuyaLevelControl(LevelControl, TuyaLocalCluster):
     """Tuya MCU Level cluster for dimmable device."""
@@ -576,6 +694,11 @@ class TuyaInWallLevelControl(TuyaAttributesCluster, TuyaLevelControl):
 class TuyaLevelControlManufCluster(TuyaMCUCluster):
     """Tuya with Level Control data points."""
 
+    # move_to_level_with_on_off writes on_off and current_level
+    set_data_batch_window = 0
+    # brightness sliders send bursts of writes, pace them and keep the newest
+    send_interval = 0.1
+
     dp_to_attribute: Dict[int, DPToAttributeMapping] = {
         1: DPToAttributeMapping(
             TuyaOnOff.ep_attribute,
@@ -647,20 +770,175 @@ class TuyaLevelControlManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        3: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-        7: "_dp_2_attr_update",
-        8: "_dp_2_attr_update",
-        9: "_dp_2_attr_update",
-        10: "_dp_2_attr_update",
-        15: "_dp_2_attr_update",
-        16: "_dp_2_attr_update",
-        17: "_dp_2_attr_update",
-        18: "_dp_2_attr_update",
-    }
+
+class TuyaSpellScheduler:
+    """Cast the 'magic spell' of Tuya devices a few at a time.
+
+    Spells start after a random delay of up to `jitter` seconds, at most
+    `concurrency` run at once and failed spells are retried with an
+    exponential backoff. Devices are remembered once their spell succeeded
+    and skipped afterwards, unless their network address changed (the device
+    joined again). With a `progress_path`, this is kept across restarts: the
+    file is written in an executor, once no spell is waiting or running.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        jitter: float = 1.0,
+        tries: int = 3,
+        backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        progress_path: Optional[Union[str, pathlib.Path]] = None,
+    ) -> None:
+        """Init."""
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.tries = tries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.progress_path = progress_path
+        self.failed: Dict[str, BaseException] = {}
+        self._completed: Dict[str, int] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._progress_changed = False
+        self._saving: Optional[asyncio.Future] = None
+
+        if progress_path is not None:
+            self.load_progress()
+
+    @property
+    def completed(self) -> Dict[str, int]:
+        """Return the network address of every device whose spell succeeded."""
+        return dict(self._completed)
+
+    @property
+    def pending(self) -> int:
+        """Return the number of spells waiting or running."""
+        return sum(not task.done() for task in self._tasks.values())
+
+    def load_progress(self) -> None:
+        """Load the devices already enchanted from `progress_path`."""
+        try:
+            with open(self.progress_path, encoding="utf-8") as progress_file:
+                self._completed = json.load(progress_file)
+        except FileNotFoundError:
+            self._completed = {}
+        except (OSError, ValueError) as exc:
+            _LOGGER.warning("Failed to load the Tuya spell progress: %r", exc)
+            self._completed = {}
+
+    def save_progress(self) -> None:
+        """Write the devices already enchanted to `progress_path`, if set."""
+        if self.progress_path is not None:
+            self._write_progress(self._completed)
+
+    def _write_progress(self, completed: Dict[str, int]) -> None:
+        try:
+            with open(self.progress_path, "w", encoding="utf-8") as progress_file:
+                json.dump(completed, progress_file, indent=1, sort_keys=True)
+        except OSError as exc:
+            _LOGGER.warning("Failed to save the Tuya spell progress: %r", exc)
+
+    def _save_progress_soon(self, *_: Any) -> None:
+        """Save the progress in an executor, once spells and saves are done."""
+        if self.progress_path is None:
+            return
+
+        self._progress_changed = True
+        if self.pending or (self._saving is not None and not self._saving.done()):
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._progress_changed = False
+            self.save_progress()
+            return
+
+        self._progress_changed = False
+        self._saving = loop.run_in_executor(
+            None, self._write_progress, dict(self._completed)
+        )
+        self._saving.add_done_callback(self._progress_saved)
+
+    def _progress_saved(self, _: asyncio.Future) -> None:
+        if self._progress_changed:
+            self._save_progress_soon()
+
+    async def flush_progress(self) -> None:
+        """Wait for the progress of the finished spells to be written."""
+        while self._saving is not None and not self._saving.done():
+            await self._saving
+
+    def forget(self, ieee: t.EUI64) -> None:
+        """Cast the spell of a device again the next time it is scheduled."""
+        if self._completed.pop(str(ieee), None) is not None:
+            self._save_progress_soon()
+
+    def schedule(
+        self, device: CustomDevice, spell: Callable[[], Awaitable]
+    ) -> Optional[asyncio.Task]:
+        """Schedule the spell of a device, unless it was cast already."""
+        ieee = str(device.ieee)
+        if self._completed.get(ieee) == device.nwk:
+            _LOGGER.debug("[%s] Skipping the Tuya spell, already cast", ieee)
+            return None
+
+        task = self._tasks.get(ieee)
+        if task is not None and not task.done():
+            return task
+
+        task = self._tasks[ieee] = asyncio.create_task(self._cast(device, spell))
+        task.add_done_callback(self._spell_done)
+        return task
+
+    def _spell_done(self, _: asyncio.Task) -> None:
+        if self._progress_changed:
+            self._save_progress_soon()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def _cast(self, device: CustomDevice, spell: Callable[[], Awaitable]) -> bool:
+        ieee = str(device.ieee)
+        if self.jitter:
+            await asyncio.sleep(random.uniform(0, self.jitter))
+
+        for attempt in range(self.tries):
+            if attempt:
+                await asyncio.sleep(
+                    min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+                )
+
+            async with self._get_semaphore():
+                try:
+                    await spell()
+                except Exception as exc:  # pylint: disable=broad-except
+                    _LOGGER.debug(
+                        "[%s] Tuya spell attempt %d failed: %r", ieee, attempt + 1, exc
+                    )
+                    self.failed[ieee] = exc
+                    continue
+
+            self.failed.pop(ieee, None)
+            self._completed[ieee] = device.nwk
+            self._save_progress_soon()
+            return True
+
+        _LOGGER.warning(
+            "[%s] Failed to cast the Tuya spell after %d tries", ieee, self.tries
+        )
+        return False
+
+
+TUYA_SPELL_SCHEDULER = TuyaSpellScheduler()
 
 
 class EnchantedDevice(CustomDevice):
@@ -669,7 +947,7 @@ class EnchantedDevice(CustomDevice):
     def __init__(self, *args, **kwargs):
         """Initialize with task."""
         super().__init__(*args, **kwargs)
-        self._init_device_task = asyncio.create_task(self.spell())
+        self._init_device_task = TUYA_SPELL_SCHEDULER.schedule(self, self.spell)
 
     async def spell(self) -> None:
         """Initialize device so that all endpoints become available."""
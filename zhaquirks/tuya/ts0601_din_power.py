@@ -14,7 +14,14 @@ from zhaquirks.const import (
     OUTPUT_CLUSTERS,
     PROFILE_ID,
 )
-from zhaquirks.tuya import TuyaManufClusterAttributes, TuyaOnOff, TuyaSwitch
+from zhaquirks.tuya import (
+    TUYA_ENERGY_AGGREGATION,
+    TUYA_POWER_AGGREGATION,
+    TuyaAggregatingCluster,
+    TuyaManufClusterAttributes,
+    TuyaOnOff,
+    TuyaSwitch,
+)
 
 TUYA_TOTAL_ENERGY_ATTR = 0x0211
 TUYA_CURRENT_ATTR = 0x0212
@@ -63,7 +70,9 @@ class TuyaManufClusterDinPower(TuyaManufClusterAttributes):
             )
 
 
-class TuyaPowerMeasurement(LocalDataCluster, ElectricalMeasurement):
+class TuyaPowerMeasurement(
+    TuyaAggregatingCluster, LocalDataCluster, ElectricalMeasurement
+):
     """Custom class for power, voltage and current measurement."""
 
     cluster_id = ElectricalMeasurement.cluster_id
@@ -87,6 +96,7 @@ class TuyaPowerMeasurement(LocalDataCluster, ElectricalMeasurement):
         AC_FREQUENCY_MULTIPLIER: 1,
         AC_FREQUENCY_DIVISOR: 100,
     }
+    report_aggregation = TUYA_POWER_AGGREGATION
 
     def voltage_reported(self, value):
         """Voltage reported."""
@@ -117,7 +127,7 @@ class TuyaPowerMeasurement(LocalDataCluster, ElectricalMeasurement):
         self._update_attribute(self.TOTAL_REACTIVE_POWER_ID, value)
 
 
-class TuyaElectricalMeasurement(LocalDataCluster, Metering):
+class TuyaElectricalMeasurement(TuyaAggregatingCluster, LocalDataCluster, Metering):
     """Custom class for total energy measurement."""
 
     cluster_id = Metering.cluster_id
@@ -127,6 +137,7 @@ class TuyaElectricalMeasurement(LocalDataCluster, Metering):
 
     """Setting unit of measurement."""
     _CONSTANT_ATTRIBUTES = {0x0300: POWER_WATT}
+    report_aggregation = TUYA_ENERGY_AGGREGATION
 
     def energy_deliver_reported(self, value):
         """Summation Energy Deliver reported."""
@@ -72,16 +72,6 @@ class TuyaGarageManufCluster(NoManufacturerCluster, TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        3: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        11: "_dp_2_attr_update",
-        12: "_dp_2_attr_update",
-    }
-
 
 class TuyaGarageSwitchTO(CustomDevice):
     """Tuya Garage switch."""
@@ -59,11 +59,6 @@ class TuyaIlluminanceCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        TUYA_BRIGHTNESS_LEVEL_DP: "_dp_2_attr_update",
-        TUYA_ILLUMINANCE_DP: "_dp_2_attr_update",
-    }
-
 
 class TuyaIlluminance(CustomDevice):
     """HOME-LUX illuminance sensor. Sense maximum 1000 lumen."""
@@ -107,17 +107,13 @@ class NeoMotionManufCluster(TuyaNewManufCluster):
         ),
     }
 
-    data_point_handlers = {
-        101: "_dp_2_attr_update",
-        104: "_dp_2_attr_update",
-        105: "_dp_2_attr_update",
-        113: "_dp_2_attr_update",
-    }
-
 
 class MmwRadarManufCluster(TuyaMCUCluster):
     """Neo manufacturer cluster."""
 
+    # detection settings are usually written together
+    set_data_batch_window = 0
+
     # # Possible DPs and values
     # presence_state: presence
     # target distance: 1.61m
@@ -211,23 +207,6 @@ class MmwRadarManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        3: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-        6: "_dp_2_attr_update",
-        9: "_dp_2_attr_update",
-        101: "_dp_2_attr_update",
-        102: "_dp_2_attr_update",
-        103: "_dp_2_attr_update",
-        104: "_dp_2_attr_update",
-        105: "_dp_2_attr_update",
-        106: "_dp_2_attr_update",
-        107: "_dp_2_attr_update",
-        108: "_dp_2_attr_update",
-    }
-
 
 class MotionCluster(LocalDataCluster, MotionOnEvent):
     """Tuya Motion Sensor."""
@@ -24,7 +24,14 @@ from zhaquirks.const import (
     OUTPUT_CLUSTERS,
     PROFILE_ID,
 )
-from zhaquirks.tuya import TUYA_MCU_COMMAND, AttributeWithMask, PowerOnState
+from zhaquirks.tuya import (
+    TUYA_ENERGY_AGGREGATION,
+    TUYA_MCU_COMMAND,
+    TUYA_POWER_AGGREGATION,
+    AttributeWithMask,
+    PowerOnState,
+    TuyaAggregatingCluster,
+)
 from zhaquirks.tuya.mcu import (
     DPToAttributeMapping,
     TuyaAttributesCluster,
@@ -194,7 +201,9 @@ class TuyaRCBOOnOff(TuyaOnOff, TuyaAttributesCluster):
         return await super().command(command_id, args, manufacturer, expect_reply, tsn)
 
 
-class TuyaRCBOElectricalMeasurement(ElectricalMeasurement, TuyaAttributesCluster):
+class TuyaRCBOElectricalMeasurement(
+    TuyaAggregatingCluster, ElectricalMeasurement, TuyaAttributesCluster
+):
     """Custom class for power, voltage and current measurement."""
 
     AC_VOLTAGE_MULTIPLIER = 0x0600
@@ -212,6 +221,7 @@ class TuyaRCBOElectricalMeasurement(ElectricalMeasurement, TuyaAttributesCluster
         AC_POWER_MULTIPLIER: 1,
         AC_POWER_DIVISOR: 10,
     }
+    report_aggregation = TUYA_POWER_AGGREGATION
 
     attributes = ElectricalMeasurement.attributes.copy()
     attributes.update(
@@ -246,9 +256,11 @@ class TuyaRCBOElectricalMeasurement(ElectricalMeasurement, TuyaAttributesCluster
                 super().update_attribute("apparent_power", int(apparent_power))
 
         if attr_name == "active_power":
+            # the reported power, a report may be held back by report_aggregation
+            active_power = self.get("active_power")
             apparent_power = self.get("apparent_power")
-            if apparent_power:
-                power_factor = value / apparent_power * 1000
+            if apparent_power and active_power is not None:
+                power_factor = active_power / apparent_power * 1000
                 if power_factor > 1000:
                     power_factor = 1000
                 super().update_attribute("power_factor", int(power_factor))
@@ -265,7 +277,7 @@ class TuyaRCBODeviceTemperature(DeviceTemperature, TuyaAttributesCluster):
     )
 
 
-class TuyaRCBOMetering(Metering, TuyaAttributesCluster):
+class TuyaRCBOMetering(TuyaAggregatingCluster, Metering, TuyaAttributesCluster):
     """Custom class for total energy measurement."""
 
     UNIT_OF_MEASURE = 0x0300
@@ -274,6 +286,7 @@ class TuyaRCBOMetering(Metering, TuyaAttributesCluster):
     POWER_WATT = 0x0000
 
     _CONSTANT_ATTRIBUTES = {UNIT_OF_MEASURE: POWER_WATT, MULTIPLIER: 1, DIVISOR: 100}
+    report_aggregation = TUYA_ENERGY_AGGREGATION
 
     attributes = Metering.attributes.copy()
     attributes.update(
@@ -478,31 +491,6 @@ class TuyaRCBOManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers: Dict[int, str] = {
-        TUYA_DP_STATE: "_dp_2_attr_update",
-        TUYA_DP_COUNTDOWN_TIMER: "_dp_2_attr_update",
-        TUYA_DP_FAULT_CODE: "_dp_2_attr_update",
-        TUYA_DP_RELAY_STATUS: "_dp_2_attr_update",
-        TUYA_DP_CHILD_LOCK: "_dp_2_attr_update",
-        TUYA_DP_VOLTAGE: "_dp_2_attr_update",
-        TUYA_DP_CURRENT: "_dp_2_attr_update",
-        TUYA_DP_ACTIVE_POWER: "_dp_2_attr_update",
-        TUYA_DP_LEAKAGE_CURRENT: "_dp_2_attr_update",
-        TUYA_DP_TEMPERATURE: "_dp_2_attr_update",
-        TUYA_DP_REMAINING_ENERGY: "_dp_2_attr_update",
-        TUYA_DP_COST_PARAMETERS: "_dp_2_attr_update",
-        TUYA_DP_LEAKAGE_PARAMETERS: "_dp_2_attr_update",
-        TUYA_DP_VOLTAGE_THRESHOLD: "_dp_2_attr_update",
-        TUYA_DP_CURRENT_THRESHOLD: "_dp_2_attr_update",
-        TUYA_DP_TEMPERATURE_THRESHOLD: "_dp_2_attr_update",
-        TUYA_DP_TOTAL_ACTIVE_POWER: "_dp_2_attr_update",
-        TUYA_DP_EQUIPMENT_NUMBER_AND_TYPE: "_dp_2_attr_update",
-        TUYA_DP_LOCKING: "_dp_2_attr_update",
-        TUYA_DP_TOTAL_REVERSE_ACTIVE_POWER: "_dp_2_attr_update",
-        TUYA_DP_HISTORICAL_VOLTAGE: "_dp_2_attr_update",
-        TUYA_DP_HISTORICAL_CURRENT: "_dp_2_attr_update",
-    }
-
 
 class TuyaCircuitBreaker(CustomDevice):
     """Tuya RCBO with power meter device."""
@@ -68,12 +68,6 @@ class TemperatureHumidityManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        4: "_dp_2_attr_update",
-    }
-
 
 class TuyaTempHumiditySensor(CustomDevice):
     """Custom device representing tuya temp and humidity sensor with e-ink screen."""
@@ -241,12 +235,6 @@ class SoilManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        3: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        15: "_dp_2_attr_update",
-    }
-
 
 class TuyaSoilSensor(CustomDevice):
     """Tuya temp and humidity sensor (variation 03)."""
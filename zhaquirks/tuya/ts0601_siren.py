@@ -314,6 +314,9 @@ class TuyaMCUSiren(OnOff, TuyaAttributesCluster):
 class NeoSirenManufCluster(TuyaMCUCluster):
     """Tuya with NEO Siren data points."""
 
+    # alarm settings are usually written together
+    set_data_batch_window = 0
+
     dp_to_attribute: Dict[int, DPToAttributeMapping] = {
         5: DPToAttributeMapping(
             TuyaMCUSiren.ep_attribute,
@@ -339,14 +342,6 @@ class NeoSirenManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        13: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        7: "_dp_2_attr_update",
-        15: "_dp_2_attr_update",
-        21: "_dp_2_attr_update",
-    }
-
 
 class TuyaSirenGPP_NoSensors(CustomDevice):
     """NEO Tuya Siren without sensor."""
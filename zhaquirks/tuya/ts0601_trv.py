@@ -1,6 +1,7 @@
 """Map from manufacturer to standard clusters for thermostatic valves."""
 import logging
-from typing import Optional, Union
+import struct
+from typing import NamedTuple, Optional, Tuple, Union
 
 from zigpy.profiles import zha
 import zigpy.types as t
@@ -53,6 +54,7 @@ class SiterwellManufCluster(TuyaManufClusterAttributes):
     """Manufacturer Specific Cluster of some thermostatic valves."""
 
     set_time_offset = 1970
+    pipeline_writes = True
 
     attributes = TuyaManufClusterAttributes.attributes.copy()
     attributes.update(
@@ -187,10 +189,43 @@ class data144(t.FixedList, item_type=t.uint8_t, length=18):
     """General data, Discrete, 144 bit."""
 
 
+class MoesScheduleSlot(NamedTuple):
+    """Schedule period start time and temperature (centidegree)."""
+
+    hour: int
+    minute: int
+    temperature: int
+
+
+MOES_SCHEDULE_SLOTS = 6
+_MOES_SCHEDULE = struct.Struct("18B")
+
+
+def decode_moes_schedule(value: data144) -> Tuple[MoesScheduleSlot, ...]:
+    """Decode a schedule payload into its periods, first period first.
+
+    Periods are stored last first, each as (temperature, minute, hour).
+    """
+    raw = _MOES_SCHEDULE.unpack(bytes(value))[::-1]
+    return tuple(
+        MoesScheduleSlot(raw[i] & 0x3F, raw[i + 1], raw[i + 2] * 100)
+        for i in range(0, 3 * MOES_SCHEDULE_SLOTS, 3)
+    )
+
+
+def encode_moes_schedule(slots: Tuple[MoesScheduleSlot, ...]) -> data144:
+    """Encode schedule periods, first period first, into a schedule payload."""
+    data = data144()
+    for slot in reversed(slots):
+        data.extend((round(slot.temperature / 100), slot.minute, slot.hour))
+    return data
+
+
 class MoesManufCluster(TuyaManufClusterAttributes):
     """Manufacturer Specific Cluster of some thermostatic valves."""
 
     set_time_offset = 1970
+    pipeline_writes = True
 
     attributes = TuyaManufClusterAttributes.attributes.copy()
     attributes.update(
@@ -431,6 +466,12 @@ class MoesThermostat(TuyaThermostatCluster):
         "unoccupied_duration_days": (MOES_AWAY_DAYS_ATTR, None),
     }
 
+    # Period N of a schedule is stored in base + 0x10 * N + (hour, minute, temperature)
+    SCHEDULE_ATTR_BASES = {
+        MOES_SCHEDULE_WORKDAY_ATTR: 0x4100,
+        MOES_SCHEDULE_WEEKEND_ATTR: 0x4200,
+    }
+
     WORKDAY_SCHEDULE_ATTRS = {
         "workday_schedule_6_temperature": 1500,
         "workday_schedule_6_minute": 0,
@@ -512,54 +553,30 @@ class MoesThermostat(TuyaThermostatCluster):
                     self.attributes_by_name["operation_preset"].id, 2
                 )
             }
-        if attribute in self.WORKDAY_SCHEDULE_ATTRS:
-            data = data144()
-            for num, (attr, default) in enumerate(self.WORKDAY_SCHEDULE_ATTRS.items()):
-
-                if num % 3 == 0:
-                    if attr == attribute:
-                        val = round(value / 100)
-                    else:
-                        val = round(
-                            self._attr_cache.get(
-                                self.attributes_by_name[attr].id, default
-                            )
-                            / 100
-                        )
-                else:
-                    if attr == attribute:
-                        val = value
-                    else:
-                        val = self._attr_cache.get(
-                            self.attributes_by_name[attr].id, default
-                        )
-
-                data.append(val)
-            return {MOES_SCHEDULE_WORKDAY_ATTR: data}
-        if attribute in self.WEEKEND_SCHEDULE_ATTRS:
-            data = data144()
-            for num, (attr, default) in enumerate(self.WEEKEND_SCHEDULE_ATTRS.items()):
-
-                if num % 3 == 0:
-                    if attr == attribute:
-                        val = round(value / 100)
-                    else:
-                        val = round(
-                            self._attr_cache.get(
-                                self.attributes_by_name[attr].id, default
-                            )
-                            / 100
-                        )
-                else:
-                    if attr == attribute:
-                        val = value
-                    else:
-                        val = self._attr_cache.get(
-                            self.attributes_by_name[attr].id, default
-                        )
-
-                data.append(val)
-            return {MOES_SCHEDULE_WEEKEND_ATTR: data}
+        for schedule_attr, schedule_attrs in (
+            (MOES_SCHEDULE_WORKDAY_ATTR, self.WORKDAY_SCHEDULE_ATTRS),
+            (MOES_SCHEDULE_WEEKEND_ATTR, self.WEEKEND_SCHEDULE_ATTRS),
+        ):
+            if attribute not in schedule_attrs:
+                continue
+
+            values = {
+                attr: value
+                if attr == attribute
+                else self._attr_cache.get(self.attributes_by_name[attr].id, default)
+                for attr, default in schedule_attrs.items()
+            }
+            prefix = attribute.split("_", 1)[0]
+            slots = tuple(
+                MoesScheduleSlot(
+                    *(
+                        values[f"{prefix}_schedule_{num}_{field}"]
+                        for field in MoesScheduleSlot._fields
+                    )
+                )
+                for num in range(1, MOES_SCHEDULE_SLOTS + 1)
+            )
+            return {schedule_attr: encode_moes_schedule(slots)}
 
     def mode_change(self, value):
         """System Mode change."""
@@ -593,128 +610,17 @@ class MoesThermostat(TuyaThermostatCluster):
     def schedule_change(self, attr, value):
         """Scheduler attribute change."""
 
-        if attr == MOES_SCHEDULE_WORKDAY_ATTR:
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_hour"].id, value[17] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_minute"].id, value[16]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_1_temperature"].id,
-                value[15] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_hour"].id, value[14] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_minute"].id, value[13]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_2_temperature"].id,
-                value[12] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_hour"].id, value[11] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_minute"].id, value[10]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_3_temperature"].id,
-                value[9] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_hour"].id, value[8] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_minute"].id, value[7]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_4_temperature"].id,
-                value[6] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_hour"].id, value[5] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_minute"].id, value[4]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_5_temperature"].id,
-                value[3] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_hour"].id, value[2] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_minute"].id, value[1]
-            )
-            self._update_attribute(
-                self.attributes_by_name["workday_schedule_6_temperature"].id,
-                value[0] * 100,
-            )
-        elif attr == MOES_SCHEDULE_WEEKEND_ATTR:
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_hour"].id, value[17] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_minute"].id, value[16]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_1_temperature"].id,
-                value[15] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_hour"].id, value[14] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_minute"].id, value[13]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_2_temperature"].id,
-                value[12] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_hour"].id, value[11] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_minute"].id, value[10]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_3_temperature"].id,
-                value[9] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_hour"].id, value[8] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_minute"].id, value[7]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_4_temperature"].id,
-                value[6] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_hour"].id, value[5] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_minute"].id, value[4]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_5_temperature"].id,
-                value[3] * 100,
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_hour"].id, value[2] & 0x3F
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_minute"].id, value[1]
-            )
-            self._update_attribute(
-                self.attributes_by_name["weekend_schedule_6_temperature"].id,
-                value[0] * 100,
-            )
+        try:
+            base = self.SCHEDULE_ATTR_BASES[attr]
+        except KeyError:
+            return
+
+        # Only notify the schedule periods which changed
+        for num, slot in enumerate(decode_moes_schedule(value), 1):
+            for offset, field_value in enumerate(slot):
+                attrid = base + num * 0x10 + offset
+                if self._attr_cache.get(attrid) != field_value:
+                    self._update_attribute(attrid, field_value)
 
 
 class MoesThermostatNew(MoesThermostat):
@@ -942,6 +848,8 @@ ZonnsmartManuClusterSelf = None
 class ZONNSMARTManufCluster(TuyaManufClusterAttributes):
     """Manufacturer Specific Cluster of some thermostatic valves."""
 
+    pipeline_writes = True
+
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
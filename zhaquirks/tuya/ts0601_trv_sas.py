@@ -50,6 +50,8 @@ MAX_HEAT_SETPOINT_ATTR = 0x0016
 class ManufacturerThermostatCluster(TuyaManufClusterAttributes):
     """Tuya manufacturer specific cluster."""
 
+    pipeline_writes = True
+
     class State(t.enum8):
         """State option."""
 
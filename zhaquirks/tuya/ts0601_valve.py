@@ -85,16 +85,6 @@ class TuyaValveManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        6: "_dp_2_attr_update",
-        7: "_dp_2_attr_update",
-        11: "_dp_2_attr_update",
-        12: "_dp_2_attr_update",
-        15: "_dp_2_attr_update",
-    }
-
 
 class TuyaValve(CustomDevice):
     """Tuya valve device."""
@@ -178,15 +168,6 @@ class ParksideTuyaValveManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        5: "_dp_2_attr_update",
-        6: "_dp_2_attr_update",
-        11: "_dp_2_attr_update",
-        108: "_dp_2_attr_update",
-        109: "_dp_2_attr_update",
-    }
-
     async def bind(self):
         """
         Bind cluster.
@@ -258,6 +239,9 @@ GIEX_DURATION_ATTR = 0xEF72  # Last irrigation duration
 class GiexValveManufCluster(TuyaMCUCluster):
     """GiEX valve manufacturer cluster."""
 
+    # irrigation mode, target and cycles are usually written together
+    set_data_batch_window = 0
+
     attributes = TuyaMCUCluster.attributes.copy()
     attributes.update(
         {
@@ -314,19 +298,6 @@ class GiexValveManufCluster(TuyaMCUCluster):
         ),
     }
 
-    data_point_handlers = {
-        1: "_dp_2_attr_update",
-        2: "_dp_2_attr_update",
-        101: "_dp_2_attr_update",
-        102: "_dp_2_attr_update",
-        103: "_dp_2_attr_update",
-        104: "_dp_2_attr_update",
-        105: "_dp_2_attr_update",
-        108: "_dp_2_attr_update",
-        111: "_dp_2_attr_update",
-        114: "_dp_2_attr_update",
-    }
-
     async def write_attributes(self, attributes, manufacturer=None):
         """Overwrite to force manufacturer code."""
 
@@ -3,9 +3,11 @@ from __future__ import annotations
 
 import logging
 import math
-from typing import Any, Iterable, Iterator
+import time
+from typing import Any, Callable, Iterator
 
 from zigpy import types as t
+from zigpy.const import SIG_MANUFACTURER, SIG_MODEL, SIG_MODELS_INFO
 import zigpy.device
 from zigpy.profiles import zha
 from zigpy.quirks import CustomCluster, CustomDevice
@@ -31,7 +33,6 @@ import zigpy.zdo
 from zigpy.zdo.types import NodeDescriptor
 
 from zhaquirks import (
-    Bus,
     LocalDataCluster,
     MotionOnEvent,
     OccupancyWithReset,
@@ -107,21 +108,204 @@ ZONE_TYPE = 0x0001
 
 _LOGGER = logging.getLogger(__name__)
 
+# Names of the 0xFF01/0x00F7 heartbeat attributes sent by every model
+_AQARA_ATTRIBUTES = {
+    1: BATTERY_VOLTAGE_MV,
+    3: TEMPERATURE,
+    4: XIAOMI_ATTR_4,
+    5: XIAOMI_ATTR_5,
+    6: XIAOMI_ATTR_6,
+    10: PATH,
+}
+# Temperature sensors send temperature/humidity/pressure updates through this
+# cluster instead of the respective clusters
+_AQARA_WEATHER_ATTRIBUTES = {
+    100: TEMPERATURE_MEASUREMENT,
+    101: HUMIDITY_MEASUREMENT,
+    102: PRESSURE_MEASUREMENT,
+}
+_AQARA_PLUG_ATTRIBUTES = {149: CONSUMPTION, 150: VOLTAGE, 152: POWER}
+_AQARA_MOTION_AGL02_ATTRIBUTES = {101: ILLUMINANCE_MEASUREMENT}
+# Heartbeat attribute names by model, on top of the common ones
+_AQARA_MODEL_ATTRIBUTES = {
+    "lumi.sensor_ht": _AQARA_WEATHER_ATTRIBUTES,
+    "lumi.sens": _AQARA_WEATHER_ATTRIBUTES,
+    "lumi.weather": _AQARA_WEATHER_ATTRIBUTES,
+    "lumi.airmonitor.acn01": {**_AQARA_WEATHER_ATTRIBUTES, 102: TVOC_MEASUREMENT},
+    "lumi.sensor_ht.agl02": _AQARA_WEATHER_ATTRIBUTES,
+    "lumi.plug": _AQARA_PLUG_ATTRIBUTES,
+    "lumi.plug.maus01": _AQARA_PLUG_ATTRIBUTES,
+    "lumi.plug.maeu01": _AQARA_PLUG_ATTRIBUTES,
+    "lumi.plug.mmeu01": _AQARA_PLUG_ATTRIBUTES,
+    "lumi.relay.c2acn01": _AQARA_PLUG_ATTRIBUTES,
+    "lumi.sensor_motion.aq2": {11: ILLUMINANCE_MEASUREMENT},
+    "lumi.curtain.acn002": {101: BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE},
+    "lumi.motion.agl02": _AQARA_MOTION_AGL02_ATTRIBUTES,
+    "lumi.motion.ac02": {
+        **_AQARA_MOTION_AGL02_ATTRIBUTES,
+        105: DETECTION_INTERVAL,
+        106: MOTION_SENSITIVITY,
+    },
+    "lumi.motion.agl04": {
+        102: DETECTION_INTERVAL,
+        105: MOTION_SENSITIVITY,
+        258: DETECTION_INTERVAL,
+        268: MOTION_SENSITIVITY,
+    },
+    "lumi.motion.ac01": {
+        5: POWER_OUTAGE_COUNT,
+        101: PRESENCE_DETECTED,
+        102: PRESENCE_EVENT,
+        103: MONITORING_MODE,
+        105: APPROACH_DISTANCE,
+        268: MOTION_SENSITIVITY,
+        322: PRESENCE_DETECTED,
+        323: PRESENCE_EVENT,
+        324: MONITORING_MODE,
+        326: APPROACH_DISTANCE,
+    },
+}
+
+
+def _aqara_attribute_table(names: dict[int, str]) -> tuple[str, ...]:
+    """Return the names of the heartbeat attributes, indexed by attribute id."""
+    return tuple(names.get(item, f"0xff01-{item}") for item in range(256))
+
+
+# Only one byte ids can be reported, names of larger ids are never used
+_AQARA_ATTRIBUTE_TABLES = {
+    model: _aqara_attribute_table({**_AQARA_ATTRIBUTES, **names})
+    for model, names in _AQARA_MODEL_ATTRIBUTES.items()
+}
+_AQARA_DEFAULT_ATTRIBUTE_TABLE = _aqara_attribute_table(_AQARA_ATTRIBUTES)
+
+
+class XiaomiEventRouter:
+    """Route the values parsed from Xiaomi attribute reports to clusters.
+
+    Clusters bind the values they handle when the device is built, so a
+    report costs a dictionary lookup per value. Heartbeats repeating the
+    previous payload, or received within `heartbeat_min_interval` seconds of
+    the previous one, are not routed and are counted in `skipped_heartbeats`.
+    """
+
+    # Conversions of the reported values to the unit the clusters expect
+    _CONVERTERS: dict[str, Callable[[Any], Any]] = {
+        PRESSURE_MEASUREMENT: lambda value: value / 100,
+        VOLTAGE: lambda value: value * 0.1,
+    }
+
+    __slots__ = (
+        "_routes",
+        "_clock",
+        "_last_heartbeat",
+        "_last_heartbeat_time",
+        "heartbeat_min_interval",
+        "skipped_heartbeats",
+    )
+
+    def __init__(
+        self,
+        heartbeat_min_interval: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Init."""
+        self._routes: dict[str, list[Callable[[Any], Any]]] = {}
+        self._clock = clock
+        self._last_heartbeat: bytes | None = None
+        self._last_heartbeat_time: float | None = None
+        self.heartbeat_min_interval = heartbeat_min_interval
+        self.skipped_heartbeats = 0
+
+    def bind(self, key: str, handler: Callable[[Any], Any]) -> None:
+        """Call `handler` with the value of every `key` report."""
+        converter = self._CONVERTERS.get(key)
+        if converter is not None:
+            target = handler
+
+            def handler(value: Any) -> Any:
+                return target(converter(value))
+
+        self._routes.setdefault(key, []).append(handler)
+
+    def route(self, key: str, value: Any) -> None:
+        """Pass a reported value to the handlers bound to it."""
+        for handler in self._routes.get(key, ()):
+            handler(value)
+
+    def accept_heartbeat(self, payload: bytes) -> bool:
+        """Check a heartbeat payload is worth parsing and routing."""
+        now = self._clock()
+        if payload == self._last_heartbeat or (
+            self._last_heartbeat_time is not None
+            and now - self._last_heartbeat_time < self.heartbeat_min_interval
+        ):
+            self.skipped_heartbeats += 1
+            return False
+
+        self._last_heartbeat = payload
+        self._last_heartbeat_time = now
+        return True
+
+    def dispatch(self, attributes: dict[str, Any]) -> None:
+        """Pass every reported value to the handlers bound to it."""
+        routes = self._routes
+        for key, value in attributes.items():
+            handlers = routes.get(key)
+            if handlers is not None:
+                for handler in handlers:
+                    handler(value)
+
 
 class XiaomiCustomDevice(CustomDevice):
     """Custom device representing xiaomi devices."""
 
+    # Minimum seconds between the heartbeats updating the clusters
+    heartbeat_min_interval: float = 0
+
     def __init__(self, *args, **kwargs):
         """Init."""
-        self.battery_bus = Bus()
+        self.event_router = XiaomiEventRouter(self.heartbeat_min_interval)
         if not hasattr(self, BATTERY_SIZE):
             self.battery_size = 10
         super().__init__(*args, **kwargs)
 
 
+# QuickInit quirks of LUMI devices by model, in zigpy registry order. Filled from
+# the registry on lookup, so that lazily loaded quirk modules are imported first
+_QUICK_INIT_QUIRKS: dict[str, list[type[XiaomiQuickInitDevice]]] = {}
+
+
+def _quick_init_quirks(model: str) -> list[type[XiaomiQuickInitDevice]]:
+    """Return the QuickInit quirks of a LUMI model."""
+    quirks = _QUICK_INIT_QUIRKS.get(model)
+    if quirks is None:
+        quirks = _QUICK_INIT_QUIRKS[model] = [
+            quirk
+            for quirk in zigpy.quirks.get_quirk_list(LUMI, model)
+            if issubclass(quirk, XiaomiQuickInitDevice)
+        ]
+
+    return quirks
+
+
 class XiaomiQuickInitDevice(XiaomiCustomDevice, QuickInitDevice):
     """Xiaomi devices eligible for QuickInit."""
 
+    def __init_subclass__(cls) -> None:
+        """Drop the QuickInit quirks indexed for the models of the quirk."""
+        super().__init_subclass__()
+        signature = getattr(cls, "signature", None)
+        if signature is None:
+            return
+
+        models_info = signature.get(SIG_MODELS_INFO) or [
+            (signature.get(SIG_MANUFACTURER), signature.get(SIG_MODEL))
+        ]
+        for manufacturer, model in models_info:
+            if manufacturer == LUMI:
+                _QUICK_INIT_QUIRKS.pop(model, None)
+
 
 class XiaomiCluster(CustomCluster):
     """Xiaomi cluster implementation."""
@@ -170,57 +354,94 @@ class XiaomiCluster(CustomCluster):
                 value=foundation.TypeValue(type=attr_type, value=attr_val),
             ), final_data
 
-    def _interpret_attr_reports(
+    def _parse_attr_report(
         self, data: bytes
-    ) -> Iterable[tuple[foundation.Attribute]]:
-        """Yield all valid interprations of a Xiaomi attribute report."""
-
-        if not data:
-            yield ()
-            return
-
-        try:
-            parsed = list(self._iter_parse_attr_report(data))
-        except (KeyError, ValueError):
-            return
-
-        for attr, remaining_data in parsed:
-            for remaining_attrs in self._interpret_attr_reports(remaining_data):
-                yield (attr,) + remaining_attrs
+    ) -> tuple[list[foundation.Attribute] | None, int]:
+        """Parse a Xiaomi attribute report, fixing the string attribute lengths.
+
+        Return the attributes of the first valid interpretation, preferring the
+        reported string lengths, and the number of valid interpretations, up
+        to 2. Interpretations are memoized by offset, so each offset of the
+        report is parsed at most once, however many string lengths are wrong.
+        """
+
+        size = len(data)
+        # offset -> (valid interpretations up to 2, first attribute, next offset)
+        memo: dict[int, tuple[int, foundation.Attribute | None, int]] = {}
+
+        def parse(offset: int) -> int:
+            if offset == size:
+                return 1
+            if offset in memo:
+                return memo[offset][0]
+
+            try:
+                parsed = list(self._iter_parse_attr_report(data[offset:]))
+            except (KeyError, ValueError):
+                parsed = []
+
+            count, first, first_offset = 0, None, size
+            for attr, remaining_data in parsed:
+                next_offset = size - len(remaining_data)
+                valid = parse(next_offset)
+                if valid and first is None:
+                    first, first_offset = attr, next_offset
+                count += valid
+
+            memo[offset] = (min(count, 2), first, first_offset)
+            return memo[offset][0]
+
+        count = parse(0)
+        if not count:
+            return None, 0
+
+        attributes = []
+        offset = 0
+        while offset != size:
+            _, attr, offset = memo[offset]
+            attributes.append(attr)
+        return attributes, count
 
     def deserialize(self, data):
         """Deserialize cluster data."""
-        hdr, data = foundation.ZCLHeader.deserialize(data)
+        hdr, payload = foundation.ZCLHeader.deserialize(data)
 
         # Only handle attribute reports differently
         if (
             hdr.frame_control.frame_type != foundation.FrameType.GLOBAL_COMMAND
             or hdr.command_id != foundation.GeneralCommand.Report_Attributes
         ):
-            return super().deserialize(hdr.serialize() + data)
+            return super().deserialize(data)
 
-        reports = list(self._interpret_attr_reports(data))
+        attributes, count = self._parse_attr_report(payload)
 
-        if not reports:
-            _LOGGER.warning("Failed to parse Xiaomi attribute report: %r", data)
-            return super().deserialize(hdr.serialize() + data)
-        elif len(reports) > 1:
+        if attributes is None:
+            _LOGGER.warning("Failed to parse Xiaomi attribute report: %r", payload)
+            return super().deserialize(data)
+        elif count > 1:
             _LOGGER.warning(
                 "Xiaomi attribute report has multiple valid interpretations: %r",
-                reports,
+                payload,
             )
 
-        fixed_data = b"".join(attr.serialize() for attr in reports[0])
-
-        return super().deserialize(hdr.serialize() + fixed_data)
+        command = foundation.GENERAL_COMMANDS[hdr.command_id]
+        hdr.frame_control.direction = command.direction
+        return hdr, command.schema(attribute_reports=attributes)
 
     def _update_attribute(self, attrid, value):
         if attrid in (XIAOMI_AQARA_ATTRIBUTE, XIAOMI_AQARA_ATTRIBUTE_E1):
-            attributes = self._parse_aqara_attributes(value)
             super()._update_attribute(attrid, value)
             if self.endpoint.device.model == "lumi.sensor_switch.aq2":
                 if value == b"\x04!\xa8C\n!\x00\x00":
                     self.listener_event(ZHA_SEND_EVENT, COMMAND_TRIPLE, [])
+
+            router = self.endpoint.device.event_router
+            if not router.accept_heartbeat(value):
+                self.debug(
+                    "Skipping heartbeat, %s skipped so far", router.skipped_heartbeats
+                )
+                return
+            attributes = self._parse_aqara_attributes(value)
         elif attrid == XIAOMI_MIJA_ATTRIBUTE:
             attributes = self._parse_mija_attributes(value)
         else:
@@ -252,39 +473,9 @@ class XiaomiCluster(CustomCluster):
             attrid,
             attributes,
         )
-        if BATTERY_VOLTAGE_MV in attributes:
-            self.endpoint.device.battery_bus.listener_event(
-                BATTERY_REPORTED, attributes[BATTERY_VOLTAGE_MV]
-            )
+        self.endpoint.device.event_router.dispatch(attributes)
 
-        if TEMPERATURE_MEASUREMENT in attributes:
-            self.endpoint.device.temperature_bus.listener_event(
-                TEMPERATURE_REPORTED, attributes[TEMPERATURE_MEASUREMENT]
-            )
-        if HUMIDITY_MEASUREMENT in attributes:
-            self.endpoint.device.humidity_bus.listener_event(
-                HUMIDITY_REPORTED, attributes[HUMIDITY_MEASUREMENT]
-            )
-        if PRESSURE_MEASUREMENT in attributes:
-            self.endpoint.device.pressure_bus.listener_event(
-                PRESSURE_REPORTED, attributes[PRESSURE_MEASUREMENT] / 100
-            )
-        if POWER in attributes:
-            self.endpoint.device.power_bus.listener_event(
-                POWER_REPORTED, attributes[POWER]
-            )
-        if CONSUMPTION in attributes:
-            self.endpoint.device.consumption_bus.listener_event(
-                CONSUMPTION_REPORTED, attributes[CONSUMPTION]
-            )
-        if VOLTAGE in attributes:
-            self.endpoint.device.voltage_bus.listener_event(
-                VOLTAGE_REPORTED, attributes[VOLTAGE] * 0.1
-            )
-        if ILLUMINANCE_MEASUREMENT in attributes:
-            self.endpoint.device.illuminance_bus.listener_event(
-                ILLUMINANCE_REPORTED, attributes[ILLUMINANCE_MEASUREMENT]
-            )
+        # values of the clusters on the same endpoint
         if TVOC_MEASUREMENT in attributes:
             self.endpoint.voc_level.update_attribute(
                 0x0000, attributes[TVOC_MEASUREMENT]
@@ -294,89 +485,19 @@ class XiaomiCluster(CustomCluster):
                 self.endpoint.device_temperature.update_attribute(
                     0x0000, attributes[TEMPERATURE] * 100
                 )
-        if BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE in attributes:
-            self.endpoint.device.power_bus_percentage.listener_event(
-                "update_battery_percentage",
-                attributes[BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE],
-            )
 
     def _parse_aqara_attributes(self, value):
         """Parse non standard attributes."""
+        names = _AQARA_ATTRIBUTE_TABLES.get(
+            self.endpoint.device.model, _AQARA_DEFAULT_ATTRIBUTE_TABLE
+        )
         attributes = {}
-        attribute_names = {
-            1: BATTERY_VOLTAGE_MV,
-            3: TEMPERATURE,
-            4: XIAOMI_ATTR_4,
-            5: XIAOMI_ATTR_5,
-            6: XIAOMI_ATTR_6,
-            10: PATH,
-        }
-
-        if self.endpoint.device.model in [
-            "lumi.sensor_ht",
-            "lumi.sens",
-            "lumi.weather",
-            "lumi.airmonitor.acn01",
-            "lumi.sensor_ht.agl02",
-        ]:
-            # Temperature sensors send temperature/humidity/pressure updates through this
-            # cluster instead of the respective clusters
-            attribute_names.update(
-                {
-                    100: TEMPERATURE_MEASUREMENT,
-                    101: HUMIDITY_MEASUREMENT,
-                    102: TVOC_MEASUREMENT
-                    if self.endpoint.device.model == "lumi.airmonitor.acn01"
-                    else PRESSURE_MEASUREMENT,
-                }
-            )
-        elif self.endpoint.device.model in [
-            "lumi.plug",
-            "lumi.plug.maus01",
-            "lumi.plug.maeu01",
-            "lumi.plug.mmeu01",
-            "lumi.relay.c2acn01",
-        ]:
-            attribute_names.update({149: CONSUMPTION, 150: VOLTAGE, 152: POWER})
-        elif self.endpoint.device.model == "lumi.sensor_motion.aq2":
-            attribute_names.update({11: ILLUMINANCE_MEASUREMENT})
-        elif self.endpoint.device.model == "lumi.curtain.acn002":
-            attribute_names.update({101: BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE})
-        elif self.endpoint.device.model in ["lumi.motion.agl02", "lumi.motion.ac02"]:
-            attribute_names.update({101: ILLUMINANCE_MEASUREMENT})
-            if self.endpoint.device.model == "lumi.motion.ac02":
-                attribute_names.update({105: DETECTION_INTERVAL})
-                attribute_names.update({106: MOTION_SENSITIVITY})
-        elif self.endpoint.device.model == "lumi.motion.agl04":
-            attribute_names.update({102: DETECTION_INTERVAL})
-            attribute_names.update({105: MOTION_SENSITIVITY})
-            attribute_names.update({258: DETECTION_INTERVAL})
-            attribute_names.update({268: MOTION_SENSITIVITY})
-        elif self.endpoint.device.model == "lumi.motion.ac01":
-            attribute_names.update({5: POWER_OUTAGE_COUNT})
-            attribute_names.update({101: PRESENCE_DETECTED})
-            attribute_names.update({102: PRESENCE_EVENT})
-            attribute_names.update({103: MONITORING_MODE})
-            attribute_names.update({105: APPROACH_DISTANCE})
-            attribute_names.update({268: MOTION_SENSITIVITY})
-            attribute_names.update({322: PRESENCE_DETECTED})
-            attribute_names.update({323: PRESENCE_EVENT})
-            attribute_names.update({324: MONITORING_MODE})
-            attribute_names.update({326: APPROACH_DISTANCE})
-        result = {}
 
         # Some attribute reports end with a stray null byte
         while value not in (b"", b"\x00"):
-            skey = int(value[0])
+            name = names[value[0]]
             svalue, value = foundation.TypeValue.deserialize(value[1:])
-            result[skey] = svalue.value
-        for item, val in result.items():
-            key = (
-                attribute_names[item]
-                if item in attribute_names
-                else "0xff01-" + str(item)
-            )
-            attributes[key] = val
+            attributes[name] = svalue.value
 
         return attributes
 
@@ -427,7 +548,12 @@ class XiaomiPowerConfiguration(PowerConfiguration, LocalDataCluster):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.battery_bus.add_listener(self)
+        self.endpoint.device.event_router.bind(
+            BATTERY_VOLTAGE_MV, self.battery_reported
+        )
+        self.endpoint.device.event_router.bind(
+            BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE, self.battery_percent_reported
+        )
         self._CONSTANT_ATTRIBUTES = {
             BATTERY_QUANTITY_ATTR: 1,
             BATTERY_SIZE_ATTR: getattr(self.endpoint.device, BATTERY_SIZE, 0xFF),
@@ -488,7 +614,9 @@ class TemperatureMeasurementCluster(CustomCluster, TemperatureMeasurement):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.temperature_bus.add_listener(self)
+        self.endpoint.device.event_router.bind(
+            TEMPERATURE_MEASUREMENT, self.temperature_reported
+        )
 
     def _update_attribute(self, attrid, value):
         # drop values above and below documented range for this sensor
@@ -510,7 +638,9 @@ class RelativeHumidityCluster(CustomCluster, RelativeHumidity):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.humidity_bus.add_listener(self)
+        self.endpoint.device.event_router.bind(
+            HUMIDITY_MEASUREMENT, self.humidity_reported
+        )
 
     def _update_attribute(self, attrid, value):
         # drop values above and below documented range for this sensor
@@ -531,7 +661,9 @@ class PressureMeasurementCluster(CustomCluster, PressureMeasurement):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.pressure_bus.add_listener(self)
+        self.endpoint.device.event_router.bind(
+            PRESSURE_MEASUREMENT, self.pressure_reported
+        )
 
     def _update_attribute(self, attrid, value):
         # drop unreasonable values
@@ -557,7 +689,7 @@ class AnalogInputCluster(CustomCluster, AnalogInput):
     def _update_attribute(self, attrid, value):
         super()._update_attribute(attrid, value)
         if value is not None and value >= 0:
-            self.endpoint.device.power_bus.listener_event(POWER_REPORTED, value)
+            self.endpoint.device.event_router.route(POWER, value)
 
 
 class ElectricalMeasurementCluster(LocalDataCluster, ElectricalMeasurement):
@@ -577,9 +709,9 @@ class ElectricalMeasurementCluster(LocalDataCluster, ElectricalMeasurement):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.voltage_bus.add_listener(self)
-        self.endpoint.device.consumption_bus.add_listener(self)
-        self.endpoint.device.power_bus.add_listener(self)
+        self.endpoint.device.event_router.bind(VOLTAGE, self.voltage_reported)
+        self.endpoint.device.event_router.bind(CONSUMPTION, self.consumption_reported)
+        self.endpoint.device.event_router.bind(POWER, self.power_reported)
 
         # put a default value so the sensors are created
         if self.POWER_ID not in self._attr_cache:
@@ -618,7 +750,7 @@ class MeteringCluster(LocalDataCluster, Metering):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.consumption_bus.add_listener(self)
+        self.endpoint.device.event_router.bind(CONSUMPTION, self.consumption_reported)
 
         # put a default value so the sensor is created
         if self.CURRENT_SUMM_DELIVERED_ID not in self._attr_cache:
@@ -638,7 +770,9 @@ class IlluminanceMeasurementCluster(CustomCluster, IlluminanceMeasurement):
     def __init__(self, *args, **kwargs):
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.illuminance_bus.add_listener(self)
+        self.endpoint.device.event_router.bind(
+            ILLUMINANCE_MEASUREMENT, self.illuminance_reported
+        )
 
     def _update_attribute(self, attrid, value):
         if attrid == self.ATTR_ID and value > 0:
@@ -681,6 +815,27 @@ class OnOffCluster(OnOff, CustomCluster):
         )
 
 
+def _is_basic_report(cluster: int, message: bytes) -> bool:
+    """Check the raw frame is an attribute report of the Basic cluster.
+
+    Only the frame control and command id bytes are looked at, so that other
+    frames are rejected without deserializing them.
+    """
+    if cluster != Basic.cluster_id or not message:
+        return False
+
+    frame_control = message[0]
+    if frame_control & 0b11 != foundation.FrameType.GLOBAL_COMMAND:
+        return False
+
+    # the manufacturer code precedes the sequence number and command id
+    command_offset = 4 if frame_control & 0b100 else 2
+    return (
+        len(message) > command_offset
+        and message[command_offset] == foundation.GeneralCommand.Report_Attributes
+    )
+
+
 def handle_quick_init(
     sender: zigpy.device.Device,
     profile: int,
@@ -690,7 +845,7 @@ def handle_quick_init(
     message: bytes,
 ) -> bool | None:
     """Handle message from an uninitialized device which could be a xiaomi."""
-    if src_ep == 0:
+    if src_ep == 0 or not _is_basic_report(cluster, message):
         return
 
     hdr, data = foundation.ZCLHeader.deserialize(message)
@@ -702,12 +857,6 @@ def handle_quick_init(
         hdr,
         data,
     )
-    if hdr.frame_control.is_cluster:
-        return
-
-    if hdr.command_id not in foundation.COMMANDS:
-        sender.debug("Unknown ZCL global command: %s", hdr.command_id)
-        return
 
     try:
         params, data = foundation.COMMANDS[hdr.command_id].schema.deserialize(data)
@@ -717,12 +866,6 @@ def handle_quick_init(
 
     sender.debug("Uninitialized device command '%s' params: %s", hdr.command_id, params)
 
-    if (
-        hdr.command_id != foundation.GeneralCommand.Report_Attributes
-        or cluster != 0x0000
-    ):
-        return
-
     for attr_rec in params.attribute_reports:
         # model_name
         if attr_rec.attrid == 0x0005:
@@ -735,10 +878,7 @@ def handle_quick_init(
     if not model:
         return
 
-    for quirk in zigpy.quirks.get_quirk_list(LUMI, model):
-        if not issubclass(quirk, XiaomiQuickInitDevice):
-            continue
-
+    for quirk in _quick_init_quirks(model):
         sender.debug("Found '%s' quirk for '%s' model", quirk.__name__, model)
 
         try:
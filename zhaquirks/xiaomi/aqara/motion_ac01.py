@@ -5,7 +5,6 @@ import logging
 from typing import Any
 
 from zigpy.profiles import zha
-from zigpy.quirks import CustomDevice
 import zigpy.types as types
 from zigpy.zcl.clusters.general import Basic, DeviceTemperature, Identify, Ota
 from zigpy.zcl.clusters.measurement import OccupancySensing
@@ -20,7 +19,7 @@ from zhaquirks.const import (
     PROFILE_ID,
     ZHA_SEND_EVENT,
 )
-from zhaquirks.xiaomi import XiaomiAqaraE1Cluster
+from zhaquirks.xiaomi import XiaomiAqaraE1Cluster, XiaomiCustomDevice
 
 OCCUPANCY = 0x0000
 PRESENCE = 0x0142
@@ -71,7 +70,7 @@ class OppleCluster(XiaomiAqaraE1Cluster):
             self.listener_event(ZHA_SEND_EVENT, AqaraPresenceEvents(value).name, {})
 
 
-class AqaraLumiMotionAc01(CustomDevice):
+class AqaraLumiMotionAc01(XiaomiCustomDevice):
     """Aqara lumi.motion.ac01 custom device implementation."""
 
     signature = {
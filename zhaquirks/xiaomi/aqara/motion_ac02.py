@@ -5,7 +5,6 @@ import logging
 from typing import Any
 
 from zigpy.profiles import zha
-from zigpy.quirks import CustomDevice
 import zigpy.types as types
 from zigpy.zcl.clusters.general import Basic, Identify, Ota, PowerConfiguration
 
@@ -23,6 +22,7 @@ from zhaquirks.xiaomi import (
     MotionCluster,
     OccupancyCluster,
     XiaomiAqaraE1Cluster,
+    XiaomiCustomDevice,
     XiaomiPowerConfiguration,
 )
 
@@ -99,15 +99,13 @@ class LocalMotionCluster(MotionCluster):
     reset_s: int = 30
 
 
-class LumiMotionAC02(CustomDevice):
+class LumiMotionAC02(XiaomiCustomDevice):
     """Lumi lumi.motion.ac02 (RTCGQ14LM) custom device implementation."""
 
     def __init__(self, *args, **kwargs):
         """Init."""
         self.battery_size = 11
         self.battery_quantity = 2
-        self.battery_bus = Bus()
-        self.illuminance_bus = Bus()
         self.motion_bus = Bus()
         super().__init__(*args, **kwargs)
 
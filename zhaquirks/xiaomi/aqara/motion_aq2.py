@@ -38,7 +38,6 @@ class MotionAQ2(XiaomiQuickInitDevice):
         """Init."""
         self.battery_size = 9
         self.motion_bus = Bus()
-        self.illuminance_bus = Bus()
         super().__init__(*args, **kwargs)
 
     signature = {
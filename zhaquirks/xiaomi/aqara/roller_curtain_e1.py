@@ -24,7 +24,7 @@ from zigpy.zcl.clusters.general import (
 )
 from zigpy.zcl.clusters.manufacturer_specific import ManufacturerSpecificCluster
 
-from zhaquirks import Bus, CustomCluster, LocalDataCluster
+from zhaquirks import CustomCluster, LocalDataCluster
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -33,7 +33,13 @@ from zhaquirks.const import (
     OUTPUT_CLUSTERS,
     PROFILE_ID,
 )
-from zhaquirks.xiaomi import LUMI, BasicCluster, XiaomiCluster, XiaomiCustomDevice
+from zhaquirks.xiaomi import (
+    BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE,
+    LUMI,
+    BasicCluster,
+    XiaomiCluster,
+    XiaomiCustomDevice,
+)
 
 PRESENT_VALUE = 0x0055
 CURRENT_POSITION_LIFT_PERCENTAGE = 0x0008
@@ -162,7 +168,9 @@ class PowerConfigurationRollerE1(PowerConfiguration, LocalDataCluster):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Init."""
         super().__init__(*args, **kwargs)
-        self.endpoint.device.power_bus_percentage.add_listener(self)
+        self.endpoint.device.event_router.bind(
+            BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE, self.update_battery_percentage
+        )
 
     def update_battery_percentage(self, value: int) -> None:
         """Doubles the battery percentage to the Zigbee spec's expected 200% maximum."""
@@ -175,11 +183,6 @@ class PowerConfigurationRollerE1(PowerConfiguration, LocalDataCluster):
 class RollerE1AQ(XiaomiCustomDevice):
     """Aqara Roller Shade Driver E1 device."""
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        """Init."""
-        self.power_bus_percentage: Bus = Bus()  # type: ignore
-        super().__init__(*args, **kwargs)  # type: ignore
-
     signature = {
         MODELS_INFO: [(LUMI, "lumi.curtain.acn002")],
         ENDPOINTS: {
@@ -15,6 +15,7 @@ from zhaquirks.const import (
     PROFILE_ID,
 )
 from zhaquirks.xiaomi import (
+    BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE,
     LUMI,
     XiaomiAqaraE1Cluster,
     XiaomiCustomDevice,
@@ -46,8 +47,8 @@ class AqaraThermostatSpecificCluster(XiaomiAqaraE1Cluster):
     def _update_attribute(self, attrid, value):
         self.debug("Attribute/Value", attrid, value)
         if attrid == 0x040A:
-            self.endpoint.device.battery_bus.listener_event(
-                "battery_percent_reported", value
+            self.endpoint.device.event_router.route(
+                BATTERY_PERCENTAGE_REMAINING_ATTRIBUTE, value
             )
         super()._update_attribute(attrid, value)
 
@@ -5,7 +5,6 @@ from zigpy.profiles import zha
 from zigpy.zcl.clusters.general import Groups, Identify
 from zigpy.zcl.clusters.measurement import PressureMeasurement
 
-from zhaquirks import Bus
 from zhaquirks.const import (
     DEVICE_TYPE,
     ENDPOINTS,
@@ -36,13 +35,6 @@ _LOGGER = logging.getLogger(__name__)
 class Weather(XiaomiQuickInitDevice):
     """Xiaomi weather sensor device."""
 
-    def __init__(self, *args, **kwargs):
-        """Init."""
-        self.temperature_bus = Bus()
-        self.humidity_bus = Bus()
-        self.pressure_bus = Bus()
-        super().__init__(*args, **kwargs)
-
     signature = {
         #  <SimpleDescriptor endpoint=1 profile=260 device_type=24321
         #  device_version=1